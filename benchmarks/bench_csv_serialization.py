@@ -0,0 +1,86 @@
+"""
+Benchmark for turning CSV rows into upload request bodies: compares the former path
+(DataFrame -> JSON string -> Python objects via 'json.loads', then re-encoded by 'requests' per batch)
+with the direct column-wise conversion and batch encoding in 'oem_dpkg.utils'
+(using orjson if it is installed) on a synthetic time series with an 'RS' region key column.
+
+Example call (from the 'benchmarks' directory, with oem_dpkg installed):
+python bench_csv_serialization.py --rows 2000000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from oem_dpkg.utils import csv_frame_to_records, encode_batch, orjson
+
+
+def make_synthetic_csv(path: Path, rows: int) -> None:
+    rng = np.random.default_rng(42)
+    pd.DataFrame(
+        {
+            "RS": rng.choice(["01001", "03241", "15001", "15002"], size=rows),
+            "timestamp": pd.date_range("2011-01-01", periods=rows, freq="h")
+            .strftime("%Y-%m-%d %H:%M:%S+01:00"),
+            "power": rng.random(rows),
+            "capacity": rng.integers(0, 5000, size=rows),
+        }
+    ).to_csv(path, index=False)
+
+
+def roundtrip_bodies(path: Path, batch_size: int) -> int:
+    """The conversion used before: to_json + json.loads, then json-encoded per request."""
+    df = pd.read_csv(path, encoding="utf8", sep=",", dtype={"RS": "str"})
+    df.columns = map(str.lower, df.columns)
+    records = json.loads(df.to_json(orient="records"))
+    sent = 0
+    for i in range(0, len(records), batch_size):
+        sent += len(json.dumps({"query": records[i : i + batch_size]}).encode())
+    return sent
+
+
+def direct_bodies(path: Path, batch_size: int) -> int:
+    sent = 0
+    with pd.read_csv(
+        path, encoding="utf8", sep=",", dtype={"RS": "str"}, chunksize=batch_size
+    ) as reader:
+        for chunk in reader:
+            sent += len(encode_batch(csv_frame_to_records(chunk)))
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (stdlib)'}")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "synthetic.csv"
+        make_synthetic_csv(csv_path, args.rows)
+        results = {}
+        for label, func in (
+            ("to_json + json.loads", roundtrip_bodies),
+            ("column-wise + encode_batch", direct_bodies),
+        ):
+            started = time.perf_counter()
+            sent = func(csv_path, args.batch_size)
+            elapsed = time.perf_counter() - started
+            results[label] = elapsed
+            print(
+                f"{label:<28} {elapsed:>7.2f} s {args.rows / elapsed:>11.0f} rows/s {sent / elapsed / 1e6:>8.1f} MB/s"
+            )
+        before, after = results.values()
+        print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
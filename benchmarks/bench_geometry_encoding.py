@@ -0,0 +1,73 @@
+"""
+Benchmark for the geometry encodings of GeoPackage uploads: encodes a synthetic polygon layer (or a given
+GeoPackage layer) as WKT, WKB hex and EWKB hex, with full precision, rounded coordinates and simplified geometries,
+and reports the encoding time and the size of the encoded batches, uncompressed and gzip compressed.
+
+Example call (from the 'benchmarks' directory, with oem_dpkg installed):
+python bench_geometry_encoding.py --features 50000 --vertices 64 --precision 2 --simplify-tolerance 5
+"""
+
+import argparse
+import gzip
+import time
+
+import geopandas as gpd
+
+from bench_gpkg_conversion import make_synthetic_layer
+from oem_dpkg.utils import encode_batch, gpkg_frame_to_records
+
+
+def measure(label: str, gdf: gpd.GeoDataFrame, batch_size: int, **options) -> None:
+    started = time.perf_counter()
+    records = gpkg_frame_to_records(gdf, **options)
+    elapsed = time.perf_counter() - started
+    raw_bytes = compressed_bytes = 0
+    for start in range(0, len(records), batch_size):
+        body = encode_batch(records[start : start + batch_size])
+        raw_bytes += len(body)
+        compressed_bytes += len(gzip.compress(body, compresslevel=6))
+    print(
+        f"{label:<28} {elapsed:>8.2f} s {raw_bytes / 1e3:>10.0f} kB {compressed_bytes / 1e3:>10.0f} kB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--features", type=int, default=50_000)
+    parser.add_argument("--vertices", type=int, default=64)
+    parser.add_argument("--gpkg", default=None, help="Use a layer of this GeoPackage instead of synthetic data.")
+    parser.add_argument("--layer", default=None)
+    parser.add_argument("--precision", type=int, default=2)
+    parser.add_argument("--simplify-tolerance", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.gpkg:
+        gdf = gpd.read_file(args.gpkg, layer=args.layer)
+    else:
+        gdf = make_synthetic_layer(args.features, args.vertices)
+    print(f"{len(gdf)} features, CRS {gdf.crs}")
+    print(f"{'encoding':<28} {'time':>10} {'raw':>13} {'gzip':>13}")
+    for geometry_format in ("wkt", "wkb", "ewkb"):
+        measure(geometry_format, gdf, args.batch_size, geometry_format=geometry_format)
+        measure(
+            f"{geometry_format}, precision {args.precision}",
+            gdf,
+            args.batch_size,
+            geometry_format=geometry_format,
+            precision=args.precision,
+        )
+        measure(
+            f"{geometry_format}, simplified",
+            gdf,
+            args.batch_size,
+            geometry_format=geometry_format,
+            precision=args.precision,
+            simplify_tolerance=args.simplify_tolerance,
+        )
+
+
+if __name__ == "__main__":
+    main()
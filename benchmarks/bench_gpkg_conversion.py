@@ -0,0 +1,104 @@
+"""
+Benchmark for converting GeoPackage features into upload-ready records: compares the former row-by-row
+conversion ('iterrows' and '.wkt' per geometry) with the vectorized conversion in 'oem_dpkg.utils'
+on a synthetic polygon layer.
+
+Example call (from the 'benchmarks' directory, with oem_dpkg installed):
+python bench_gpkg_conversion.py --features 200000 --vertices 32
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from oem_dpkg.utils import gpkg_frame_to_records, iter_gpkg_batches
+
+
+def make_synthetic_layer(features: int, vertices: int) -> gpd.GeoDataFrame:
+    rng = np.random.default_rng(42)
+    centers = rng.uniform(0, 1_000_000, size=(features, 2))
+    geometries = shapely.buffer(
+        shapely.points(centers), 500, quad_segs=max(1, vertices // 4)
+    )
+    return gpd.GeoDataFrame(
+        {
+            "id": np.arange(features),
+            "region": rng.choice(["DE-ST", "DE-BB", "DE-SN"], size=features),
+            "area": rng.uniform(0, 1e6, size=features),
+            "share": np.where(
+                rng.random(features) < 0.1, np.nan, rng.random(features)
+            ),
+            "updated": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, size=features), unit="D"),
+        },
+        geometry=geometries,
+        crs="EPSG:3035",
+    )
+
+
+def iterrows_to_records(gdf: gpd.GeoDataFrame):
+    """The conversion used before vectorization."""
+    feature_list = []
+    for _, row in gdf.iterrows():
+        feature = row.to_dict()
+        if "geometry" in feature and feature["geometry"] is not None:
+            feature["geometry"] = feature["geometry"].wkt
+        feature_list.append(feature)
+    return feature_list
+
+
+def measure(label: str, rows: int, func) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {elapsed:>8.2f} s {rows / elapsed:>12.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--features", type=int, default=100_000)
+    parser.add_argument("--vertices", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    gdf = make_synthetic_layer(args.features, args.vertices)
+    with tempfile.TemporaryDirectory() as tmp:
+        gpkg_path = Path(tmp) / "synthetic.gpkg"
+        gdf.to_file(gpkg_path, driver="GPKG")
+        gdf = gpd.read_file(gpkg_path)
+
+        before = measure(
+            "iterrows + .wkt", args.features, lambda: iterrows_to_records(gdf)
+        )
+        after = measure(
+            "vectorized (wkt)",
+            args.features,
+            lambda: gpkg_frame_to_records(gdf),
+        )
+        measure(
+            "vectorized (wkb hex)",
+            args.features,
+            lambda: gpkg_frame_to_records(gdf, "wkb"),
+        )
+        measure(
+            "streamed from file (wkt)",
+            args.features,
+            lambda: sum(
+                len(batch)
+                for batch in iter_gpkg_batches(gpkg_path, args.batch_size)
+            ),
+        )
+        print(f"speedup of the conversion: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Packaging benchmark: generates a synthetic input tree (see 'synthetic_datasets.py') and times each phase
+of 'OemDataPackage.create()' separately: copying ('copy_datasets_and_metadata'), resource inference
+('create_resources' without OEM validation), OEM validation ('validate_oem') and writing the package ('create_package').
+With '--incremental', each repetition after the first is an incremental rebuild of the unchanged input.
+The results are printed and written as JSON, so they can be compared between commits.
+
+Example call (from the 'benchmarks' directory):
+python bench_packaging.py --datasets 10 --files-per-dataset 20 --rows 5000 --gpkg-share 0.1 --repeat 3 --json-output packaging.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Dict
+
+from oem_dpkg import OemDataPackage
+from synthetic_datasets import generate_input_tree
+
+PHASES = ["copy", "inference", "validation", "package"]
+
+
+def timed(method, timings: Dict[str, float], phase: str):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started
+
+    return wrapper
+
+
+def run_create(input_path: Path, output_path: Path, args) -> Dict[str, float]:
+    """
+    Creates the data package once and returns the seconds spent in each phase.
+    """
+    package = OemDataPackage(
+        input_path,
+        output_path,
+        "benchmark",
+        "Packaging benchmark",
+        "1.0",
+        incremental=args.incremental,
+        jobs=args.jobs,
+        staging=args.staging,
+    )
+    timings = {}
+    package.copy_datasets_and_metadata = timed(
+        package.copy_datasets_and_metadata, timings, "copy"
+    )
+    package.create_resources = timed(
+        package.create_resources, timings, "create_resources"
+    )
+    package.validate_oem = timed(package.validate_oem, timings, "validation")
+    package.create_package = timed(package.create_package, timings, "package")
+    started = time.perf_counter()
+    package.create()
+    timings["total"] = time.perf_counter() - started
+    # validation runs within create_resources
+    timings["inference"] = timings.pop("create_resources") - timings.get(
+        "validation", 0.0
+    )
+    return {phase: round(timings.get(phase, 0.0), 4) for phase in PHASES + ["total"]}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", type=int, default=5)
+    parser.add_argument("--files-per-dataset", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--gpkg-share", type=float, default=0.1, help="Share of GeoPackage files (0 to 1).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--staging", default="auto")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--json-output", default="packaging_benchmark.json")
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "input"
+        started = time.perf_counter()
+        data_files = generate_input_tree(
+            input_path, args.datasets, args.files_per_dataset, args.rows, args.gpkg_share
+        )
+        input_bytes = sum(os.path.getsize(path) for path in data_files)
+        print(
+            f"Generated {len(data_files)} files ({input_bytes / 1e6:.1f} MB) in {time.perf_counter() - started:.1f} s."
+        )
+        print(f"{'run':>4} " + " ".join(f"{phase:>10}" for phase in PHASES + ["total"]))
+        for run in range(args.repeat):
+            output_path = Path(tmp) / ("output" if args.incremental else f"output_{run}")
+            timings = run_create(input_path, output_path, args)
+            runs.append(timings)
+            print(f"{run:>4} " + " ".join(f"{timings[phase]:>10.3f}" for phase in PHASES + ["total"]))
+
+    result = {
+        "benchmark": "packaging",
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "arguments": vars(args),
+        "input": {"files": len(data_files), "bytes": input_bytes},
+        "runs": runs,
+        "best": {phase: min(run[phase] for run in runs) for phase in PHASES + ["total"]},
+    }
+    with open(args.json_output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=4)
+    print(f"Results written to '{args.json_output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark for the sync mode of 'OepUploadHandler': uploads a synthetic CSV table to a local fake OEP server
+(see 'oem_dpkg.fake_oep_server', with stored rows), then changes a share of its rows (updates, deletions and new rows)
+and brings the table up to date once by synchronizing it ('sync_table') and once by replacing it with a full upload.
+It reports the time, requests and request bytes of both, and checks that the synchronized table equals the local file.
+
+Example call (from the 'benchmarks' directory, with oem_dpkg installed):
+python bench_sync.py --rows 200000 --change-share 0.01 --latency 0.02 --bandwidth 2e6
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+
+from oem_dpkg import OemDataPackage, OepUploadHandler
+from oem_dpkg.fake_oep_server import start_fake_server
+from oem_dpkg.utils import normalize_row_value
+from synthetic_datasets import write_dataset
+
+TABLE = "bench_sync"
+AUTH_HEADERS = {"Authorization": "Token benchmark"}
+
+
+def make_handler(datapackage_path: str, api_url: str, args, sync: bool) -> OepUploadHandler:
+    handler = OepUploadHandler(
+        datapackage_path=datapackage_path,
+        api_url=api_url,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        sync=sync,
+    )
+    handler.extract_dataset_resources(None, [TABLE])
+    return handler
+
+
+def change_table(data_file: Path, share: float, seed: int = 1) -> dict:
+    """
+    Updates, deletes and appends rows of the CSV file (each about a third of the given share of rows).
+    """
+    frame = pd.read_csv(data_file)
+    rng = np.random.default_rng(seed)
+    changes = max(1, int(len(frame) * share / 3))
+    rows = rng.choice(len(frame), size=2 * changes, replace=False)
+    frame.loc[rows[:changes], "power"] += 1.5
+    frame = frame.drop(index=rows[changes:])
+    new_rows = frame.tail(changes).copy()
+    new_rows["id"] = np.arange(changes) + frame["id"].max() + 1
+    pd.concat([frame, new_rows]).to_csv(data_file, index=False)
+    return {"updated": changes, "deleted": changes, "inserted": changes}
+
+
+def run(label: str, handler: OepUploadHandler, func) -> None:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    counters = handler.instrumentation.counters
+    print(
+        f"{label:<14} {elapsed:>8.2f} s {counters.get('upload.requests', 0):>9,.0f} "
+        f"{counters.get('upload.bytes_sent', 0) / 1e6:>10.2f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--change-share", type=float, default=0.01)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency of the fake server in seconds.")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Simulated uplink bytes per second.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OEP_TOKEN", "benchmark")
+    os.environ.setdefault("OEP_USER", "benchmark")
+    server = start_fake_server(
+        latency=args.latency, bandwidth=args.bandwidth, strict=True, store_rows=True
+    )
+    table_url = f"{server.url}/schema/model_draft/tables/{TABLE}/"
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "input"
+        data_file = write_dataset(input_path, TABLE, "csv", args.rows)
+        OemDataPackage(input_path, Path(tmp) / "output", "benchmark", "Sync benchmark", "1.0").create()
+        datapackage_path = str(Path(tmp) / "output" / "datapackage")
+        requests.put(table_url, json={"query": {"columns": []}}).raise_for_status()
+        handler = make_handler(datapackage_path, server.url, args, sync=False)
+        handler.upload_resource(handler.resources[0], AUTH_HEADERS, update_metadata=False)
+
+        expected = change_table(data_file, args.change_share)
+        OemDataPackage(input_path, Path(tmp) / "changed", "benchmark", "Sync benchmark", "1.0").create()
+        datapackage_path = str(Path(tmp) / "changed" / "datapackage")
+        print(f"{args.rows} rows, changes: {expected}")
+        print(f"{'mode':<14} {'time':>10} {'requests':>9} {'request body':>13}")
+
+        handler = make_handler(datapackage_path, server.url, args, sync=True)
+        handler.sync_tables[TABLE] = "id"
+        run("sync", handler, lambda: handler.sync_table(TABLE, handler.resources, AUTH_HEADERS))
+        summary = handler.sync_summary[TABLE]
+        assert {name: summary[name] for name in expected} == expected, summary
+        local = pd.read_csv(data_file).to_dict(orient="records")
+        remote = {
+            str(row["id"]): row for row in server.tables[f"model_draft.{TABLE}"]["data"].values()
+        }
+        assert len(local) == len(remote), (len(local), len(remote))
+        for row in local:
+            assert {key: normalize_row_value(value) for key, value in row.items()} == {
+                key: normalize_row_value(remote[str(row["id"])].get(key)) for key in row
+            }, row
+
+        requests.delete(table_url).raise_for_status()
+        requests.put(table_url, json={"query": {"columns": []}}).raise_for_status()
+        handler = make_handler(datapackage_path, server.url, args, sync=False)
+        run(
+            "full upload",
+            handler,
+            lambda: handler.upload_resource(handler.resources[0], AUTH_HEADERS, update_metadata=False),
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for compressed batch uploads: sends the same synthetic time series rows to a local fake OEP server
+with a simulated uplink bandwidth, once per compression option, and reports the bytes on the wire and the throughput.
+
+Example call (from the 'benchmarks' directory):
+python bench_upload_compression.py --rows 100000 --bandwidth 2000000 --workers 4
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from oem_dpkg import OepUploadHandler
+from oem_dpkg.utils import zstandard
+from oem_dpkg.fake_oep_server import start_fake_server
+
+EXAMPLE_DATAPACKAGE = (
+    Path(__file__).parent.parent
+    / "examples"
+    / "example_output_OemDatapackage"
+    / "datapackage"
+)
+REGIONS = ["DE-BB", "DE-BE", "DE-BY", "DE-HE", "DE-NI", "DE-ST"]
+
+
+def make_batches(rows: int, batch_size: int):
+    start_time = datetime(2024, 1, 1)
+    for start in range(0, rows, batch_size):
+        yield [
+            {
+                "timestamp": (start_time + timedelta(hours=i // len(REGIONS))).isoformat(),
+                "region": REGIONS[i % len(REGIONS)],
+                "power": round((i % 97) * 0.37, 2),
+            }
+            for i in range(start, min(start + batch_size, rows))
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--bandwidth", type=float, default=2_000_000, help="Uplink bytes per second.")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OEP_TOKEN", "benchmark")
+    os.environ.setdefault("OEP_USER", "benchmark")
+    compressions = ["none", "gzip"] + (["zstd"] if zstandard is not None else [])
+    print(f"{'compression':>12} {'seconds':>9} {'rows/s':>12} {'MB sent':>9} {'ratio':>7}")
+    uncompressed_bytes = None
+    for compression in compressions:
+        server = start_fake_server(latency=args.latency, bandwidth=args.bandwidth)
+        try:
+            handler = OepUploadHandler(
+                datapackage_path=str(EXAMPLE_DATAPACKAGE),
+                workers=args.workers,
+                api_url=server.url,
+                compression=compression,
+            )
+            started = time.perf_counter()
+            uploaded = handler.upload_batches(
+                "benchmark_table",
+                make_batches(args.rows, args.batch_size),
+                {"Authorization": "Token benchmark"},
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            server.shutdown()
+        uncompressed_bytes = uncompressed_bytes or server.bytes_received
+        print(
+            f"{compression:>12} {elapsed:>9.2f} {uploaded / elapsed:>12.0f} "
+            f"{server.bytes_received / 1e6:>9.2f} {uncompressed_bytes / server.bytes_received:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
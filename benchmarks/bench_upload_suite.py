@@ -0,0 +1,149 @@
+"""
+Upload benchmark suite: generates synthetic CSV, JSON and GeoPackage datasets of a configurable size,
+packages them with 'OemDataPackage' and uploads each of them to a local fake OEP server with 'OepUploadHandler'
+(including table creation, metadata update and deletion). For each format it reports rows/s, bytes/s on the wire,
+p50/p99 request latency and the peak RSS of the uploading process. Each upload runs in a fresh process,
+so the peak RSS of one format does not carry over to the next.
+
+Example call (from the 'benchmarks' directory):
+python bench_upload_suite.py --rows 100000 --formats csv json gpkg --workers 4 --latency 0.01 --error-rate 0.01
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict
+
+import requests
+
+from oem_dpkg import OemDataPackage, OepUploadHandler
+from oem_dpkg.fake_oep_server import start_fake_server
+from synthetic_datasets import write_dataset
+
+
+def upload_case(
+    datapackage_path: str,
+    dataset_name: str,
+    api_url: str,
+    workers: int,
+    batch_size: int,
+) -> Dict[str, Any]:
+    """
+    Uploads one resource of the data package and returns its measurements (run in a separate process).
+    """
+    os.environ.setdefault("OEP_TOKEN", "benchmark")
+    os.environ.setdefault("OEP_USER", "benchmark")
+    handler = OepUploadHandler(
+        datapackage_path=datapackage_path,
+        api_url=api_url,
+        workers=workers,
+        batch_size=batch_size,
+    )
+    latencies = []
+    handler.session.hooks["response"].append(
+        lambda response, *args, **kwargs: latencies.append(
+            response.elapsed.total_seconds()
+        )
+    )
+    handler.extract_dataset_resources(None, [dataset_name])
+    package_resource = handler.resources[0]
+    started = time.perf_counter()
+    handler.upload_resource(
+        package_resource, {"Authorization": "Token benchmark"}
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": elapsed,
+        "latencies": latencies,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def percentile(values, percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "json", "gpkg"], choices=["csv", "json", "gpkg"])
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.01, help="Latency of the fake server in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of insert requests that fail.")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Simulated uplink bytes per second.")
+    parser.add_argument("--json-output", default=None, help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    server = start_fake_server(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        bandwidth=args.bandwidth,
+        strict=True,
+        seed=0,
+    )
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "input"
+        for file_format in args.formats:
+            write_dataset(input_path, f"bench_{file_format}", file_format, args.rows)
+        OemDataPackage(
+            input_path, Path(tmp) / "output", "benchmark", "Upload benchmark", "1.0"
+        ).create()
+        datapackage_path = str(Path(tmp) / "output" / "datapackage")
+
+        print(
+            f"{'format':>7} {'rows':>9} {'seconds':>8} {'rows/s':>9} {'MB/s':>7} "
+            f"{'p50 ms':>7} {'p99 ms':>7} {'errors':>6} {'peak RSS MB':>11}"
+        )
+        spawn = multiprocessing.get_context("spawn")
+        for file_format in args.formats:
+            name = f"bench_{file_format}"
+            table_url = f"{server.url}/schema/model_draft/tables/{name}/"
+            requests.put(table_url, json={"query": {"columns": []}}).raise_for_status()
+            received_before, errors_before = server.bytes_received, server.errors
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                case = executor.submit(
+                    upload_case,
+                    datapackage_path,
+                    name,
+                    server.url,
+                    args.workers,
+                    args.batch_size,
+                ).result()
+            rows = server.tables[f"model_draft.{name}"]["rows"]
+            requests.delete(table_url).raise_for_status()
+            result = {
+                "format": file_format,
+                "rows": rows,
+                "seconds": case["seconds"],
+                "rows_per_second": rows / case["seconds"],
+                "bytes_per_second": (server.bytes_received - received_before) / case["seconds"],
+                "p50_latency_ms": percentile(case["latencies"], 50) * 1000,
+                "p99_latency_ms": percentile(case["latencies"], 99) * 1000,
+                "errors": server.errors - errors_before,
+                "peak_rss_mb": case["peak_rss_mb"],
+            }
+            results.append(result)
+            print(
+                f"{file_format:>7} {rows:>9} {result['seconds']:>8.2f} {result['rows_per_second']:>9.0f} "
+                f"{result['bytes_per_second'] / 1e6:>7.2f} {result['p50_latency_ms']:>7.1f} "
+                f"{result['p99_latency_ms']:>7.1f} {result['errors']:>6} {result['peak_rss_mb']:>11.0f}"
+            )
+    server.shutdown()
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump({"arguments": vars(args), "results": results}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for the upload transports: sends the same synthetic rows to a local fake OEP server
+once per transport ('json' rows to the table API, 'columnar' batches to the advanced insert API)
+and reports the bytes on the wire and the resulting throughput.
+
+Example call (from the 'benchmarks' directory):
+python bench_upload_transport.py --rows 200000 --columns 12 --batch-size 2000 --latency 0.02 --workers 4
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from oem_dpkg import OepUploadHandler
+from oem_dpkg.fake_oep_server import start_fake_server
+
+EXAMPLE_DATAPACKAGE = (
+    Path(__file__).parent.parent
+    / "examples"
+    / "example_output_OemDatapackage"
+    / "datapackage"
+)
+
+
+def make_batches(rows: int, columns: int, batch_size: int):
+    names = [f"column_{c:02d}" for c in range(columns)]
+    for start in range(0, rows, batch_size):
+        yield [
+            {name: i * 0.5 + c for c, name in enumerate(names)}
+            for i in range(start, min(start + batch_size, rows))
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OEP_TOKEN", "benchmark")
+    os.environ.setdefault("OEP_USER", "benchmark")
+    print(f"{'transport':>10} {'seconds':>9} {'rows/s':>12} {'MB sent':>9} {'bytes/row':>10}")
+    for transport in ("json", "columnar"):
+        server = start_fake_server(latency=args.latency)
+        try:
+            handler = OepUploadHandler(
+                datapackage_path=str(EXAMPLE_DATAPACKAGE),
+                workers=args.workers,
+                api_url=server.url,
+                transport=transport,
+            )
+            started = time.perf_counter()
+            uploaded = handler.upload_batches(
+                "benchmark_table",
+                make_batches(args.rows, args.columns, args.batch_size),
+                {"Authorization": "Token benchmark"},
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            server.shutdown()
+        print(
+            f"{transport:>10} {elapsed:>9.2f} {uploaded / elapsed:>12.0f} "
+            f"{server.bytes_received / 1e6:>9.1f} {server.bytes_received / uploaded:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark for concurrent batch uploads: sends the same synthetic rows to a local fake OEP server
+with an increasing number of workers and reports the resulting throughput.
+
+Example call (from the 'benchmarks' directory):
+python bench_upload_workers.py --rows 200000 --batch-size 2000 --latency 0.05 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from oem_dpkg import OepUploadHandler
+from oem_dpkg.fake_oep_server import start_fake_server
+
+EXAMPLE_DATAPACKAGE = (
+    Path(__file__).parent.parent
+    / "examples"
+    / "example_output_OemDatapackage"
+    / "datapackage"
+)
+
+
+def make_batches(rows: int, batch_size: int):
+    for start in range(0, rows, batch_size):
+        yield [
+            {"id": i, "region": "DE", "value": i * 0.5}
+            for i in range(start, min(start + batch_size, rows))
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    os.environ.setdefault("OEP_TOKEN", "benchmark")
+    os.environ.setdefault("OEP_USER", "benchmark")
+    server = start_fake_server(latency=args.latency)
+    try:
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            handler = OepUploadHandler(
+                datapackage_path=str(EXAMPLE_DATAPACKAGE),
+                workers=workers,
+                api_url=server.url,
+            )
+            started = time.perf_counter()
+            uploaded = handler.upload_batches(
+                "benchmark_table",
+                make_batches(args.rows, args.batch_size),
+                {"Authorization": "Token benchmark"},
+            )
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>8} {elapsed:>9.2f} {uploaded / elapsed:>12.0f} {baseline / elapsed:>7.1f}x"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Generates synthetic input datasets (time series tables as CSV, JSON or GeoPackage files, with OEM metadata)
+in the input folder structure expected by 'OemDataPackage', for benchmarks: single datasets with one table,
+or whole input trees with a configurable number of datasets, files per dataset, rows and CSV/GeoPackage mix.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+REGIONS = ["DE-BB", "DE-BE", "DE-BY", "DE-HE", "DE-NI", "DE-ST"]
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Creates a time series table with an id, a timestamp, a region code and two values per row.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="h").strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            ),
+            "region": np.array(REGIONS)[np.arange(rows) % len(REGIONS)],
+            "power": rng.uniform(0, 100, rows).round(3),
+            "capacity": rng.integers(1, 500, rows),
+        }
+    )
+
+
+def make_table_metadata(table: str, geometry: bool) -> dict:
+    fields = [
+        {"name": "id", "type": "integer"},
+        {"name": "timestamp", "type": "timestamp"},
+        {"name": "region", "type": "text"},
+        {"name": "power", "type": "float"},
+        {"name": "capacity", "type": "integer"},
+    ]
+    if geometry:
+        fields.append({"name": "geometry", "type": "geometry(Point, 3035)"})
+    return {
+        "name": table,
+        "schema": {"fields": fields, "primaryKey": ["id"], "foreignKeys": []},
+    }
+
+
+def make_metadata(dataset: str, tables: Dict[str, bool]) -> dict:
+    """
+    Creates OEM metadata for a dataset with the given tables (and whether they have a geometry column).
+    """
+    return {
+        "name": dataset,
+        "title": f"Synthetic dataset '{dataset}'",
+        "id": dataset,
+        "description": "Synthetic time series for benchmarks.",
+        "resources": [
+            make_table_metadata(table, geometry) for table, geometry in tables.items()
+        ],
+        "metaMetadata": {
+            "metadataVersion": "OEP-1.6.0",
+            "metadataLicense": {
+                "name": "CC0-1.0",
+                "title": "Creative Commons Zero v1.0 Universal",
+                "path": "https://creativecommons.org/publicdomain/zero/1.0/",
+            },
+        },
+    }
+
+
+def write_table(data_file: Path, file_format: str, rows: int, seed: int = 0) -> None:
+    """
+    Writes a time series table of the given format ('csv', 'json' or 'gpkg').
+    """
+    frame = make_frame(rows, seed)
+    if file_format == "csv":
+        frame.to_csv(data_file, index=False)
+    elif file_format == "json":
+        frame.to_json(data_file, orient="records")
+    elif file_format == "gpkg":
+        rng = np.random.default_rng(seed + 1)
+        geometry = gpd.points_from_xy(
+            rng.uniform(4.4e6, 4.6e6, rows), rng.uniform(3.1e6, 3.3e6, rows)
+        )
+        gpd.GeoDataFrame(frame, geometry=geometry, crs="EPSG:3035").to_file(
+            data_file, driver="GPKG"
+        )
+    else:
+        raise ValueError(f"Unknown format '{file_format}'.")
+
+
+def write_dataset(
+    input_path: Union[str, Path], dataset: str, file_format: str, rows: int
+) -> Path:
+    """
+    Writes a dataset with one table of the given format ('csv', 'json' or 'gpkg') and its OEM metadata.
+    The table is named like the dataset.
+
+    Returns:
+    - Path: The path to the data file.
+    """
+    dataset_path = Path(input_path) / dataset
+    (dataset_path / "data").mkdir(parents=True, exist_ok=True)
+    data_file = dataset_path / "data" / f"{dataset}.{file_format}"
+    write_table(data_file, file_format, rows)
+    with open(dataset_path / "metadata.json", "w", encoding="utf-8") as f:
+        json.dump(make_metadata(dataset, {dataset: file_format == "gpkg"}), f, indent=4)
+    return data_file
+
+
+def generate_input_tree(
+    input_path: Union[str, Path],
+    datasets: int,
+    files_per_dataset: int,
+    rows: int,
+    gpkg_share: float = 0.0,
+    seed: int = 0,
+) -> List[Path]:
+    """
+    Generates an input tree of several datasets, each with several tables and OEM metadata describing them.
+    The tables are CSV files, except for a share of GeoPackage files, spread evenly over the tree.
+
+    Parameters:
+    - input_path (Union[str, Path]): The directory to create the datasets in.
+    - datasets (int): Number of datasets.
+    - files_per_dataset (int): Number of tables (data files) per dataset.
+    - rows (int): Number of rows per table.
+    - gpkg_share (float): Share of the tables written as GeoPackage files (0 to 1).
+    - seed (int): Seed for the generated values.
+
+    Returns:
+    - List[Path]: The paths to the data files.
+    """
+    data_files = []
+    gpkg_files = 0
+    for d in range(datasets):
+        dataset = f"dataset_{d:03d}"
+        dataset_path = Path(input_path) / dataset
+        (dataset_path / "data").mkdir(parents=True, exist_ok=True)
+        tables = {}
+        for f in range(files_per_dataset):
+            number = d * files_per_dataset + f
+            # spread the GeoPackage files evenly: write one whenever the share is not yet reached
+            gpkg = gpkg_files < round((number + 1) * gpkg_share)
+            gpkg_files += gpkg
+            table = f"{dataset}_table_{f:03d}"
+            data_file = dataset_path / "data" / f"{table}.{'gpkg' if gpkg else 'csv'}"
+            write_table(data_file, "gpkg" if gpkg else "csv", rows, seed + number)
+            tables[table] = gpkg
+            data_files.append(data_file)
+        with open(dataset_path / "metadata.json", "w", encoding="utf-8") as fp:
+            json.dump(make_metadata(dataset, tables), fp, indent=4)
+    return data_files
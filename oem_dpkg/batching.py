@@ -0,0 +1,148 @@
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class BatchSizer:
+    """
+    Chooses the number of rows per upload batch from the feedback of previous requests.
+
+    In adaptive mode the batch size grows while requests are answered faster than 'min_latency'
+    and shrinks when they take longer than 'max_latency' or fail because the request was too large or too slow
+    (HTTP 413, HTTP 504 or timeouts). Independent of the latency, a batch is never planned larger than what fits into
+    'target_bytes', based on the observed payload bytes per row. Without adaptive mode the size stays fixed.
+    The sizer is thread-safe, so it can be shared by concurrent upload workers of one table.
+
+    Parameters:
+        initial_rows (int): Number of rows of the first batch.
+        adaptive (bool): If False, every batch has 'initial_rows' rows.
+        min_rows (int): Lower bound for the batch size.
+        max_rows (int): Upper bound for the batch size.
+        target_bytes (int): Payload size a single request should not exceed.
+        min_latency (float): Requests faster than this (in seconds) let the batch size grow.
+        max_latency (float): Requests slower than this (in seconds) let the batch size shrink.
+    """
+
+    def __init__(
+        self,
+        initial_rows: int = 2000,
+        adaptive: bool = True,
+        min_rows: int = 50,
+        max_rows: int = 50000,
+        target_bytes: int = 8 * 1024 * 1024,
+        min_latency: float = 1.0,
+        max_latency: float = 10.0,
+    ) -> None:
+        self.adaptive: bool = adaptive
+        self.min_rows: int = min(min_rows, initial_rows)
+        self.max_rows: int = max(max_rows, initial_rows)
+        self.target_bytes: int = target_bytes
+        self.min_latency: float = min_latency
+        self.max_latency: float = max_latency
+        self.size: int = initial_rows
+        self._bytes_per_row: Optional[float] = None
+        self._sizes: List[int] = []
+        self._shrinks: int = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, rows: int, nbytes: int, latency: float) -> None:
+        """
+        Records an acknowledged batch and adjusts the batch size.
+
+        Parameters:
+            rows (int): Number of rows in the batch.
+            nbytes (int): Size of the request payload in bytes.
+            latency (float): Duration of the request in seconds.
+        """
+        with self._lock:
+            self._sizes.append(rows)
+            if not self.adaptive or rows == 0:
+                return
+            bytes_per_row = nbytes / rows
+            self._bytes_per_row = (
+                bytes_per_row
+                if self._bytes_per_row is None
+                else (self._bytes_per_row + bytes_per_row) / 2
+            )
+            size = self.size
+            if latency > self.max_latency:
+                size = min(size, int(rows * self.max_latency / latency))
+                self._shrinks += 1
+            elif latency < self.min_latency and rows >= self.size:
+                size = size * 2
+            byte_limit = int(self.target_bytes / self._bytes_per_row)
+            self.size = max(self.min_rows, min(size, byte_limit, self.max_rows))
+
+    def record_failure(self) -> int:
+        """
+        Records a batch that was rejected for being too large or too slow and halves the batch size.
+
+        Returns:
+            int: The new batch size.
+        """
+        with self._lock:
+            if self.adaptive:
+                self.size = max(self.min_rows, self.size // 2)
+                self._shrinks += 1
+            return self.size
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarizes the batch sizes used so far.
+
+        Returns:
+            Dict[str, Any]: Number of batches, smallest, largest and mean batch size,
+                the current (final) size and how often the size was reduced.
+        """
+        with self._lock:
+            sizes = self._sizes
+            return {
+                "batches": len(sizes),
+                "min_rows": min(sizes) if sizes else 0,
+                "max_rows": max(sizes) if sizes else 0,
+                "mean_rows": round(sum(sizes) / len(sizes)) if sizes else 0,
+                "final_rows": self.size,
+                "shrinks": self._shrinks,
+            }
+
+
+def rebatch(
+    chunks: Iterable[List[Any]],
+    sizer: BatchSizer,
+    fixed_batches: Optional[Dict[int, Tuple[int, Any]]] = None,
+) -> Iterator[List[Any]]:
+    """
+    Re-slices chunks of rows (as read from a file) into batches of the size currently chosen by the sizer.
+
+    Parameters:
+        chunks (Iterable[List[Any]]): Chunks of rows in file order.
+        sizer (BatchSizer): Provides the size of the next batch.
+        fixed_batches (Optional[Dict[int, Tuple[int, Any]]]): Batches whose boundaries must be reproduced,
+            given as number of rows by row offset (e.g. batches recorded in the upload journal).
+            Other batches end at the next of these offsets at the latest, so they never overlap them.
+
+    Yields:
+        List[Any]: The next batch of rows.
+    """
+    fixed_batches = fixed_batches or {}
+    fixed_offsets = sorted(fixed_batches)
+    buffer: List[Any] = []
+    offset = 0
+    chunks = iter(chunks)
+    exhausted = False
+    while True:
+        size = fixed_batches.get(offset, (sizer.size,))[0]
+        next_fixed = bisect_right(fixed_offsets, offset)
+        if next_fixed < len(fixed_offsets):
+            size = min(size, fixed_offsets[next_fixed] - offset)
+        while len(buffer) < size and not exhausted:
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                buffer.extend(chunk)
+        if not buffer:
+            return
+        batch, buffer = buffer[:size], buffer[size:]
+        offset += len(batch)
+        yield batch
@@ -1,5 +1,12 @@
 import click
 from oem_dpkg import OepUploadHandler, OemDataPackage
+from oem_dpkg.instrumentation import (
+    Instrumentation,
+    JsonFileSink,
+    LogSink,
+    PrometheusTextfileSink,
+)
+from oem_dpkg.retry import RetryPolicy
 
 
 """
@@ -11,7 +18,7 @@ This script provides a CLI (Command Line Interface) for managing and uploading d
 Example calls:
 oem_dpkg create-package "input/path" "output/path" "name" "description" "version" --oem
 
-oem_dpkg oep-upload "/path/to/datapackage.json" --dataset_selection "dataset1" --dataset_selection "dataset2" --schema "model_draft"
+oem_dpkg oep-upload "/path/to/datapackage.json" --dataset_selection "dataset1" --dataset_selection "dataset2" --schema "model_draft" --workers 4
 """
 
 
@@ -21,6 +28,34 @@ def cli():
     pass
 
 
+def profiling_options(command):
+    """Adds the '--profile' and '--metrics-file' options to a command."""
+    command = click.option(
+        "--metrics-file",
+        default=None,
+        type=click.Path(dir_okay=False),
+        help="Write timings and counters to this file: Prometheus text format if it ends with '.prom', JSON otherwise.",
+    )(command)
+    return click.option(
+        "--profile",
+        is_flag=True,
+        help="Print a breakdown of the time spent in each phase at the end.",
+    )(command)
+
+
+def make_instrumentation(profile, metrics_file):
+    """Creates the instrumentation with the sinks selected by the profiling options."""
+    sinks = []
+    if profile:
+        sinks.append(LogSink())
+    if metrics_file:
+        if metrics_file.endswith(".prom"):
+            sinks.append(PrometheusTextfileSink(metrics_file))
+        else:
+            sinks.append(JsonFileSink(metrics_file))
+    return Instrumentation(sinks)
+
+
 @cli.command()
 @click.argument("input_path", type=click.Path(exists=True))
 @click.argument("output_path")
@@ -30,12 +65,83 @@ def cli():
 @click.option(
     "--oem", is_flag=True, help="Include OEM metadata in the package."
 )
-def create_package(input_path, output_path, name, description, version, oem):
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Reuse the results of the previous build for unchanged files.",
+)
+@click.option(
+    "--jobs",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of processes used to infer resources in parallel.",
+)
+@click.option(
+    "--staging",
+    default="auto",
+    show_default=True,
+    type=click.Choice(["auto", "copy", "reflink", "hardlink", "symlink"]),
+    help="How data files are placed into the package. 'auto' uses reflinks or hardlinks where possible and copies otherwise.",
+)
+@click.option(
+    "--inference",
+    default="head",
+    show_default=True,
+    type=click.Choice(["head", "reservoir", "full"]),
+    help="Which rows the field types of tables are inferred from: the first rows, rows spread across the file, or all rows (slow).",
+)
+@click.option(
+    "--inference-sample-size",
+    default=100,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of rows sampled by the 'head' and 'reservoir' inference.",
+)
+@click.option(
+    "--oem-schemas",
+    is_flag=True,
+    help="Use the field types declared in the OEM metadata instead of inferring them, where the field names match the file.",
+)
+@profiling_options
+def create_package(
+    input_path,
+    output_path,
+    name,
+    description,
+    version,
+    oem,
+    incremental,
+    jobs,
+    staging,
+    inference,
+    inference_sample_size,
+    oem_schemas,
+    profile,
+    metrics_file,
+):
     """Creates a datapackage from input files."""
+    instrumentation = make_instrumentation(profile, metrics_file)
     package = OemDataPackage(
-        input_path, output_path, name, description, version, oem=oem
+        input_path,
+        output_path,
+        name,
+        description,
+        version,
+        oem=oem,
+        incremental=incremental,
+        jobs=jobs,
+        staging=staging,
+        instrumentation=instrumentation,
+        inference=inference,
+        inference_sample_size=inference_sample_size,
+        use_oem_schemas=oem_schemas,
     )
-    package.create()
+    try:
+        package.create()
+    finally:
+        # the timings of a failed run are reported as well
+        instrumentation.emit()
 
 
 @cli.command()
@@ -49,8 +155,115 @@ def create_package(input_path, output_path, name, description, version, oem):
 @click.option(
     "--schema", default="model_draft", help="Schema to use in the OEP database."
 )
-def oep_upload(datapackage_path, dataset_selection, schema):
+@click.option(
+    "--api-url",
+    default=None,
+    envvar="OEP_API_URL",
+    help="Base URL of the OEP API, e.g. of a local test instance. Defaults to 'https://openenergy-platform.org/api/v0'.",
+)
+@click.option(
+    "--workers",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of batches of a table that are uploaded concurrently.",
+)
+@click.option(
+    "--parallel-tables",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of tables that are uploaded concurrently. Tables referencing other tables via foreign keys wait for them.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume an interrupted upload, skipping batches that were already acknowledged by the OEP.",
+)
+@click.option(
+    "--batch-size",
+    default=2000,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of rows per batch (initial size when batches are sized adaptively).",
+)
+@click.option(
+    "--adaptive-batching/--fixed-batching",
+    default=True,
+    show_default=True,
+    help="Adjust the batch size to the observed request latency and payload size.",
+)
+@click.option(
+    "--transport",
+    default="json",
+    show_default=True,
+    type=click.Choice(["json", "columnar"]),
+    help="'json' sends rows as objects to the table API, 'columnar' sends column names once per batch to the advanced insert API (falls back to 'json' if unavailable).",
+)
+@click.option(
+    "--compression",
+    default="none",
+    show_default=True,
+    type=click.Choice(["none", "auto", "gzip", "zstd"]),
+    help="Compress request bodies (HTTP Content-Encoding). 'auto' uses zstd if 'zstandard' is installed, else gzip. Falls back to uncompressed requests if the server rejects them.",
+)
+@click.option(
+    "--max-retries",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Number of times a failed request is retried (with exponential backoff). Row inserts are only retried if the OEP did not process them.",
+)
+@click.option(
+    "--geometry-format",
+    default="wkt",
+    show_default=True,
+    type=click.Choice(["wkt", "ewkt", "wkb", "ewkb"]),
+    help="Encoding of GeoPackage geometries: WKT, WKT with SRID, hex-encoded WKB or hex-encoded EWKB (WKB with SRID).",
+)
+@click.option(
+    "--coordinate-precision",
+    default=None,
+    type=int,
+    help="Round GeoPackage coordinates to this number of decimal places (in units of the layer's CRS). Defaults to full precision.",
+)
+@click.option(
+    "--simplify-tolerance",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Simplify GeoPackage geometries with this tolerance (in units of the layer's CRS), preserving their topology.",
+)
+@click.option(
+    "--sync",
+    is_flag=True,
+    help="Synchronize existing tables instead of replacing them: only new, changed and removed rows (by primary key) are sent.",
+)
+@profiling_options
+def oep_upload(
+    datapackage_path,
+    dataset_selection,
+    schema,
+    api_url,
+    workers,
+    parallel_tables,
+    resume,
+    batch_size,
+    adaptive_batching,
+    transport,
+    compression,
+    max_retries,
+    geometry_format,
+    coordinate_precision,
+    simplify_tolerance,
+    sync,
+    profile,
+    metrics_file,
+):
     """Uploads data to the OEP database. If dataset selection is given, only those are handled; otherwise, all datasets in the datapackage are processed."""
+    instrumentation = make_instrumentation(profile, metrics_file)
+    retry_policy = RetryPolicy(
+        max_attempts=max_retries + 1, instrumentation=instrumentation
+    )
     dataset_selection_list = (
         list(dataset_selection) if dataset_selection else None
     )
@@ -58,8 +271,26 @@ def oep_upload(datapackage_path, dataset_selection, schema):
         datapackage_path=datapackage_path,
         oep_schema=schema,
         dataset_selection=dataset_selection_list,
+        api_url=api_url,
+        workers=workers,
+        parallel_tables=parallel_tables,
+        resume=resume,
+        batch_size=batch_size,
+        adaptive_batching=adaptive_batching,
+        transport=transport,
+        compression=compression,
+        instrumentation=instrumentation,
+        retry_policy=retry_policy,
+        geometry_format=geometry_format,
+        coordinate_precision=coordinate_precision,
+        simplify_tolerance=simplify_tolerance,
+        sync=sync,
     )
-    handler.run_all()
+    try:
+        handler.run_all()
+    finally:
+        # the timings of a failed run are reported as well
+        instrumentation.emit()
 
 
 if __name__ == "__main__":
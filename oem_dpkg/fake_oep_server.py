@@ -0,0 +1,354 @@
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    import zstandard
+except ImportError:  # optional, zstd compressed requests are rejected without it
+    zstandard = None
+
+TABLE_PATH_PATTERN = re.compile(
+    r"^/api/v0/schema/(?P<schema>[^/]+)/tables/(?P<table>[^/]+)/?(?P<endpoint>[^?]*)"
+)
+
+
+class FakeOepServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the OEP API, to run and measure uploads without touching openenergy-platform.org.
+
+    It implements the endpoints used by 'OepUploadHandler' and 'OepClient': table creation, lookup and deletion
+    ('/schema/<schema>/tables/<table>/'), row inserts ('.../rows/new' and '/advanced/insert') and table metadata
+    ('.../meta/'). By default, tables only keep their definition, metadata and row count, not the rows themselves.
+    With 'store_rows', the rows are kept by their 'id' and can be read in pages ('.../rows/?limit=&offset=&orderby=&column='),
+    replaced ('PUT .../rows/<id>') and deleted ('DELETE .../rows/<id>'), as needed for synchronizing tables.
+    Request bodies may be gzip or zstd compressed. Latency, a limited uplink bandwidth and failing inserts
+    can be injected. The advanced connection API of oedialect is not implemented.
+
+    Parameters:
+        address (Tuple[str, int]): Host and port to listen on (port 0 picks a free port).
+        latency (float): Seconds the server waits before answering a request. Default is 0.
+        error_rate (float): Share of insert requests that are answered with 'error_status'. Default is 0.
+        error_status (int): HTTP status code of injected errors. Default is 500.
+        retry_after (Optional[float]): If given, injected errors carry a 'Retry-After' header with these seconds. Default is None.
+        strict (bool): If True, inserts into tables that were not created answer 404; otherwise the tables are created on the fly. Default is False.
+        advanced_insert (bool): If False, the advanced insert API answers 404. Default is True.
+        compression (bool): If False, compressed request bodies are answered with 415. Default is True.
+        bandwidth (Optional[float]): Simulated uplink bandwidth in bytes per second, shared by all requests. Default is None (unlimited).
+        seed (Optional[int]): Seed for the injected errors.
+        store_rows (bool): If True, inserted rows are stored (see above). Default is False.
+
+    Attributes:
+        url (str): Base URL of the fake API, to be passed as 'api_url'.
+        tables (Dict[str, Dict[str, Any]]): Definition, metadata, row count and (with 'store_rows') rows by id
+            of each table, by '<schema>.<table>'.
+        requests (int): Number of successfully answered insert requests.
+        rows (int): Number of inserted rows.
+        bytes_received (int): Number of request body bytes of successfully answered insert requests (as sent, i.e. compressed).
+        errors (int): Number of injected errors.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        retry_after: Optional[float] = None,
+        strict: bool = False,
+        advanced_insert: bool = True,
+        compression: bool = True,
+        bandwidth: Optional[float] = None,
+        seed: Optional[int] = None,
+        store_rows: bool = False,
+    ) -> None:
+        super().__init__(address, FakeOepRequestHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.strict = strict
+        self.advanced_insert = advanced_insert
+        self.compression = compression
+        self.bandwidth = bandwidth
+        self.random = random.Random(seed)
+        self.store_rows = store_rows
+        self.lock = threading.Lock()
+        self.uplink = threading.Lock()
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self.rows = 0
+        self.bytes_received = 0
+        self.errors = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v0"
+
+    def inject_error(self) -> bool:
+        """
+        Decides whether the current insert request fails, according to the error rate.
+        """
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                return True
+        return False
+
+    def new_table(self, definition: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "definition": definition,
+            "metadata": {},
+            "rows": 0,
+            "data": {},
+            "next_id": 1,
+            "ordered": None,
+        }
+
+    def insert(self, table_key: str, rows: List[Dict[str, Any]], received: int) -> bool:
+        """
+        Records an insert of rows into a table. Stored rows without id get the next free one, as from a serial column.
+
+        Returns:
+            bool: False if the table does not exist and the server is strict.
+        """
+        with self.lock:
+            if table_key not in self.tables:
+                if self.strict:
+                    return False
+                self.tables[table_key] = self.new_table({})
+            table = self.tables[table_key]
+            if self.store_rows:
+                for row in rows:
+                    if row.get("id") is None:
+                        row = {**row, "id": table["next_id"]}
+                    table["next_id"] = max(table["next_id"], int(row["id"]) + 1)
+                    table["data"][str(row["id"])] = row
+                table["rows"] = len(table["data"])
+                table["ordered"] = None
+            else:
+                table["rows"] += len(rows)
+            self.requests += 1
+            self.rows += len(rows)
+            self.bytes_received += received
+        return True
+
+    def read_rows(self, table: Dict[str, Any], query: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        """
+        Returns a page of the stored rows of a table, ordered and restricted to columns as requested.
+        The order is kept until the table changes, so that reading a table page by page does not sort it for every page.
+        """
+        column = query.get("orderby", [None])[0]
+        with self.lock:
+            if table["ordered"] is not None and table["ordered"][0] == column:
+                rows = table["ordered"][1]
+            else:
+                rows = list(table["data"].values())
+                if column is not None:
+                    rows.sort(key=lambda row: (row.get(column) is None, row.get(column)))
+                table["ordered"] = (column, rows)
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query["limit"][0]) if "limit" in query else len(rows)
+        rows = rows[offset : offset + limit]
+        if "column" in query:
+            rows = [{column: row.get(column) for column in query["column"]} for row in rows]
+        return rows
+
+
+class FakeOepRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, which would wait for delayed ACKs on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self) -> Tuple[Optional[Any], int]:
+        """
+        Reads and decodes the JSON request body, after the simulated transfer time and latency.
+
+        Returns:
+            Tuple[Optional[Any], int]: The decoded body (None if empty or rejected) and the number of bytes received.
+        """
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        received = len(body)
+        if self.server.bandwidth:
+            # all requests share the simulated uplink, so transfers are serialized
+            with self.server.uplink:
+                time.sleep(received / self.server.bandwidth)
+        time.sleep(self.server.latency)
+        content_encoding = self.headers.get("Content-Encoding")
+        if content_encoding:
+            if not self.server.compression or content_encoding not in (
+                ("gzip", "zstd") if zstandard is not None else ("gzip",)
+            ):
+                self.respond(415, {"reason": "Unsupported media type"})
+                return None, received
+            if content_encoding == "gzip":
+                body = gzip.decompress(body)
+            else:
+                body = zstandard.ZstdDecompressor().decompress(body)
+        return (json.loads(body) if body else {}), received
+
+    def table_route(self) -> Optional[Tuple[str, str]]:
+        """
+        Returns the table key ('<schema>.<table>') and the endpoint below the table URL, if the path is a table URL.
+        """
+        match = TABLE_PATH_PATTERN.match(self.path)
+        if match is None:
+            return None
+        return (
+            f"{match['schema']}.{match['table']}",
+            match["endpoint"].strip("/"),
+        )
+
+    def row_id(self, route: Optional[Tuple[str, str]]) -> Optional[str]:
+        """
+        Returns the id of the row addressed by a '.../rows/<id>' URL, if stored rows are enabled.
+        """
+        if route is None or not self.server.store_rows or not route[1].startswith("rows/"):
+            return None
+        row_id = unquote(route[1][len("rows/") :])
+        return row_id if row_id and row_id != "new" else None
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        route = self.table_route()
+        table = self.server.tables.get(route[0]) if route else None
+        if table is None:
+            self.respond(404, {"reason": "not found"})
+        elif route[1] == "meta":
+            self.respond(200, table["metadata"])
+        elif route[1] == "rows" and self.server.store_rows:
+            self.respond(200, self.server.read_rows(table, parse_qs(urlsplit(self.path).query)))
+        elif route[1] == "":
+            schema, name = route[0].split(".", 1)
+            self.respond(
+                200,
+                {"schema": schema, "name": name, **table["definition"]},
+            )
+        else:
+            self.respond(404, {"reason": "not found"})
+
+    def do_PUT(self):
+        data, _ = self.read_body()
+        route = self.table_route()
+        if data is None:
+            return
+        row_id = self.row_id(route)
+        if row_id is not None:
+            with self.server.lock:
+                table = self.server.tables.get(route[0])
+                if table is not None:
+                    created = row_id not in table["data"]
+                    table["data"][row_id] = {**data["query"], "id": data["query"].get("id", row_id)}
+                    table["rows"] = len(table["data"])
+                    table["ordered"] = None
+            if table is None:
+                self.respond(404, {"reason": "not found"})
+            else:
+                self.respond(201 if created else 200, {})
+            return
+        if route is None or route[1]:
+            self.respond(404, {"reason": "not found"})
+            return
+        with self.server.lock:
+            if route[0] in self.server.tables:
+                self.respond(400, {"reason": "table already exists"})
+                return
+            self.server.tables[route[0]] = self.server.new_table(data.get("query", {}))
+        self.respond(201, {})
+
+    def do_DELETE(self):
+        time.sleep(self.server.latency)
+        route = self.table_route()
+        row_id = self.row_id(route)
+        with self.server.lock:
+            deleted = None
+            if row_id is not None:
+                table = self.server.tables.get(route[0])
+                if table is not None:
+                    deleted = table["data"].pop(row_id, None)
+                if deleted is not None:
+                    table["rows"] -= 1
+                    table["ordered"] = None
+            elif route is not None and not route[1]:
+                deleted = self.server.tables.pop(route[0], None)
+        if deleted is None:
+            self.respond(404, {"reason": "not found"})
+        else:
+            self.respond(200, {})
+
+    def do_POST(self):
+        data, received = self.read_body()
+        if data is None:
+            return
+        route = self.table_route()
+        path = self.path.rstrip("/")
+        if route is not None and route[1] == "meta":
+            with self.server.lock:
+                table = self.server.tables.get(route[0])
+                if table is not None:
+                    table["metadata"] = data
+            if table is None:
+                self.respond(404, {"reason": "not found"})
+            else:
+                self.respond(200, data)
+            return
+        if route is not None and route[1] == "rows/new":
+            table_key = route[0]
+            rows = data["query"]
+        elif path.endswith("/advanced/insert") and self.server.advanced_insert:
+            query = data["query"]
+            table_key = f"{query['schema']}.{query['table']}"
+            rows = [dict(zip(query["fields"], values)) for values in query["values"]]
+        else:
+            self.respond(404, {"reason": "not found"})
+            return
+        if self.server.inject_error():
+            self.respond(
+                self.server.error_status,
+                {"reason": "Injected error"},
+                {"Retry-After": f"{self.server.retry_after:g}"}
+                if self.server.retry_after is not None
+                else None,
+            )
+        elif not self.server.insert(table_key, rows, received):
+            self.respond(404, {"reason": "not found"})
+        else:
+            self.respond(201, {"data": {"affected": len(rows)}})
+
+    def respond(
+        self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_fake_server(**options) -> FakeOepServer:
+    """
+    Starts a fake OEP server on a free local port in a background thread.
+
+    Parameters:
+    - **options: Options of the server, see 'FakeOepServer'.
+
+    Returns:
+    - FakeOepServer: The running server; use its 'url' as API URL and call 'shutdown()' to stop it.
+    """
+    server = FakeOepServer(("127.0.0.1", 0), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,204 @@
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from oem_dpkg.utils import save_json
+
+
+class Instrumentation:
+    """
+    Lightweight instrumentation of the phases of packaging and upload runs.
+
+    Spans measure the time spent in a named phase (e.g. 'package.infer' or 'upload.http') and can be used
+    from several threads at once; the time of concurrent spans of the same name adds up (busy time).
+    Counters accumulate quantities such as rows, bytes, batches and retries.
+    At the end of a run, 'emit' passes a summary to each of the configured sinks
+    (see 'LogSink', 'JsonFileSink' and 'PrometheusTextfileSink').
+
+    Parameters:
+        sinks (Optional[List[Any]]): Objects with an 'emit(summary)' method. Default is None (no output).
+
+    Attributes:
+        spans (Dict[str, Dict[str, float]]): Number of calls, total and maximum seconds by span name.
+        counters (Dict[str, float]): Counter values by name.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None) -> None:
+        self.sinks: List[Any] = list(sinks or [])
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Measures the time spent in the 'with' block as a span of the given name.
+
+        Parameters:
+        - name (str): The name of the phase.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Records a span of the given duration.
+
+        Parameters:
+        - name (str): The name of the phase.
+        - seconds (float): The duration of the span.
+        """
+        with self._lock:
+            span = self.spans.setdefault(
+                name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+            )
+            span["calls"] += 1
+            span["seconds"] += seconds
+            span["max_seconds"] = max(span["max_seconds"], seconds)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """
+        Adds a value to a counter.
+
+        Parameters:
+        - name (str): The name of the counter.
+        - value (float, optional): The value to add. Defaults to 1.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def iterate(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """
+        Iterates over an iterable, recording the time spent producing each item as a span
+        (e.g. reading the next batch from a file).
+
+        Parameters:
+        - name (str): The name of the phase.
+        - iterable (Iterable[Any]): The iterable.
+
+        Yields:
+        - Any: The items of the iterable.
+        """
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - started)
+            yield item
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Returns a summary of the spans and counters recorded so far.
+
+        Returns:
+        - Dict[str, Any]: The wall time since the instrumentation was created ('wall_seconds'), the spans ('spans'),
+          the counters ('counters') and their rates per second of wall time ('rates').
+        """
+        wall_seconds = time.perf_counter() - self._started
+        with self._lock:
+            spans = {name: dict(span) for name, span in sorted(self.spans.items())}
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "wall_seconds": wall_seconds,
+            "spans": spans,
+            "counters": counters,
+            "rates": {
+                name: value / wall_seconds if wall_seconds else 0.0
+                for name, value in counters.items()
+            },
+        }
+
+    def emit(self) -> None:
+        """
+        Passes the summary to all sinks.
+        """
+        summary = self.summary()
+        for sink in self.sinks:
+            sink.emit(summary)
+
+
+class LogSink:
+    """
+    Logs a per-phase breakdown of the summary.
+    """
+
+    def emit(self, summary: Dict[str, Any]) -> None:
+        wall_seconds = summary["wall_seconds"]
+        logging.info(f"Profile ({wall_seconds:.2f} s wall time):")
+        for name, span in summary["spans"].items():
+            share = span["seconds"] / wall_seconds * 100 if wall_seconds else 0.0
+            logging.info(
+                f"  {name:<28} {span['seconds']:>9.3f} s {share:>6.1f}% "
+                f"in {span['calls']} calls (max {span['max_seconds']:.3f} s)"
+            )
+        for name, value in summary["counters"].items():
+            logging.info(
+                f"  {name:<28} {value:>12,.0f} ({summary['rates'][name]:,.0f}/s)"
+            )
+
+
+class JsonFileSink:
+    """
+    Writes the summary to a JSON file.
+
+    Parameters:
+        path (Union[str, Path]): The path to the JSON file.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path: Path = Path(path)
+
+    def emit(self, summary: Dict[str, Any]) -> None:
+        save_json(summary, str(self.path))
+        logging.info(f"Profile written to '{self.path}'.")
+
+
+class PrometheusTextfileSink:
+    """
+    Writes the summary in the Prometheus text format, e.g. for the textfile collector of the node exporter.
+    Spans become '<prefix>_span_seconds_total' and '<prefix>_span_calls_total' (labelled by span),
+    counters become '<prefix>_<counter>_total'. The file is replaced atomically.
+
+    Parameters:
+        path (Union[str, Path]): The path to the '.prom' file.
+        prefix (str, optional): Prefix of the metric names. Defaults to 'oem_dpkg'.
+    """
+
+    def __init__(self, path: Union[str, Path], prefix: str = "oem_dpkg") -> None:
+        self.path: Path = Path(path)
+        self.prefix: str = prefix
+
+    def emit(self, summary: Dict[str, Any]) -> None:
+        lines = [
+            f"# TYPE {self.prefix}_wall_seconds gauge",
+            f"{self.prefix}_wall_seconds {summary['wall_seconds']}",
+            f"# TYPE {self.prefix}_span_seconds_total counter",
+        ]
+        lines += [
+            f'{self.prefix}_span_seconds_total{{span="{name}"}} {span["seconds"]}'
+            for name, span in summary["spans"].items()
+        ]
+        lines.append(f"# TYPE {self.prefix}_span_calls_total counter")
+        lines += [
+            f'{self.prefix}_span_calls_total{{span="{name}"}} {span["calls"]}'
+            for name, span in summary["spans"].items()
+        ]
+        for name, value in summary["counters"].items():
+            metric = f"{self.prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        temporary_path = self.path.with_name(f".{self.path.name}.tmp")
+        temporary_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(temporary_path, self.path)
+        logging.info(f"Metrics written to '{self.path}'.")
@@ -1,18 +1,32 @@
 import logging
+import os
 import re
-from typing import List, Union
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
-from frictionless import Package, Resource
+from frictionless import Detector, Package, Resource, Schema
 from datetime import datetime, timezone
 import shutil
 import json
+import hashlib
 from oem_dpkg.utils import (
-    find_metadata_json_files,
-    find_dataset_paths,
-    get_metadata_from_gpkg,
+    STAGING_STRATEGIES,
+    file_sha256,
     get_folder_name,
+    get_gpkg_layers_metadata,
+    load_json,
+    oem_resource_schema,
+    sample_file_lines,
+    save_json,
+    scan_directory_tree,
+    stage_file,
+    stream_file_stats,
 )
-from omi.dialects.oep.parser import JSONParser
+from oem_dpkg.instrumentation import Instrumentation
+from oem_dpkg.oem_validation import OemValidationCache
 
 # from metadata.v152.schema import OEMETADATA_V152_SCHEMA
 # from metadata.v160.schema import OEMETADATA_V160_SCHEMA
@@ -20,6 +34,14 @@ from metadata.latest.schema import OEMETADATA_LATEST_SCHEMA
 
 logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
 
+MANIFEST_FILENAME = "oem_dpkg_manifest.json"
+MANIFEST_VERSION = 3
+# 'full': field types are inferred from all rows, 'head': from the first rows, 'reservoir': from rows spread across the file
+INFERENCE_POLICIES = ("full", "head", "reservoir")
+# Number of rows the field types are inferred from with 'head' and 'reservoir' (the default of frictionless)
+DEFAULT_INFERENCE_SAMPLE_SIZE = 100
+VALIDATION_CACHE_FILENAME = "oem_validation_cache.json"
+
 
 class OemDataPackage:
     """
@@ -34,12 +56,27 @@ class OemDataPackage:
         description (str): Data package description.
         version (str): Data package version.
         oem (bool): If True, integrates and validates against OEM standards. Default is True.
+        incremental (bool): If True, unchanged files are neither copied, inferred nor validated again. Default is False.
+        jobs (int): Number of processes used to infer resources in parallel. Default is 1.
+        staging (str): How data files are placed into the data package: 'auto' (default), 'copy', 'reflink', 'hardlink' or 'symlink'.
+        inference (str): Which rows the field types of tables are inferred from: 'head' (default, the first rows),
+            'reservoir' (rows spread across the file) or 'full' (all rows, holds the whole table in memory).
+        inference_sample_size (int): Number of rows for 'head' and 'reservoir'. Default is 100.
+        use_oem_schemas (bool): If True, the field types a dataset's OEM declares for a table are used instead of
+            inferring them, provided the declared field names match the header of the file. Default is False.
+        instrumentation (Optional[Instrumentation]): Collects the time spent in each phase ('package.*' spans) and counters. Default is None (a new, silent instance).
 
     Attributes:
         created_date (datetime): Instance creation timestamp.
         oem_schema (dict): The OEM schema for metadata validation.
         resources (List[Resource]): Prepared resources for the data package.
         oem_validity_reports_path (Path): Where validation reports are stored.
+        manifest_path (Path): Where the manifest of the incremental build is stored.
+        manifest (Dict[str, Any]): Cached resource descriptors of previous builds.
+        validation_cache (OemValidationCache): Memoized OEM validation results, persisted across incremental builds.
+        output_index (Dict[str, Dict[str, Any]]): Index of the files in the data package directory (see 'scan_directory_tree').
+        file_stats (Dict[str, Dict[str, Any]]): Hash, size and line count of the files copied in this run, by target path,
+            computed while copying (see 'stream_file_stats') and reused by the resource inference.
     """
 
     def __init__(
@@ -50,6 +87,13 @@ class OemDataPackage:
         description: str,
         version: str,
         oem: bool = True,
+        incremental: bool = False,
+        jobs: int = 1,
+        staging: str = "auto",
+        instrumentation: Optional[Instrumentation] = None,
+        inference: str = "head",
+        inference_sample_size: int = DEFAULT_INFERENCE_SAMPLE_SIZE,
+        use_oem_schemas: bool = False,
     ) -> None:
         """
         Initializes a new instance of OemDataPackage.
@@ -61,6 +105,13 @@ class OemDataPackage:
         - description (str): A brief description of the data package.
         - version (str): The version of the data package.
         - oem (bool, optional): Flag to indicate whether the data package should integrate and validate Open Energy Metadata. Defaults to True.
+        - incremental (bool, optional): Flag to reuse the results of previous builds for unchanged files (see 'create'). Defaults to False.
+        - jobs (int, optional): Number of processes used to infer resources in parallel. Defaults to 1.
+        - staging (str, optional): Staging strategy for data files, see 'stage_file'. Defaults to 'auto'.
+        - instrumentation (Instrumentation, optional): Collects timings and counters of the build. Defaults to None.
+        - inference (str, optional): Inference policy for the field types of tables, see 'infer_resource_entry'. Defaults to 'head'.
+        - inference_sample_size (int, optional): Number of rows sampled by the 'head' and 'reservoir' policies. Defaults to 100.
+        - use_oem_schemas (bool, optional): Flag to use the field types declared in the OEM instead of inferring them. Defaults to False.
         """
         self.input_path: Path = Path(input_path)
         self.output_path: Path = Path(output_path) / "datapackage"
@@ -76,43 +127,166 @@ class OemDataPackage:
         )
         if self.oem_validity_reports_path.exists():
             shutil.rmtree(self.oem_validity_reports_path)
+        self.incremental: bool = incremental
+        self.jobs: int = max(1, jobs)
+        if staging not in STAGING_STRATEGIES:
+            raise ValueError(
+                f"Unknown staging strategy '{staging}', use one of: {', '.join(STAGING_STRATEGIES)}."
+            )
+        self.staging: str = staging
+        if inference not in INFERENCE_POLICIES:
+            raise ValueError(
+                f"Unknown inference policy '{inference}', use one of: {', '.join(INFERENCE_POLICIES)}."
+            )
+        self.inference: str = inference
+        self.inference_sample_size: int = max(1, inference_sample_size)
+        self.use_oem_schemas: bool = use_oem_schemas
+        self.oem_metadata: Dict[str, Any] = {}
+        self.staging_summary: Dict[str, int] = {}
+        self.manifest_path: Path = Path(output_path) / MANIFEST_FILENAME
+        self.manifest: Dict[str, Any] = self.load_manifest()
+        self.validation_cache: OemValidationCache = OemValidationCache(
+            self.oem_schema,
+            Path(output_path) / VALIDATION_CACHE_FILENAME if incremental else None,
+        )
+        self.output_index: Dict[str, Dict[str, Any]] = {}
+        self.file_stats: Dict[str, Dict[str, Any]] = {}
+        self.instrumentation: Instrumentation = instrumentation or Instrumentation()
 
     def create(self) -> None:
         """
         Creates the data package by copying datasets and metadata, collecting the relevant resources,
         and compiling the frictionless data package.
+
+        In incremental mode, the manifest of the previous build is used to skip unchanged files:
+        they are not copied again, their resource descriptors (including GeoPackage metadata) are taken from the manifest
+        and OEM validation results are reused for unchanged metadata files. The resulting 'datapackage.json'
+        is the same as the one of a full build; if nothing changed, it keeps the creation date of the previous build
+        (see 'reuse_created_date'), so it is byte-identical.
         """
         self.output_path.mkdir(parents=True, exist_ok=True)
-        self.copy_datasets_and_metadata()
-        self.create_resources()
-        self.create_package()
+        with self.instrumentation.span("package.copy"):
+            self.copy_datasets_and_metadata()
+        with self.instrumentation.span("package.resources"):
+            self.create_resources()
+        with self.instrumentation.span("package.write"):
+            self.create_package()
+        if self.incremental:
+            with self.instrumentation.span("package.manifest"):
+                save_json(self.manifest, str(self.manifest_path))
+                self.validation_cache.save()
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """
+        Loads the manifest of a previous incremental build, if there is one.
+
+        Returns:
+        - Dict[str, Any]: The manifest, with cached resource descriptors by file path ('files').
+        """
+        inference = {
+            "policy": self.inference,
+            "sample_size": self.inference_sample_size,
+        }
+        empty_manifest = {"version": MANIFEST_VERSION, "inference": inference, "files": {}}
+        if not self.incremental or not self.manifest_path.exists():
+            return empty_manifest
+        manifest = load_json(str(self.manifest_path))
+        if manifest.get("version") != MANIFEST_VERSION:
+            logging.info("Manifest of previous build is outdated, rebuilding all.")
+            return empty_manifest
+        if manifest.get("inference") != inference:
+            logging.info("Inference policy changed since the previous build, rebuilding all.")
+            return empty_manifest
+        return manifest
+
+    def copy_file(
+        self,
+        source: Path,
+        target_dir: Path,
+        staging: str = "copy",
+        source_stat: Optional[os.stat_result] = None,
+    ) -> None:
+        """
+        Stages a file into the target directory (see 'stage_file'), preserving its modification time.
+        Copied files are hashed and their lines counted in the same pass (see 'copy_with_stats').
+        In incremental mode, the file is skipped if the target already has the same size and modification time.
+        The stat info of the target is looked up in the index of the data package directory.
+
+        Parameters:
+        - source (Path): The file to stage.
+        - target_dir (Path): The directory to stage the file into.
+        - staging (str, optional): The staging strategy. Defaults to 'copy'.
+        - source_stat (os.stat_result, optional): The stat info of the source, if already known.
+        """
+        target = target_dir / source.name
+        target_stat = (
+            self.output_index.get(str(target_dir), {}).get("files", {}).get(str(target))
+        )
+        if self.incremental and target_stat is not None:
+            source_stat = source_stat or source.stat()
+            if (source_stat.st_size, source_stat.st_mtime_ns) == (
+                target_stat.st_size,
+                target_stat.st_mtime_ns,
+            ):
+                return
+        method = stage_file(source, target, staging, copy_function=self.copy_with_stats)
+        self.staging_summary[method] = self.staging_summary.get(method, 0) + 1
+        self.instrumentation.count("package.files_staged")
+        self.instrumentation.count(
+            "package.bytes_staged", (source_stat or source.stat()).st_size
+        )
+
+    def copy_with_stats(self, source: Path, target: Path) -> None:
+        """
+        Copies a file and keeps the stats computed while copying in 'file_stats'.
+
+        Parameters:
+        - source (Path): The file to copy.
+        - target (Path): The path of the copy.
+        """
+        self.file_stats[str(target)] = stream_file_stats(source, target)
 
     def copy_datasets_and_metadata(self) -> None:
         """
         Copies datasets and their respective metadata from the input directory to the output directory.
         Processes each subdirectory within the input path, assuming each represents a distinct dataset.
+        Data files are staged with the configured staging strategy, metadata files are always copied.
+        Input and (in incremental mode) output directories are each scanned only once.
         """
+        with self.instrumentation.span("package.scan"):
+            input_index = scan_directory_tree(self.input_path)
+            if self.incremental:
+                self.output_index = scan_directory_tree(self.output_path)
         # Gehe alle Unterordner im input_path durch
-        for dataset_dir in self.input_path.iterdir():
-            if dataset_dir.is_dir():
-                data_path = dataset_dir / "data"
-                target_dataset_path = self.output_path / dataset_dir.name
-
-                # Erstelle den Zielordner, falls er noch nicht existiert
-                target_dataset_path.mkdir(parents=True, exist_ok=True)
-
-                # Kopiere metadata.json, falls vorhanden
-                metadata_path = dataset_dir / "metadata.json"
-                if metadata_path.exists():
-                    shutil.copy(metadata_path, target_dataset_path)
-
-                # Gehe alle Dateien im 'data'-Ordner durch und kopiere sie
-                if data_path.is_dir():
-                    for file in data_path.iterdir():
-                        if file.is_file() and not file.name.endswith(
-                            ".gitkeep"
-                        ):
-                            shutil.copy(file, target_dataset_path)
+        for dataset_dir, dataset in input_index.items():
+            if Path(dataset_dir).parent != self.input_path:
+                continue
+            data = input_index.get(os.path.join(dataset_dir, "data"))
+            target_dataset_path = self.output_path / dataset["name"]
+
+            # Erstelle den Zielordner, falls er noch nicht existiert
+            target_dataset_path.mkdir(parents=True, exist_ok=True)
+
+            # Kopiere metadata.json, falls vorhanden
+            if dataset["metadata"]:
+                self.copy_file(
+                    Path(dataset["metadata"]),
+                    target_dataset_path,
+                    source_stat=dataset["files"][dataset["metadata"]],
+                )
+
+            # Gehe alle Dateien im 'data'-Ordner durch und kopiere sie
+            if data:
+                for file, stat in data["files"].items():
+                    self.copy_file(
+                        Path(file), target_dataset_path, self.staging, stat
+                    )
+        if self.staging_summary:
+            staged = ", ".join(
+                f"{count} by {method}"
+                for method, count in self.staging_summary.items()
+            )
+            logging.info(f"Staged files: {staged}.")
 
     def make_paths_relative(
         self, package: Package, base_path: Union[str, Path]
@@ -135,26 +309,162 @@ class OemDataPackage:
     def create_resources(self) -> None:
         """
         Iterates over all files found in the output directory, creating and appending resource objects for each file.
-        Resources for GeoPackage files include custom CRS information.
+        Resources for GeoPackage files include custom CRS information; files with several feature layers
+        get one resource per layer (named after the layer, see 'infer_resource_entry').
         If OEM metadata validation is enabled, each resource is also validated against the OEM schema.
+
+        Files that need to be inferred (all files, or only new and changed ones in incremental mode) are inferred
+        in up to 'jobs' parallel processes. The resources are always appended in the order of the files,
+        so the resulting data package does not depend on the scheduling of the processes.
+        The stats of files copied in this run are passed on, so the inference does not need to read them again.
+        The field types of tables are inferred according to the inference policy, or taken from the OEM
+        if 'use_oem_schemas' is set and the OEM declares them (see 'declared_schema').
+        The data package directory is scanned once, the resulting index is used to look up files, their stat info
+        and the OEM metadata of each dataset.
         """
-        for file_path in find_dataset_paths(self.output_path):
-            resource = Resource(path=str(file_path))
-            resource.infer(stats=True)
-            if resource.format == "gpkg":
-                gpk_metadata = get_metadata_from_gpkg(resource.path)
-                resource.custom["crs"] = str(gpk_metadata["crs"])
-                resource.custom["bounding_box"] = str(
-                    gpk_metadata["bounding_box"]
-                )
-                resource.custom["geometry_type"] = str(
-                    gpk_metadata["geometry_type"]
-                )
-                resource.custom["schema"] = gpk_metadata["schema"]
-            if self.oem:
-                self.reference_and_validate_oem_metadata(resource, file_path)
-            resource.name = f"{get_folder_name(resource.path)}.{resource.name}"
-            self.resources.append(resource)
+        with self.instrumentation.span("package.scan"):
+            self.output_index = scan_directory_tree(self.output_path)
+        file_paths = [
+            file_path
+            for directory in self.output_index.values()
+            for file_path in directory["files"]
+        ]
+        declared_schemas = {
+            str(file_path): self.declared_schema(file_path) for file_path in file_paths
+        }
+        entries = {
+            str(file_path): self.cached_manifest_entry(file_path)
+            for file_path in file_paths
+        }
+        stale_paths = [
+            path
+            for path, entry in entries.items()
+            if entry is None or entry.get("declared_schema") != declared_schemas[path]
+        ]
+        infer = partial(
+            infer_resource_entry,
+            inference=self.inference,
+            sample_size=self.inference_sample_size,
+        )
+        with self.instrumentation.span("package.infer"):
+            if self.jobs > 1 and len(stale_paths) > 1:
+                with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                    inferred = list(
+                        executor.map(
+                            infer,
+                            stale_paths,
+                            [str(self.output_path)] * len(stale_paths),
+                            [self.file_stats.get(path) for path in stale_paths],
+                            [declared_schemas[path] for path in stale_paths],
+                        )
+                    )
+            else:
+                inferred = [
+                    infer(
+                        path,
+                        str(self.output_path),
+                        self.file_stats.get(path),
+                        declared_schemas[path],
+                    )
+                    for path in stale_paths
+                ]
+        self.instrumentation.count("package.files_inferred", len(stale_paths))
+        self.instrumentation.count(
+            "package.files_cached", len(file_paths) - len(stale_paths)
+        )
+        for path, entry in zip(stale_paths, inferred):
+            # timings measured in the (worker) process, not part of the manifest
+            for phase, seconds in entry.pop("timings").items():
+                self.instrumentation.record(f"package.infer.{phase}", seconds)
+            entries[path] = entry
+            if self.incremental:
+                relative_path = str(Path(path).relative_to(self.output_path))
+                self.manifest["files"][relative_path] = entry
+
+        resource_names = set()
+        for file_path in file_paths:
+            for resource in resources_from_entry(
+                entries[str(file_path)], file_path, self.output_path
+            ):
+                if self.oem:
+                    self.reference_and_validate_oem_metadata(resource, file_path)
+                resource.name = f"{get_folder_name(resource.path)}.{resource.name}"
+                if resource.name in resource_names:
+                    logging.warning(
+                        f"Duplicate resource name '{resource.name}' ('{file_path}'), rename the file or layer."
+                    )
+                resource_names.add(resource.name)
+                self.resources.append(resource)
+
+    def declared_schema(self, file_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the schema the OEM of a file's dataset declares for it, if OEM schemas are used (see 'oem_resource_schema').
+        Each OEM file is read only once.
+
+        Parameters:
+        - file_path (Union[str, Path]): The path to the data file in the data package directory.
+
+        Returns:
+        - Optional[Dict[str, Any]]: The declared schema as Frictionless schema descriptor, or None.
+        """
+        if not self.use_oem_schemas:
+            return None
+        metadata_path = self.output_index.get(str(Path(file_path).parent), {}).get(
+            "metadata"
+        )
+        if not metadata_path or str(file_path) == metadata_path:
+            return None
+        if metadata_path not in self.oem_metadata:
+            try:
+                self.oem_metadata[metadata_path] = load_json(metadata_path)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Could not read OEM '{metadata_path}': {e}")
+                self.oem_metadata[metadata_path] = {}
+        return oem_resource_schema(self.oem_metadata[metadata_path], file_path)
+
+    def cached_manifest_entry(
+        self, file_path: Union[str, Path]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the manifest entry of a file in incremental mode, if the file is unchanged since the previous build,
+        i.e. if its size and modification time, or else its SHA-256 hash, match the entry.
+
+        Parameters:
+        - file_path (Union[str, Path]): The path to the file.
+
+        Returns:
+        - Optional[Dict[str, Any]]: The manifest entry, or None if the file needs to be inferred.
+        """
+        if not self.incremental:
+            return None
+        relative_path = str(Path(file_path).relative_to(self.output_path))
+        entry = self.manifest["files"].get(relative_path)
+        if entry is None:
+            return None
+        stat = self.file_stat(file_path)
+        if (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return entry
+        if entry["size"] == stat.st_size and entry["sha256"] == file_sha256(
+            file_path
+        ):
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return entry
+        return None
+
+    def file_stat(self, file_path: Union[str, Path]) -> os.stat_result:
+        """
+        Returns the stat info of a file in the data package directory from the index, or from the filesystem
+        if the file is not indexed.
+
+        Parameters:
+        - file_path (Union[str, Path]): The path to the file.
+
+        Returns:
+        - os.stat_result: The stat info of the file.
+        """
+        directory = self.output_index.get(str(Path(file_path).parent), {})
+        stat = directory.get("files", {}).get(str(file_path))
+        return stat if stat is not None else os.stat(file_path)
 
     def reference_and_validate_oem_metadata(
         self, resource: Resource, file_path: Union[str, Path]
@@ -167,10 +477,10 @@ class OemDataPackage:
         - resource (Resource): The resource object to attach OEM metadata to.
         - file_path (Union[str, Path]): The file path of the resource, used to locate the associated OEM metadata.
         """
-        metadata_files = find_metadata_json_files(Path(file_path).parent)
+        directory = self.output_index.get(str(Path(file_path).parent), {})
         if resource.name != "metadata":
-            if metadata_files:
-                oem_file = str(metadata_files[0])
+            if directory.get("metadata"):
+                oem_file = directory["metadata"]
                 if self.validate_oem(oem_file, self.oem_schema):
                     resource.custom["oem_path"] = oem_file
                     resource.custom["oem_schema_validity"] = self.oem_schema[
@@ -189,6 +499,8 @@ class OemDataPackage:
         """
         Validates the given OEM metadata against the specified schema,
         logging the results and creating a validity report if necessary.
+        Results are memoized by metadata content and schema version (see 'OemValidationCache'),
+        so the metadata of a dataset is validated only once, not once per data file.
 
         Parameters:
         - oem (str): The path to the OEM metadata file to validate.
@@ -197,11 +509,13 @@ class OemDataPackage:
         Returns:
         - bool: True if the OEM metadata is valid according to the schema, False otherwise.
         """
-        with open(oem, "r", encoding="utf-8") as f:
-            oem_loaded = json.load(f)
-        parser = JSONParser()
         schema = oem_schema
-        report = parser.validate(oem_loaded, schema, save_report=False)
+        if schema is not self.validation_cache.schema:
+            self.validation_cache = OemValidationCache(
+                schema, self.validation_cache.path
+            )
+        with self.instrumentation.span("package.validate"):
+            report = self.validation_cache.validate(oem)
         if report:
             self.oem_validity_reports_path.mkdir(parents=True, exist_ok=True)
             oem_report_filename = f"{self.oem_validity_reports_path}/oem_validity_report.{get_folder_name(oem)}.json"
@@ -243,6 +557,8 @@ class OemDataPackage:
                 keywords=[],
             )
             self.make_paths_relative(package, self.output_path)
+            if self.incremental:
+                self.reuse_created_date(package)
             package.to_json(str(self.output_path / "datapackage.json"))
             logging.info(
                 f"Data package successfully created: '{self.output_path}/'"
@@ -251,6 +567,227 @@ class OemDataPackage:
             logging.error(f"Could not create data package!\n{e}")
 
 
+    def reuse_created_date(self, package: Package) -> None:
+        """
+        Keeps the creation date of the previous build if the package is otherwise unchanged, so that an unchanged
+        input tree results in a byte-identical 'datapackage.json'. The package descriptor without its creation date
+        is hashed and stored in the manifest ('package') together with the creation date.
+
+        Parameters:
+        - package (Package): The package to be written.
+        """
+        descriptor = package.to_descriptor()
+        descriptor.pop("created", None)
+        digest = hashlib.sha256(
+            json.dumps(descriptor, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        previous = self.manifest.get("package", {})
+        if previous.get("digest") == digest:
+            package.created = previous["created"]
+        self.manifest["package"] = {"digest": digest, "created": package.created}
+
+
+def infer_resource_entry(
+    file_path: str,
+    basepath: str,
+    file_stats: Optional[Dict[str, Any]] = None,
+    declared_schema: Optional[Dict[str, Any]] = None,
+    inference: str = "head",
+    sample_size: int = DEFAULT_INFERENCE_SAMPLE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Infers the structure and stats of a file and returns them as a manifest entry.
+    GeoPackage files additionally get custom CRS information, read from their SQLite catalog (see 'get_gpkg_layers_metadata').
+    A GeoPackage with several feature layers results in one resource per layer, named after the (lowercased) layer
+    and with the layer name in the 'layer' custom property; a single-layer file keeps the name of the file.
+    This is a module-level function, so it can be run in worker processes.
+
+    The structure is inferred by frictionless from a sample of the file. Hash and size are taken from the given stats
+    (or computed in a single raw read, see 'stream_file_stats'); the rows of CSV files are counted from their lines.
+    Only for tables whose lines do not correspond to rows (e.g. quoted line breaks), frictionless reads the whole file.
+
+    The field types of tables are inferred from a sample of rows, chosen by the inference policy:
+    - 'head': the first 'sample_size' rows.
+    - 'reservoir': 'sample_size' rows spread across the file, read by seeking (see 'sample_file_lines').
+      Falls back to 'head' for files whose lines are not rows, and for small files.
+    - 'full': all rows, which requires the whole table in memory.
+    If a schema is declared for the table (e.g. in the OEM) and its field names match the header, it is used as it is.
+
+    Parameters:
+    - file_path (str): The path to the file.
+    - basepath (str): The directory the path in the descriptor is made relative to.
+    - file_stats (Optional[Dict[str, Any]]): The stats of the file, if already computed while copying it.
+    - declared_schema (Optional[Dict[str, Any]]): A Frictionless schema descriptor to use instead of inferring the field types.
+    - inference (str, optional): The inference policy ('head', 'reservoir' or 'full'). Defaults to 'head'.
+    - sample_size (int, optional): Number of rows sampled by 'head' and 'reservoir'. Defaults to 100.
+
+    Returns:
+    - Dict[str, Any]: Size, modification time and SHA-256 hash of the file, its resource descriptors
+      (with path relative to 'basepath') and their custom properties ('resources'), and the seconds spent
+      inferring it with frictionless and reading GeoPackage metadata ('timings').
+    """
+    timings = {}
+    if file_stats is None:
+        started = time.perf_counter()
+        file_stats = stream_file_stats(file_path)
+        timings["stats"] = time.perf_counter() - started
+    started = time.perf_counter()
+    resource = Resource(path=str(file_path))
+    if resource.type == "table":
+        schema = None
+        if declared_schema is not None:
+            schema = Schema.from_descriptor(declared_schema)
+            with Resource(path=str(file_path), detector=Detector(sample_size=1)) as header:
+                labels = header.labels
+            if labels != schema.field_names:
+                logging.warning(
+                    f"Fields declared for '{file_path}' do not match its header, inferring them instead."
+                )
+                schema = None
+        if schema is None:
+            schema = infer_table_schema(resource, file_stats["lines"], inference, sample_size)
+        if schema is not None:
+            resource = Resource(path=str(file_path), schema=schema)
+    resource.infer()
+    rows = rows_from_line_count(resource, file_stats["lines"])
+    if resource.type == "table" and rows is None:
+        resource.infer(stats=True)
+    else:
+        resource.hash = f"sha256:{file_stats['sha256']}"
+        resource.bytes = file_stats["bytes"]
+        if resource.type == "table":
+            resource.fields = len(resource.schema.fields)
+            resource.rows = rows
+    timings["frictionless"] = time.perf_counter() - started
+    stat = os.stat(file_path)
+    descriptor = resource.to_descriptor()
+    descriptor["path"] = str(Path(file_path).relative_to(basepath))
+    # custom properties are kept separately to restore them in the same order
+    for key in resource.custom:
+        descriptor.pop(key, None)
+    entries = [{"descriptor": descriptor, "custom": dict(resource.custom)}]
+    if resource.format == "gpkg":
+        started = time.perf_counter()
+        layers = get_gpkg_layers_metadata(resource.path)
+        timings["gpkg_metadata"] = time.perf_counter() - started
+        if len(layers) > 1:
+            entries = [
+                {
+                    "descriptor": {
+                        **descriptor,
+                        "name": re.sub(r"[^-a-z0-9_]", "_", layer["layer"].lower()),
+                    },
+                    "custom": {"layer": layer["layer"]},
+                }
+                for layer in layers
+            ]
+        for entry, layer in zip(entries, layers):
+            entry["custom"]["crs"] = str(layer["crs"])
+            entry["custom"]["bounding_box"] = str(layer["bounding_box"])
+            entry["custom"]["geometry_type"] = str(layer["geometry_type"])
+            entry["custom"]["schema"] = layer["schema"]
+    return {
+        "declared_schema": declared_schema,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": descriptor.get("hash", "").replace("sha256:", "")
+        or file_sha256(file_path),
+        "resources": entries,
+        "timings": timings,
+    }
+
+
+def infer_table_schema(
+    resource: Resource, lines: Optional[int], inference: str, sample_size: int
+) -> Optional[Schema]:
+    """
+    Infers the schema of a table resource from a sample of its rows chosen by the inference policy
+    (see 'infer_resource_entry').
+
+    Parameters:
+    - resource (Resource): The (not yet inferred) table resource.
+    - lines (Optional[int]): The number of lines of the file, None if lines are not rows.
+    - inference (str): The inference policy ('head', 'reservoir' or 'full').
+    - sample_size (int): Number of rows sampled by 'head' and 'reservoir'.
+
+    Returns:
+    - Optional[Schema]: The inferred schema, or None for the default inference of frictionless (first 100 rows).
+    """
+    if inference == "full":
+        sample_size = lines if lines is not None else sys.maxsize
+    elif (
+        inference == "reservoir"
+        and lines is not None
+        and lines - 1 > sample_size
+        and resource.format in ("csv", "tsv")
+    ):
+        sample = Resource(
+            sample_file_lines(resource.path, sample_size, seed=lines),
+            format=resource.format,
+            detector=Detector(sample_size=sample_size + 1),
+        )
+        sample.infer()
+        return sample.schema
+    if sample_size == DEFAULT_INFERENCE_SAMPLE_SIZE:
+        return None
+    sample = Resource(path=resource.path, detector=Detector(sample_size=sample_size))
+    sample.infer()
+    return sample.schema
+
+
+def rows_from_line_count(resource: Resource, lines: Optional[int]) -> Optional[int]:
+    """
+    Returns the number of rows of a CSV resource from its number of lines, if they correspond (see 'stream_file_stats').
+
+    Parameters:
+    - resource (Resource): The inferred resource.
+    - lines (Optional[int]): The number of lines of the file.
+
+    Returns:
+    - Optional[int]: The number of rows, or None if it cannot be derived from the lines.
+    """
+    if (
+        lines is None
+        or resource.format not in ("csv", "tsv")
+        or (resource.encoding or "").lower().replace("-", "").startswith(("utf16", "utf32"))
+    ):
+        return None
+    dialect = resource.dialect
+    if dialect.comment_char or dialect.comment_rows:
+        return None
+    if not dialect.header:
+        return lines
+    if dialect.header_rows == [1]:
+        return lines - 1
+    return None
+
+
+def resources_from_entry(
+    entry: Dict[str, Any], file_path: Union[str, Path], basepath: Union[str, Path]
+) -> List[Resource]:
+    """
+    Creates the resource objects of a file from its manifest entry (see 'infer_resource_entry').
+    GeoPackage files with several layers have one resource per layer, all other files a single resource.
+
+    Parameters:
+    - entry (Dict[str, Any]): The manifest entry of the file.
+    - file_path (Union[str, Path]): The path to the file.
+    - basepath (Union[str, Path]): The directory the path in the descriptor is relative to.
+
+    Returns:
+    - List[Resource]: The resource objects for the file.
+    """
+    resources = []
+    for resource_entry in entry["resources"]:
+        resource = Resource.from_descriptor(
+            resource_entry["descriptor"], basepath=str(basepath)
+        )
+        resource.path = str(file_path)
+        resource.custom.update(resource_entry["custom"])
+        resources.append(resource)
+    return resources
+
+
 # -----------------------------------------
 # # Beispielaufruf (TEST)
 # input_path = "IGNORE/latest_test_path"
@@ -0,0 +1,102 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from omi.dialects.oep.parser import JSONParser
+
+from oem_dpkg.utils import file_sha256, load_json, save_json
+
+VALIDATION_CACHE_VERSION = 1
+
+
+class OemValidationCache:
+    """
+    Memoizes the validation of OEM metadata files against an OEM schema.
+
+    The jsonschema validator for the schema is compiled (and the schema itself checked) only once.
+    Validation reports are cached by the SHA-256 hash of the metadata file content and the schema version,
+    so validating the same metadata again, e.g. once for every data file of a dataset, is a dictionary lookup.
+    The full 'omi' report is only generated for metadata that is invalid.
+    If a path is given, the cache is loaded from and saved to that JSON file, so it persists across runs.
+
+    Parameters:
+        schema (dict): The OEM metadata schema to validate against.
+        path (Union[str, Path], optional): JSON file to persist the cache in. Defaults to None (in memory only).
+
+    Attributes:
+        schema_version (str): Identifies the schema in the cache keys ('$id' of the schema, or its description).
+        reports (Dict[str, List[Dict[str, Any]]]): Cached validation reports by cache key; empty if the metadata is valid.
+    """
+
+    def __init__(self, schema: dict, path: Optional[Union[str, Path]] = None) -> None:
+        self.schema: dict = schema
+        self.schema_version: str = schema.get("$id") or schema["description"]
+        self.path: Optional[Path] = Path(path) if path else None
+        self.parser = JSONParser()
+        self.validator = self.parser.get_json_validator(schema)
+        self.reports: Dict[str, List[Dict[str, Any]]] = self.load()
+        self._keys: Dict[str, str] = {}
+
+    def load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Loads the persisted validation reports, if there are any.
+
+        Returns:
+        - Dict[str, List[Dict[str, Any]]]: The cached validation reports by cache key.
+        """
+        if self.path is None or not self.path.exists():
+            return {}
+        cache = load_json(str(self.path))
+        if cache.get("version") != VALIDATION_CACHE_VERSION:
+            logging.info("OEM validation cache is outdated, validating all metadata again.")
+            return {}
+        return cache["reports"]
+
+    def save(self) -> None:
+        """
+        Saves the validation reports to the cache file, if the cache is persistent.
+        """
+        if self.path is not None:
+            save_json(
+                {"version": VALIDATION_CACHE_VERSION, "reports": self.reports},
+                str(self.path),
+            )
+
+    def cache_key(self, oem: Union[str, Path]) -> str:
+        """
+        Returns the cache key of a metadata file. The file is hashed only once per instance.
+
+        Parameters:
+        - oem (Union[str, Path]): The path to the OEM metadata file.
+
+        Returns:
+        - str: The cache key, made of the content hash of the file and the schema version.
+        """
+        oem = str(oem)
+        if oem not in self._keys:
+            self._keys[oem] = f"{file_sha256(oem)}:{self.schema_version}"
+        return self._keys[oem]
+
+    def validate(self, oem: Union[str, Path]) -> List[Dict[str, Any]]:
+        """
+        Validates an OEM metadata file against the schema, using the cached report if there is one.
+
+        Parameters:
+        - oem (Union[str, Path]): The path to the OEM metadata file.
+
+        Returns:
+        - List[Dict[str, Any]]: The validation report ('omi' format), empty if the metadata is valid.
+        """
+        key = self.cache_key(oem)
+        report = self.reports.get(key)
+        if report is None:
+            with open(oem, "r", encoding="utf-8") as f:
+                oem_loaded = json.load(f)
+            if self.validator.is_valid(oem_loaded):
+                report = []
+            else:
+                report = self.parser.validate(
+                    oem_loaded, self.schema, save_report=False
+                )
+            self.reports[key] = report
+        return report
@@ -1,21 +1,70 @@
 import re
-from typing import List, Optional, Dict, Any
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from functools import partial
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Set
 import logging
 import os
+import threading
+import time
 from pathlib import Path
+from urllib.parse import quote, urlsplit
 from frictionless import Package, Resource
 import getpass
 import sqlalchemy as sa
-import json
 import requests as req
+from requests.adapters import HTTPAdapter
 from oep_client import OepClient
+from oep_client.exceptions import OepServerSideException
 from oem2orm import oep_oedialect_oem2orm as oem2orm
 from tqdm import tqdm
-from oem_dpkg.utils import prepare_csv_data, prepare_gpkg_data, prepare_json_data
+from oem_dpkg.batching import BatchSizer, rebatch
+from oem_dpkg.instrumentation import Instrumentation
+from oem_dpkg.retry import RetryPolicy
+from oem_dpkg.upload_journal import UploadJournal
+from oem_dpkg.utils import (
+    BATCH_READERS,
+    GEOMETRY_FORMATS,
+    SQLITE_SIDECAR_SUFFIXES,
+    batch_hash,
+    compress_body,
+    encode_batch,
+    encode_columnar_batch,
+    encode_row,
+    index_datapackage_resources,
+    load_json,
+    normalize_row_value,
+    resolve_content_encoding,
+    row_digest,
+    run_in_dependency_order,
+    save_json,
+)
 import oedialect
 
 logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
 
+OEP_API_URL = "https://openenergy-platform.org/api/v0"
+# Environment variable to point the handler to another OEP instance (e.g. a local test server)
+API_URL_ENV_VAR = "OEP_API_URL"
+UPLOAD_JOURNAL_FILENAME = ".oep_upload_journal.sqlite"
+FAILED_BATCHES_FILENAME = "oep_upload_failed_batches.json"
+# HTTP status codes answered to requests that were too large to process (no row was inserted)
+OVERSIZED_REQUEST_STATUS_CODES = (413,)
+# HTTP status codes answered to requests that took too long (the rows may have been inserted anyway)
+SLOW_REQUEST_STATUS_CODES = (504,)
+# 'json': one object per row to '.../rows/new'; 'columnar': column names once per batch to '/advanced/insert'
+TRANSPORTS = ("json", "columnar")
+# HTTP status codes with which the advanced insert API is considered unavailable (the JSON transport is used instead)
+UNSUPPORTED_TRANSPORT_STATUS_CODES = (404, 405, 501)
+# Smaller request bodies are not worth compressing
+MIN_COMPRESSED_BODY_BYTES = 1024
+# Number of table metadata updates sent concurrently to the row uploads
+METADATA_UPLOAD_WORKERS = 4
+# Number of rows read per request when comparing a table on the OEP with the local rows (sync mode)
+REMOTE_PAGE_SIZE = 10000
+# Column by which the row API of the OEP addresses single rows ('.../rows/<id>'), the primary key of synchronized tables
+ROW_ID_COLUMN = "id"
+
 
 class OepUploadHandler:
     """
@@ -29,10 +78,51 @@ class OepUploadHandler:
         datapackage_json (str): Path to the frictionless data package JSON file.
         dataset_selection (List[str]): Optional list of dataset names to be processed.
         oep_schema (str): Schema name on the OEP under which the tables will be created.
+        datapackage_basepath (str): Directory of 'datapackage.json', to which the resource paths are relative.
         datapackage (Package): Frictionless data package object loaded from datapackage_json (OemDataPackage).
+            Only loaded on first access; the upload itself works from 'dataset_index'.
+        dataset_index (Dict[str, Dict[str, Any]]): Resource descriptors and OEM path of each dataset,
+            read from datapackage_json on first access (see 'index_datapackage_resources').
         resources (List[Resource]): List of resources (datasets) to be uploaded.
         oem_paths (List[str]): Paths to OEM metadata files related to the datasets.
         resources_ignore_list (List[str]): List of dataset names to be ignored during the upload.
+        workers (int): Number of batches of one table that are uploaded concurrently.
+        parallel_tables (int): Number of tables that are uploaded concurrently.
+        table_dependencies (Dict[str, Set[str]]): Names of the tables each table references via foreign keys.
+        api_url (str): Base URL of the OEP API ('<protocol>://<host>/api/v0'). Defaults to the 'OEP_API_URL'
+            environment variable, or openenergy-platform.org. Used for all requests, including table creation and metadata.
+        api_protocol (str): Protocol of the API URL ('http' or 'https').
+        api_host (str): Host (and port) of the API URL.
+        session (requests.Session): Shared keep-alive HTTP session used for all batch uploads.
+        resume (bool): If True, batches already acknowledged in a previous (interrupted) run are skipped.
+        journal_path (Path): Path of the upload journal. Like the build manifest, it is stored next to the data package
+            directory rather than in it, so it is never indexed as a resource.
+        journal (UploadJournal): Journal of acknowledged batches, created on first use (see 'upload_batches')
+            and removed once an upload finished without failed batches (see 'clear_journal').
+        failed_batches_path (Path): Path of the report of failed batches, next to the journal.
+        batch_size (int): Number of rows per batch (initial size in adaptive mode).
+        adaptive_batching (bool): If True, the batch size is adjusted per resource to the observed latency and payload size.
+        request_timeout (float): Timeout in seconds for a single batch request.
+        batch_size_summary (Dict[str, Dict[str, Any]]): Batch sizes used for each uploaded resource.
+        transport (str): How batches are sent: 'json' (rows as objects via the table API) or 'columnar'
+            (column names once per batch via the advanced insert API, falling back to 'json' if that is unavailable).
+        compression (str): Compression of the request bodies: 'none', 'auto', 'gzip' or 'zstd' (see 'post_body').
+        content_encoding (Optional[str]): The content encoding currently used for request bodies, None if uncompressed.
+        instrumentation (Instrumentation): Collects the time spent in each phase ('upload.*' spans) and counters
+            of rows, bytes, requests, batches and retries. A new, silent instance unless one is passed.
+        retry_policy (RetryPolicy): Retries failed requests (row inserts, table deletes and metadata updates)
+            with backoff and a circuit breaker shared by all workers. Defaults to 'RetryPolicy()'.
+        failed_batches (List[Dict[str, Any]]): Batches that could not be uploaded, even after retrying.
+        oep_client (OepClient): Client for the metadata API, created on first use and shared by all metadata updates.
+        geometry_format (str): Text encoding of GeoPackage geometries: 'wkt', 'ewkt', 'wkb' (hex) or 'ewkb' (hex, with SRID).
+        coordinate_precision (Optional[int]): Number of decimal places GeoPackage coordinates are rounded to
+            (in units of the layer's CRS), None for full precision.
+        simplify_tolerance (Optional[float]): Tolerance (in units of the layer's CRS) for simplifying GeoPackage geometries
+            while preserving their topology, None to keep them as they are.
+        sync (bool): If True, existing tables are synchronized with the data package instead of being replaced or skipped:
+            only new, changed and removed rows are sent (see 'sync_table'). Requires the primary key 'id'.
+        sync_tables (Dict[str, str]): The primary key column of each existing table that is synchronized.
+        sync_summary (Dict[str, Dict[str, int]]): Number of inserted, updated, deleted and unchanged rows of each synchronized table.
     """
 
     def __init__(
@@ -42,6 +132,21 @@ class OepUploadHandler:
         oep_username: Optional[str] = None,
         oep_schema: str = "model_draft",
         dataset_selection: Optional[List[str]] = None,
+        workers: int = 1,
+        api_url: Optional[str] = None,
+        parallel_tables: int = 1,
+        resume: bool = False,
+        batch_size: int = 2000,
+        adaptive_batching: bool = True,
+        request_timeout: float = 300,
+        transport: str = "json",
+        compression: str = "none",
+        instrumentation: Optional[Instrumentation] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        geometry_format: str = "wkt",
+        coordinate_precision: Optional[int] = None,
+        simplify_tolerance: Optional[float] = None,
+        sync: bool = False,
     ) -> None:
         self.datapackage_json: str = str(
             Path(datapackage_path) / "datapackage.json"
@@ -50,7 +155,9 @@ class OepUploadHandler:
             dataset_selection if dataset_selection is not None else []
         )
         self.oep_schema: str = oep_schema
-        self.datapackage: Package = Package(self.datapackage_json)
+        self.datapackage_basepath: str = str(Path(self.datapackage_json).parent)
+        self._datapackage: Optional[Package] = None
+        self._dataset_index: Optional[Dict[str, Dict[str, Any]]] = None
         if "OEP_TOKEN" not in os.environ:
             if api_token:
                 os.environ["OEP_TOKEN"] = api_token
@@ -64,58 +171,187 @@ class OepUploadHandler:
         self.resources: List[Resource] = []
         self.oem_paths: List[str] = []
         self.resources_ignore_list: List[str] = []
+        self.workers: int = max(1, workers)
+        self.parallel_tables: int = max(1, parallel_tables)
+        self.table_dependencies: Dict[str, Set[str]] = {}
+        self.api_url: str = (
+            api_url or os.environ.get(API_URL_ENV_VAR, OEP_API_URL)
+        ).rstrip("/")
+        api_url_parts = urlsplit(self.api_url)
+        if api_url_parts.scheme not in ("http", "https") or api_url_parts.path != "/api/v0":
+            raise ValueError(
+                f"Invalid OEP API URL '{self.api_url}', expected '<http|https>://<host>/api/v0'."
+            )
+        self.api_protocol: str = api_url_parts.scheme
+        self.api_host: str = api_url_parts.netloc
+        self.session: req.Session = req.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.workers * self.parallel_tables
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.resume: bool = resume
+        self.journal_path: Path = Path(self.datapackage_basepath).parent / UPLOAD_JOURNAL_FILENAME
+        self.failed_batches_path: Path = (
+            Path(self.datapackage_basepath).parent / FAILED_BATCHES_FILENAME
+        )
+        self._journal: Optional[UploadJournal] = None
+        self._journal_lock = threading.Lock()
+        self.batch_size: int = batch_size
+        self.adaptive_batching: bool = adaptive_batching
+        self.request_timeout: float = request_timeout
+        self.batch_size_summary: Dict[str, Dict[str, Any]] = {}
+        if transport not in TRANSPORTS:
+            raise ValueError(
+                f"Unknown transport '{transport}', use one of: {', '.join(TRANSPORTS)}."
+            )
+        self.transport: str = transport
+        self._transport_lock = threading.Lock()
+        self.compression: str = compression
+        self.content_encoding: Optional[str] = resolve_content_encoding(compression)
+        self.instrumentation: Instrumentation = instrumentation or Instrumentation()
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy(
+            instrumentation=self.instrumentation
+        )
+        self.failed_batches: List[Dict[str, Any]] = []
+        self._oep_client: Optional[OepClient] = None
+        self._oep_client_lock = threading.Lock()
+        self._oem_cache: Dict[str, Dict[str, Any]] = {}
+        self._oem_cache_lock = threading.Lock()
+        self._failed_batches_lock = threading.Lock()
+        if geometry_format not in GEOMETRY_FORMATS:
+            raise ValueError(
+                f"Unknown geometry format '{geometry_format}', use one of: {', '.join(GEOMETRY_FORMATS)}."
+            )
+        self.geometry_format: str = geometry_format
+        self.coordinate_precision: Optional[int] = coordinate_precision
+        self.simplify_tolerance: Optional[float] = simplify_tolerance
+        if sync and resume:
+            raise ValueError("Synchronizing and resuming an upload cannot be combined.")
+        self.sync: bool = sync
+        self.sync_tables: Dict[str, str] = {}
+        self.sync_summary: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def datapackage(self) -> Package:
+        """
+        The complete frictionless data package, loaded on first access.
+        Loading validates and materializes every resource, which takes a while for large packages.
+        """
+        if self._datapackage is None:
+            self._datapackage = Package(self.datapackage_json)
+        return self._datapackage
+
+    @property
+    def dataset_index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        The resource descriptors and OEM path of each dataset, read from 'datapackage.json' on first access.
+        """
+        if self._dataset_index is None:
+            self._dataset_index = index_datapackage_resources(
+                load_json(self.datapackage_json).get("resources", [])
+            )
+        return self._dataset_index
+
+    @property
+    def oep_client(self) -> OepClient:
+        """
+        The client for the OEP metadata API, created on first use.
+        """
+        with self._oep_client_lock:
+            if self._oep_client is None:
+                self._oep_client = OepClient(
+                    token=os.environ["OEP_TOKEN"],
+                    protocol=self.api_protocol,
+                    host=self.api_host,
+                    default_schema=self.oep_schema,
+                )
+            return self._oep_client
+
+    @property
+    def journal(self) -> UploadJournal:
+        """
+        The upload journal of the data package, opened on first use.
+        """
+        with self._journal_lock:
+            if self._journal is None:
+                self._journal = UploadJournal(self.journal_path)
+            return self._journal
+
+    def table_api_url(self, table_name: str) -> str:
+        """
+        Returns the OEP API URL of a table within the configured schema.
+
+        Parameters:
+            table_name (str): Name of the table.
+        """
+        return f"{self.api_url}/schema/{self.oep_schema}/tables/{table_name}/"
 
     def extract_dataset_resources(
-        self, datapackage: Package, datasets: Optional[List[str]]
+        self, datapackage: Optional[Package], datasets: Optional[List[str]]
     ) -> None:
         """
         Extracts resources from the data package based on the provided dataset selection.
 
-        If a dataset selection is provided, only resources matching those dataset names are processed.
+        If a dataset selection is provided, only resources of those datasets are processed.
         If NO dataset selection is provided, ALL resources in the data package are processed.
+        The datasets are looked up in the dataset index, and only the selected resources are materialized
+        as 'Resource' objects, so selecting a few datasets of a large package does not load all of it.
 
         Additionally, checks for the existence of corresponding OEM files for each selected dataset.
 
         Parameters:
-            datapackage (Package): The frictionless data package object to extract resources from.
+            datapackage (Optional[Package]): A loaded frictionless data package to extract resources from.
+                If None, the resources are read from 'dataset_index' instead.
             datasets (Optional[List[str]]): A list of dataset names to filter the resources by.
 
         Raises:
             ValueError: If no datasets are found matching the selection or if OEM files are missing for selected datasets.
         """
+        index = (
+            index_datapackage_resources(datapackage.resources)
+            if datapackage is not None
+            else self.dataset_index
+        )
+        selected = [
+            index[dataset_name]
+            for dataset_name in (datasets or index)
+            if dataset_name in index
+        ]
         if datasets:
-            found_resources = False
-            found_oem = False
-            for dataset_name in datasets:
-                for resource in datapackage.resources:
-                    if resource.name == (f"{dataset_name}.oem"):
-                        self.oem_paths.append(resource.path)
-                        found_oem = True
-                    elif resource.name.startswith(dataset_name):
-                        self.resources.append(resource)
-                        found_resources = True
-
-            if not found_resources:
+            if not any(dataset["resources"] for dataset in selected):
                 raise ValueError(
                     f"No datasets found for '{', '.join(datasets)}' within the data package."
                 )
-            if not found_oem:
+            if not any(dataset["oem_path"] for dataset in selected):
                 raise ValueError(
                     f"No OEM found for '{', '.join(datasets)}' within the data package."
                 )
-        else:
-            # ALL RESOURCES of data package will be handled if dataset selection is not provided
-            for resource in datapackage.resources:
-                if not resource.name.endswith(".oem"):
-                    self.resources.append(resource)
-                else:
-                    self.oem_paths.append(resource.path)
+        for dataset in selected:
+            self.resources.extend(
+                self.materialize_resource(resource)
+                for resource in dataset["resources"]
+            )
+            if dataset["oem_path"]:
+                self.oem_paths.append(dataset["oem_path"])
+
+    def materialize_resource(self, resource: Any) -> Resource:
+        """
+        Returns a 'Resource' object for a resource descriptor of the data package (resources are returned as they are).
+
+        Parameters:
+            resource (Any): A resource descriptor (dictionary) or 'Resource' object.
+        """
+        if isinstance(resource, Resource):
+            return resource
+        return Resource(resource, basepath=self.datapackage_basepath)
 
     def setup_db_connection(self):
         """
         Establishes a connection to the OEP Database API.
 
         This method attempts to set up a connection to the OEP database using the oem2orm library.
+        The connection uses the host and protocol of the configured API URL.
         It logs the outcome of the connection attempt, providing feedback on success or failure.
 
         Raises:
@@ -124,7 +360,9 @@ class OepUploadHandler:
             such as network issues, incorrect credentials, or configuration errors.
         """
         try:
-            self.db = oem2orm.setup_db_connection()
+            # oedialect reads the protocol from the environment
+            os.environ["OEDIALECT_PROTOCOL"] = self.api_protocol
+            self.db = oem2orm.setup_db_connection(host=self.api_host)
             logging.info("Connection to OEP Database API established.")
         except Exception as e:
             logging.error(
@@ -137,94 +375,792 @@ class OepUploadHandler:
         table_name: str,
         data: List[Dict[str, Any]],
         auth_headers: Dict[str, str],
-        batch_size: int = 1000,
-    ) -> None:
+        batch_size: Optional[int] = None,
+    ) -> int:
         """
         Uploads data to a specified table on the OEP in batches (to reduce possible timeout issues).
 
-        The function splits the data into batches and makes POST requests to the OEP API
-        to insert the data into the specified table.
+        The function splits the data into batches, encodes each batch directly into the JSON request body
+        and makes POST requests to the OEP API to insert the data into the specified table.
+        With the 'columnar' transport, each batch is sent to the advanced insert API with the column names only once
+        (see 'encode_columnar_batch'). If the platform does not provide that endpoint, the handler switches
+        to the 'json' transport for the rest of the upload and resends the batch.
 
         Parameters:
             table_name (str): Name of the table to upload data to.
             data (List[Dict[str, Any]]): The data to be uploaded, formatted as a list of dictionaries.
             auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
-            batch_size (int): The number of rows to include in each batch upload.
+            batch_size (Optional[int]): The number of rows to include in each batch upload. Defaults to the handler's batch size.
+
+        Returns:
+            int: The number of request body bytes sent (before compression).
 
         Raises:
             requests.exceptions.RequestException: If an error occurs during the batch upload request.
         """
+        batch_size = batch_size or self.batch_size
+        sent_bytes = 0
         for i in range(0, len(data), batch_size):
             batch = data[i : i + batch_size]
             try:
-                res = req.post(
-                    f"https://openenergy-platform.org/api/v0/schema/model_draft/tables/{table_name}/rows/new",
-                    json={"query": batch},
-                    headers=auth_headers,
-                )
-                res.raise_for_status()
+                sent_bytes += self.post_batch(table_name, batch, auth_headers)
             except req.exceptions.RequestException as e:
                 logging.error(f"An error occurred during batch upload: {e}")
                 raise
+        return sent_bytes
+
+    def post_batch(
+        self,
+        table_name: str,
+        batch: List[Dict[str, Any]],
+        auth_headers: Dict[str, str],
+    ) -> int:
+        """
+        Sends a single batch to the OEP with the configured transport.
+        If the advanced insert API is not available, the batch is sent with the 'json' transport instead, which is then
+        used for the rest of the upload; the first worker to notice switches the transport
+        (counted as 'upload.transport_fallbacks').
+
+        Parameters:
+            table_name (str): Name of the table to upload data to.
+            batch (List[Dict[str, Any]]): The rows of the batch.
+            auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
+
+        Returns:
+            int: The number of request body bytes sent (before compression).
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        if self.transport == "columnar":
+            with self.instrumentation.span("upload.encode"):
+                body = encode_columnar_batch(self.oep_schema, table_name, batch)
+            res = self.post_body(f"{self.api_url}/advanced/insert", body, auth_headers)
+            if res.status_code not in UNSUPPORTED_TRANSPORT_STATUS_CODES:
+                res.raise_for_status()
+                return len(body)
+            with self._transport_lock:
+                switched = self.transport == "columnar"
+                self.transport = "json"
+            if switched:
+                self.instrumentation.count("upload.transport_fallbacks")
+                logging.warning(
+                    f"Advanced insert API not available (HTTP {res.status_code}), using the 'json' transport instead."
+                )
+        with self.instrumentation.span("upload.encode"):
+            body = encode_batch(batch)
+        res = self.post_body(
+            f"{self.table_api_url(table_name)}rows/new", body, auth_headers
+        )
+        res.raise_for_status()
+        return len(body)
+
+    def post_body(
+        self, url: str, body: bytes, auth_headers: Dict[str, str]
+    ) -> req.Response:
+        """
+        Posts a JSON request body, compressed with the current content encoding (HTTP 'Content-Encoding').
+
+        Compression runs in the calling upload worker, not on the main thread. If the server rejects a compressed
+        body (HTTP 415, or HTTP 400 while the same body is accepted uncompressed), the body is resent
+        uncompressed and compression is turned off for the rest of the upload; with 'auto', a rejected zstd
+        encoding is replaced by gzip first. Resent bodies are counted as 'upload.compression_fallbacks'.
+
+        Parameters:
+            url (str): The URL to post to.
+            body (bytes): The uncompressed JSON request body.
+            auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
+
+        Returns:
+            requests.Response: The response of the server.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        headers = {**auth_headers, "Content-Type": "application/json"}
+        content_encoding = self.content_encoding
+        if content_encoding is None or len(body) < MIN_COMPRESSED_BODY_BYTES:
+            return self.send_request(url, body, headers)
+        with self.instrumentation.span("upload.compress"):
+            compressed_body = compress_body(body, content_encoding)
+        res = self.send_request(
+            url,
+            compressed_body,
+            {**headers, "Content-Encoding": content_encoding},
+        )
+        if res.status_code not in (400, 415):
+            return res
+        self.instrumentation.count("upload.compression_fallbacks")
+        plain_res = self.send_request(url, body, headers)
+        if res.status_code != 415 and not plain_res.ok:
+            return plain_res
+        fallback_encoding = (
+            "gzip" if self.compression == "auto" and content_encoding == "zstd" else None
+        )
+        with self._transport_lock:
+            switched = self.content_encoding == content_encoding
+            if switched:
+                self.content_encoding = fallback_encoding
+        if switched:
+            logging.warning(
+                f"Server does not accept '{content_encoding}' compressed requests (HTTP {res.status_code}), "
+                f"using {fallback_encoding or 'no'} compression instead."
+            )
+        return plain_res
+
+    def send_request(
+        self, url: str, body: bytes, headers: Dict[str, str]
+    ) -> req.Response:
+        """
+        Posts a request body with the shared session, recording the round-trip time ('upload.http' span),
+        the number of requests and the bytes sent.
+        Failed requests are retried according to the retry policy; since a row insert is not idempotent,
+        only failures that guarantee the rows were not inserted (the connection could not be established, HTTP 429/503)
+        are retried.
+
+        Parameters:
+            url (str): The URL to post to.
+            body (bytes): The request body, as sent.
+            headers (Dict[str, str]): The request headers.
+
+        Returns:
+            requests.Response: The response of the server.
+        """
+
+        def post() -> req.Response:
+            with self.instrumentation.span("upload.http"):
+                res = self.session.post(
+                    url, data=body, headers=headers, timeout=self.request_timeout
+                )
+            self.instrumentation.count("upload.requests")
+            self.instrumentation.count("upload.bytes_sent", len(body))
+            return res
+
+        return self.retry_policy.call(post, description=f"POST {url}")
 
     def upload_datasets(self):
         """
         Uploads datasets to OEP in batches, supporting CSV, JSON, and GeoPackage formats.
 
-        For each resource, this method checks if it's in the 'ignore list', prepares the data,
-        and uploads it in batches to avoid request size limits.
-        It displays a progress bar for each resource being uploaded.
-        After uploading, it updates the OEP table's metadata based on the resource's OEM file.
+        The resources are grouped by target table and scheduled along the foreign-key dependencies
+        collected in 'prepare_oep_tables': a table is only uploaded once all tables it references have finished,
+        while independent tables are uploaded at the same time (up to 'parallel_tables').
+        See 'upload_resource' for the upload of a single resource.
+        The metadata of the tables is updated in the background while the rows are uploaded,
+        once per table (see 'update_oep_metadata'). Existing tables are synchronized in sync mode (see 'sync_table').
 
         Batch failures are logged, and the process continues with the next batch or resource.
+        Finally, the batch sizes used for each resource are logged as a summary, followed by a report of the batches
+        that failed even after retrying (see 'report_failed_batches').
 
         Raises:
             Exception: On errors during batch upload, such as connection issues or formatting problems.
+                No further tables are started after such an error.
+                A failed metadata update is raised once all rows have been uploaded.
         """
         auth_headers = {"Authorization": f"Token {os.environ.get('OEP_TOKEN')}"}
-        batch_size = 2000  # number of rows per batch
 
+        resources_by_table: Dict[str, List[Resource]] = {}
         for resource in self.resources:
             table_name = resource.name.split(".")[-1]
-            resource_abs_path = Path(self.datapackage.basepath) / Path(
-                resource.path
+            if table_name not in self.resources_ignore_list:
+                resources_by_table.setdefault(table_name, []).append(resource)
+
+        def upload_table(table_name: str, table_resources: List[Resource]) -> None:
+            if table_name in self.sync_tables:
+                self.sync_table(table_name, table_resources, auth_headers)
+                return
+            for resource in table_resources:
+                self.upload_resource(resource, auth_headers, update_metadata=False)
+
+        def update_metadata(oem_path: str, table_name: str) -> None:
+            with self.instrumentation.span("upload.metadata"):
+                self.update_oep_metadata(oem_path, table_name)
+
+        with ThreadPoolExecutor(
+            max_workers=METADATA_UPLOAD_WORKERS, thread_name_prefix="oep-metadata"
+        ) as metadata_executor:
+            metadata_updates = {}
+            for table_name, table_resources in resources_by_table.items():
+                for resource in table_resources:
+                    key = (resource.custom["oem_path"], table_name)
+                    # as before the upload was streamed, the metadata is updated even if the format cannot be uploaded
+                    if key not in metadata_updates:
+                        metadata_updates[key] = metadata_executor.submit(
+                            update_metadata, *key
+                        )
+            try:
+                run_in_dependency_order(
+                    {
+                        table_name: partial(upload_table, table_name, table_resources)
+                        for table_name, table_resources in resources_by_table.items()
+                    },
+                    self.table_dependencies,
+                    max_workers=self.parallel_tables,
+                )
+            except BaseException:
+                for future in metadata_updates.values():
+                    future.cancel()
+                raise
+        metadata_errors = [
+            future.exception()
+            for future in metadata_updates.values()
+            if future.exception() is not None
+        ]
+        for name, summary in self.batch_size_summary.items():
+            logging.info(
+                f"'{name}': {summary['batches']} batches, "
+                f"rows per batch min/mean/max {summary['min_rows']}/{summary['mean_rows']}/{summary['max_rows']}, "
+                f"final {summary['final_rows']} ({summary['shrinks']} reductions)."
+            )
+        self.report_failed_batches()
+        if not self.failed_batches:
+            self.clear_journal(
+                [
+                    f"{self.oep_schema}/{resource.name}"
+                    for table_resources in resources_by_table.values()
+                    for resource in table_resources
+                ]
             )
+        if metadata_errors:
+            raise metadata_errors[0]
+        logging.info("Finished uploading.")
 
-            if table_name not in self.resources_ignore_list:
-                self.update_oep_metadata(
-                    resource.custom["oem_path"], table_name
+    def clear_journal(self, journal_keys: List[str]) -> None:
+        """
+        Removes the journal records of the given resources after they were uploaded completely,
+        and deletes the journal file once it holds no records of other resources.
+
+        Parameters:
+            journal_keys (List[str]): Journal keys of the uploaded resources.
+        """
+        if not self.journal_path.exists():
+            return
+        for journal_key in journal_keys:
+            self.journal.reset(journal_key)
+        with self._journal_lock:
+            if not self._journal.is_empty():
+                return
+            self._journal.close()
+            self._journal = None
+        for path in [self.journal_path] + [
+            Path(f"{self.journal_path}{suffix}") for suffix in SQLITE_SIDECAR_SUFFIXES
+        ]:
+            path.unlink(missing_ok=True)
+
+    def report_failed_batches(self) -> None:
+        """
+        Logs the batches that could not be uploaded and writes them to 'failed_batches_path'
+        (an existing report is removed if all batches were uploaded).
+        The acknowledged batches are recorded in the upload journal, so a run with 'resume' uploads only the missing ones.
+        """
+        report_path = self.failed_batches_path
+        if not self.failed_batches:
+            report_path.unlink(missing_ok=True)
+            return
+        failed_rows = sum(batch["rows"] for batch in self.failed_batches)
+        logging.error(
+            f"{len(self.failed_batches)} batches ({failed_rows} rows) could not be uploaded:"
+        )
+        for batch in sorted(
+            self.failed_batches,
+            key=lambda batch: (batch["resource"], batch["offset"] or 0),
+        ):
+            if batch["offset"] is None:
+                logging.error(
+                    f"  '{batch['resource']}' {batch['operation']} of row '{batch['key']}': {batch['error']}"
                 )
-                if resource.format == "csv":
-                    data_to_insert = prepare_csv_data(resource_abs_path)
-                elif resource.format == "json":
-                    data_to_insert = prepare_json_data(resource_abs_path)
-                elif resource.format == "gpkg":
-                    data_to_insert = prepare_gpkg_data(resource_abs_path)
-                else:
-                    logging.warning(
-                        f"'{resource.name}': Format not supported ('{resource.format}')."
+                continue
+            logging.error(
+                f"  '{batch['resource']}' rows {batch['offset']}-{batch['offset'] + batch['rows']}: {batch['error']}"
+            )
+        save_json(self.failed_batches, str(report_path))
+        logging.error(
+            f"Failed batches written to '{report_path}'. Upload again with '--resume' to send only the missing batches"
+            f"{' (synchronize again for failed row changes)' if self.sync else ''}."
+        )
+
+    def upload_resource(
+        self,
+        resource: Resource,
+        auth_headers: Dict[str, str],
+        update_metadata: bool = True,
+    ) -> None:
+        """
+        Uploads a single resource to its table on OEP.
+
+        The data is streamed from the file in bounded chunks and uploaded batch by batch to avoid request size limits.
+        With more than one worker, several batches of a table are sent concurrently (see 'upload_batches').
+        Only a few batches per resource are held in memory at a time, so peak memory depends on the batch size
+        instead of the dataset size.
+        It displays a progress bar for the resource being uploaded.
+        Before uploading, it updates the OEP table's metadata based on the resource's OEM file (unless 'update_metadata' is False).
+        Acknowledged batches are recorded in the upload journal (see 'upload_batches'); unless resuming,
+        previous records of the resource are discarded.
+        The batch sizes are chosen per resource by a 'BatchSizer' and recorded in 'batch_size_summary'.
+
+        Parameters:
+            resource (Resource): The resource to upload.
+            auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
+            update_metadata (bool, optional): Whether to update the table's metadata first. Defaults to True.
+        """
+        table_name = resource.name.split(".")[-1]
+        if update_metadata:
+            with self.instrumentation.span("upload.metadata"):
+                self.update_oep_metadata(resource.custom["oem_path"], table_name)
+        batches = self.read_resource_batches(resource)
+        if batches is None:
+            return
+        journal_key = f"{self.oep_schema}/{resource.name}"
+        if not self.resume and self.journal_path.exists():
+            self.journal.reset(journal_key)
+        sizer = BatchSizer(self.batch_size, adaptive=self.adaptive_batching)
+
+        with tqdm(
+            total=resource.to_descriptor().get("rows"),
+            desc=f"Uploading '{resource.name}'",
+            unit="rows",
+            leave=True,
+        ) as pbar:
+            self.upload_batches(
+                table_name,
+                self.instrumentation.iterate("upload.read", batches),
+                auth_headers,
+                pbar=pbar,
+                label=resource.name,
+                journal_key=journal_key,
+                sizer=sizer,
+            )
+        self.batch_size_summary[resource.name] = sizer.summary()
+
+    def read_resource_batches(
+        self, resource: Resource
+    ) -> Optional[Iterator[List[Dict[str, Any]]]]:
+        """
+        Returns an iterator over the rows of a resource in upload-ready batches of 'batch_size' rows,
+        with GeoPackage geometries encoded according to the geometry options.
+
+        Parameters:
+            resource (Resource): The resource to read.
+
+        Returns:
+            Optional[Iterator[List[Dict[str, Any]]]]: The batches, or None if the format is not supported.
+        """
+        read_batches = BATCH_READERS.get(resource.format)
+        if read_batches is None:
+            logging.warning(
+                f"'{resource.name}': Format not supported ('{resource.format}')."
+            )
+            return None
+        reader_options = {}
+        if resource.format == "gpkg":
+            reader_options = {
+                # GeoPackages with several layers have one resource per layer
+                "layer": resource.custom.get("layer"),
+                "geometry_format": self.geometry_format,
+                "precision": self.coordinate_precision,
+                "simplify_tolerance": self.simplify_tolerance,
+            }
+        return read_batches(
+            Path(self.datapackage_basepath) / Path(resource.path),
+            self.batch_size,
+            **reader_options,
+        )
+
+    def sync_table(
+        self,
+        table_name: str,
+        table_resources: List[Resource],
+        auth_headers: Dict[str, str],
+    ) -> Dict[str, int]:
+        """
+        Synchronizes an existing table on the OEP with the rows of its resources, sending only the differences.
+
+        The table's rows are read from the OEP in pages of 'REMOTE_PAGE_SIZE' rows (ordered by the primary key),
+        keeping only a content hash of each row by its primary key (see 'row_digest'). The local rows are then streamed
+        from the files and compared with these hashes, over the columns of the local rows:
+        rows with a new key are inserted in batches (see 'upload_batches'), changed rows are replaced one by one
+        ('PUT .../rows/<key>') and rows of the table that no longer exist locally are deleted ('DELETE .../rows/<key>').
+        Replacing and deleting a row is idempotent, so these requests are retried like other idempotent requests;
+        changes that still fail are recorded in 'failed_batches' and are sent by the next sync.
+        If a resource of the table cannot be read, no rows are deleted, as its rows would wrongly appear to be missing locally.
+
+        Values are compared in their JSON representation, with integral floats normalized to integers. Values the OEP
+        returns in another representation than the file has (e.g. geometries, which PostGIS returns as hex EWKB)
+        make rows look changed, so they are replaced needlessly but never missed; use 'ewkb' as geometry format
+        for tables with geometries.
+
+        Parameters:
+            table_name (str): Name of the table.
+            table_resources (List[Resource]): The resources whose rows make up the table.
+            auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
+
+        Returns:
+            Dict[str, int]: Number of inserted, updated, deleted and unchanged rows (also stored in 'sync_summary').
+
+        Raises:
+            ValueError: If the local rows have no primary key column.
+            requests.exceptions.RequestException: If the rows of the table cannot be read from the OEP.
+        """
+        primary_key = self.sync_tables[table_name]
+        unreadable_resources = []
+
+        def read_batches(resource: Resource) -> Iterator[List[Dict[str, Any]]]:
+            batches = self.read_resource_batches(resource)
+            if batches is None:
+                unreadable_resources.append(resource.name)
+                return iter(())
+            return batches
+
+        batches = self.instrumentation.iterate(
+            "upload.read",
+            chain.from_iterable(map(read_batches, table_resources)),
+        )
+        first_batch = next(batches, [])
+        columns = list(first_batch[0]) if first_batch else [primary_key]
+        if primary_key not in columns:
+            raise ValueError(
+                f"Cannot synchronize '{table_name}': its rows have no primary key column '{primary_key}'."
+            )
+        with self.instrumentation.span("upload.sync.read_remote"):
+            remote_digests = self.read_remote_digests(
+                table_name, primary_key, columns, auth_headers
+            )
+        summary = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        updated_rows = []
+
+        def new_rows() -> Iterator[List[Dict[str, Any]]]:
+            for batch in chain([first_batch], batches):
+                inserts = []
+                for row in batch:
+                    digest = remote_digests.pop(
+                        normalize_row_value(row.get(primary_key)), None
+                    )
+                    if digest is None:
+                        inserts.append(row)
+                    elif digest != row_digest(row, columns):
+                        updated_rows.append(row)
+                    else:
+                        summary["unchanged"] += 1
+                if inserts:
+                    yield inserts
+
+        sizer = BatchSizer(self.batch_size, adaptive=self.adaptive_batching)
+        summary["inserted"] = self.upload_batches(
+            table_name, new_rows(), auth_headers, sizer=sizer
+        )
+        if unreadable_resources and remote_digests:
+            logging.warning(
+                f"Not deleting {len(remote_digests)} rows of '{table_name}' that are missing locally, "
+                f"as these resources could not be read: {', '.join(unreadable_resources)}."
+            )
+            remote_digests = {}
+        changes = [
+            ("PUT", normalize_row_value(row[primary_key]), row) for row in updated_rows
+        ] + [("DELETE", key, None) for key in remote_digests]
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="oep-sync"
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self.send_row_change, table_name, method, key, row, auth_headers
+                ): (method, key)
+                for method, key, row in changes
+            }
+            for future in as_completed(futures):
+                method, key = futures[future]
+                operation = "update" if method == "PUT" else "delete"
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(
+                        f"Failed to {operation} row '{key}' of '{table_name}'. Error: {e}"
                     )
+                    self.instrumentation.count("upload.failed_batches")
+                    with self._failed_batches_lock:
+                        self.failed_batches.append(
+                            {
+                                "resource": table_name,
+                                "table": f"{self.oep_schema}.{table_name}",
+                                "offset": None,
+                                "rows": 1,
+                                "operation": operation,
+                                "key": key,
+                                "error": str(e),
+                            }
+                        )
                     continue
+                summary["updated" if method == "PUT" else "deleted"] += 1
+        for name, rows in summary.items():
+            self.instrumentation.count(f"upload.sync.{name}", rows)
+        if summary["inserted"]:
+            self.batch_size_summary[table_name] = sizer.summary()
+        self.sync_summary[table_name] = summary
+        logging.info(
+            f"Synchronized '{table_name}': {summary['inserted']} rows inserted, {summary['updated']} updated, "
+            f"{summary['deleted']} deleted, {summary['unchanged']} unchanged."
+        )
+        return summary
 
-                total_size = len(data_to_insert)
-                with tqdm(
-                    total=total_size,
-                    desc=f"Uploading '{resource.name}'",
-                    unit="rows",
-                    leave=True,
-                ) as pbar:
-                    for i in range(0, total_size, batch_size):
-                        batch = data_to_insert[i : i + batch_size]
-                        try:
-                            self.upload_data_to_table(
-                                table_name, batch, auth_headers, batch_size
-                            )
-                            pbar.update(len(batch))
-                        except Exception as e:
-                            logging.error(
-                                f"Failed to upload batch for {resource.name}. Error: {e}"
-                            )
-        logging.info("Finished uploading.")
+    def read_remote_digests(
+        self,
+        table_name: str,
+        primary_key: str,
+        columns: List[str],
+        auth_headers: Dict[str, str],
+    ) -> Dict[Any, bytes]:
+        """
+        Reads all rows of a table on the OEP page by page and returns the content hash of each row by its primary key.
+        Only the given columns are requested. Up to 'workers' pages are read at the same time.
+
+        Parameters:
+            table_name (str): Name of the table.
+            primary_key (str): The primary key column, by which the pages are ordered.
+            columns (List[str]): The columns to read and hash.
+            auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
+
+        Returns:
+            Dict[Any, bytes]: The hash of each row (see 'row_digest'), by its (normalized) primary key.
+
+        Raises:
+            requests.exceptions.RequestException: If a page cannot be read, even after retrying.
+        """
+        def read_page(offset: int) -> List[Dict[str, Any]]:
+            params = [("column", column) for column in columns] + [
+                ("orderby", primary_key),
+                ("limit", REMOTE_PAGE_SIZE),
+                ("offset", offset),
+            ]
+
+            def get() -> req.Response:
+                with self.instrumentation.span("upload.http"):
+                    res = self.session.get(
+                        f"{self.table_api_url(table_name)}rows/",
+                        params=params,
+                        headers=auth_headers,
+                        timeout=self.request_timeout,
+                    )
+                self.instrumentation.count("upload.requests")
+                return res
+
+            res = self.retry_policy.call(
+                get, idempotent=True, description=f"Reading rows of '{table_name}'"
+            )
+            res.raise_for_status()
+            return res.json()
+
+        digests = {}
+        offset = 0
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="oep-sync"
+        ) as executor:
+            while True:
+                pages = executor.map(
+                    read_page,
+                    range(offset, offset + self.workers * REMOTE_PAGE_SIZE, REMOTE_PAGE_SIZE),
+                )
+                offset += self.workers * REMOTE_PAGE_SIZE
+                last_page = False
+                for rows in pages:
+                    self.instrumentation.count("upload.sync.remote_rows", len(rows))
+                    for row in rows:
+                        digests[normalize_row_value(row.get(primary_key))] = row_digest(
+                            row, columns
+                        )
+                    last_page = last_page or len(rows) < REMOTE_PAGE_SIZE
+                if last_page:
+                    return digests
+
+    def send_row_change(
+        self,
+        table_name: str,
+        method: str,
+        key: Any,
+        row: Optional[Dict[str, Any]],
+        auth_headers: Dict[str, str],
+    ) -> None:
+        """
+        Replaces ('PUT') or deletes ('DELETE') a single row of a table on the OEP.
+        The OEP addresses the row by its 'id' column (see 'ROW_ID_COLUMN'), which is the primary key of synchronized tables.
+
+        Parameters:
+            table_name (str): Name of the table.
+            method (str): 'PUT' or 'DELETE'.
+            key (Any): The id of the row.
+            row (Optional[Dict[str, Any]]): The new content of the row ('PUT' only).
+            auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails, even after retrying.
+        """
+        url = f"{self.table_api_url(table_name)}rows/{quote(str(key), safe='')}"
+        body = encode_row(row) if row is not None else None
+
+        def send() -> req.Response:
+            with self.instrumentation.span("upload.http"):
+                res = self.session.request(
+                    method,
+                    url,
+                    data=body,
+                    headers={**auth_headers, "Content-Type": "application/json"},
+                    timeout=self.request_timeout,
+                )
+            self.instrumentation.count("upload.requests")
+            self.instrumentation.count("upload.bytes_sent", len(body or b""))
+            return res
+
+        self.retry_policy.call(
+            send, idempotent=True, description=f"{method} {url}"
+        ).raise_for_status()
+
+    def upload_batches(
+        self,
+        table_name: str,
+        batches: Iterable[List[Dict[str, Any]]],
+        auth_headers: Dict[str, str],
+        pbar: Optional[tqdm] = None,
+        label: Optional[str] = None,
+        journal_key: Optional[str] = None,
+        sizer: Optional[BatchSizer] = None,
+    ) -> int:
+        """
+        Uploads batches of rows to a table on the OEP, using up to 'workers' concurrent requests.
+
+        All requests share the handler's keep-alive session, so connections are reused between batches.
+        At most twice as many batches as there are workers are read ahead, which keeps memory bounded
+        when the batches are streamed from a file. The progress bar is updated once a batch has been acknowledged.
+
+        If a journal key is given, every acknowledged batch is recorded in the upload journal with its row offset
+        and content hash. When resuming, batches that are already recorded are skipped after checking that their content is unchanged.
+
+        If a batch sizer is given, the incoming rows are re-sliced into batches of the size it currently chooses, and each
+        request's latency and payload size are fed back to it. A batch rejected as too large (HTTP 413) shrinks
+        the batch size and is retried in two halves. A batch that was too slow (HTTP 504 or a timeout) shrinks the
+        size of the following batches, but is recorded as failed and not resent, as the OEP may have inserted its rows.
+
+        Parameters:
+            table_name (str): Name of the table to upload data to.
+            batches (Iterable[List[Dict[str, Any]]]): Batches of rows, formatted as lists of dictionaries.
+            auth_headers (Dict[str, str]): Authorization headers containing the OEP API token.
+            pbar (Optional[tqdm]): Progress bar to update with the number of uploaded rows.
+            label (Optional[str]): Name used in log messages, defaults to the table name.
+            journal_key (Optional[str]): Key of the resource in the upload journal. If None, no journal is kept.
+            sizer (Optional[BatchSizer]): Chooses the batch sizes. If None, the batches are uploaded as given.
+
+        Returns:
+            int: The number of rows that were uploaded successfully (excluding skipped batches).
+
+        Raises:
+            ValueError: When resuming, if the content of an acknowledged batch has changed since the previous run.
+        """
+        label = label or table_name
+        uploaded_rows = 0
+        acknowledged = (
+            self.journal.acknowledged_batches(journal_key)
+            if journal_key and self.resume
+            else {}
+        )
+
+        if sizer is not None:
+            batches = rebatch(batches, sizer, acknowledged)
+
+        def upload(batch: List[Dict[str, Any]], offset: int) -> int:
+            started = time.perf_counter()
+            try:
+                sent_bytes = self.upload_data_to_table(
+                    table_name, batch, auth_headers, max(1, len(batch))
+                )
+            except req.exceptions.RequestException as e:
+                if sizer is not None and is_slow_request_error(e):
+                    sizer.record_failure()
+                    raise
+                if (
+                    sizer is None
+                    or len(batch) < 2
+                    or not is_oversized_request_error(e)
+                ):
+                    raise
+                sizer.record_failure()
+                self.instrumentation.count("upload.retries")
+                half = len(batch) // 2
+                logging.warning(
+                    f"Batch of {len(batch)} rows for {label} was too large ({e}), retrying in two halves."
+                )
+                return upload(batch[:half], offset) + upload(
+                    batch[half:], offset + half
+                )
+            if sizer is not None:
+                sizer.record_success(
+                    len(batch), sent_bytes, time.perf_counter() - started
+                )
+            self.instrumentation.count("upload.batches")
+            self.instrumentation.count("upload.rows", len(batch))
+            if journal_key:
+                self.journal.record_batch(
+                    journal_key,
+                    f"{self.oep_schema}.{table_name}",
+                    offset,
+                    len(batch),
+                    batch_hash(batch),
+                )
+            return len(batch)
+
+        def collect(future) -> None:
+            nonlocal uploaded_rows
+            batch_offset, batch_rows = submitted.pop(future)
+            try:
+                rows = future.result()
+            except Exception as e:
+                logging.error(
+                    f"Failed to upload batch for {label} (rows {batch_offset}-{batch_offset + batch_rows}). Error: {e}"
+                )
+                self.instrumentation.count("upload.failed_batches")
+                with self._failed_batches_lock:
+                    self.failed_batches.append(
+                        {
+                            "resource": label,
+                            "table": f"{self.oep_schema}.{table_name}",
+                            "offset": batch_offset,
+                            "rows": batch_rows,
+                            "error": str(e),
+                        }
+                    )
+                return
+            uploaded_rows += rows
+            if pbar is not None:
+                pbar.update(rows)
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="oep-upload"
+        ) as executor:
+            pending = set()
+            submitted = {}
+            offset = 0
+            for batch in batches:
+                batch_offset, offset = offset, offset + len(batch)
+                if batch_offset in acknowledged:
+                    if acknowledged[batch_offset] != (
+                        len(batch),
+                        batch_hash(batch),
+                    ):
+                        raise ValueError(
+                            f"Cannot resume upload of {label}: rows {batch_offset}-{offset} changed since the previous run."
+                        )
+                    if pbar is not None:
+                        pbar.update(len(batch))
+                    self.instrumentation.count("upload.skipped_batches")
+                    continue
+                future = executor.submit(upload, batch, batch_offset)
+                submitted[future] = (batch_offset, len(batch))
+                pending.add(future)
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+            done, _ = wait(pending)
+            for future in done:
+                collect(future)
+        return uploaded_rows
 
     def prepare_oep_tables(self, datapackage_path):
         """
@@ -232,6 +1168,10 @@ class OepUploadHandler:
 
         This method checks if tables already exist on the OEP and offers the user the option to overwrite them.
         It deletes existing tables if chosen to overwrite and creates new tables from the OEM metadata.
+        When resuming, existing tables with batches recorded in the upload journal are kept without asking.
+        In sync mode, existing tables with the primary key 'id' (by which the OEP addresses single rows)
+        are kept without asking and synchronized (see 'sync_table').
+        The foreign-key dependencies between the tables are recorded in 'table_dependencies' for scheduling the upload.
 
         Parameters:
             datapackage_path (str): Path to the directory containing the datapackage and OEM files.
@@ -244,9 +1184,33 @@ class OepUploadHandler:
             )
             existing_tables = []
             for table in tables_orm:
+                self.table_dependencies[table.name] = {
+                    fk.target_fullname.split(".")[-2]
+                    for fk in table.foreign_keys
+                } - {table.name}
                 if self.db.engine.dialect.has_table(
                     self.db.engine, table.name, schema=table.schema
                 ):
+                    if self.resume and self.journal.has_table(
+                        f"{self.oep_schema}.{table.name}"
+                    ):
+                        existing_tables.append(table)
+                        logging.info(
+                            f"Resuming upload to existing table on OEP: '{table.name}'."
+                        )
+                        continue
+                    primary_key = [column.name for column in table.primary_key.columns]
+                    if self.sync and primary_key == [ROW_ID_COLUMN]:
+                        existing_tables.append(table)
+                        self.sync_tables[table.name] = ROW_ID_COLUMN
+                        logging.info(
+                            f"Synchronizing existing table on OEP: '{table.name}'."
+                        )
+                        continue
+                    if self.sync:
+                        logging.warning(
+                            f"Table '{table.name}' cannot be synchronized, it needs the primary key '{ROW_ID_COLUMN}' in the OEM."
+                        )
                     while True:
                         table_warning = input(
                             f"Table '{table.name}' already exists on OEP. Do you want to REPLACE it? [y] or [n]\n>>> "
@@ -256,12 +1220,17 @@ class OepUploadHandler:
                             self.resources_ignore_list.append(table.name)
                             break
                         elif re.fullmatch("[Yy]", table_warning):
-                            table_api_url = f"https://openenergy-platform.org/api/v0/schema/model_draft/tables/{table.name}/"
-                            req.delete(
-                                table_api_url,
-                                headers={
-                                    "Authorization": f"Token {os.environ.get('OEP_TOKEN')}"
-                                },
+                            self.retry_policy.call(
+                                partial(
+                                    self.session.delete,
+                                    self.table_api_url(table.name),
+                                    headers={
+                                        "Authorization": f"Token {os.environ.get('OEP_TOKEN')}"
+                                    },
+                                    timeout=self.request_timeout,
+                                ),
+                                idempotent=True,
+                                description=f"Deleting table '{table.name}'",
                             )
                             logging.info(
                                 f"Deleted existing table on OEP: '{table.name}'."
@@ -326,10 +1295,9 @@ class OepUploadHandler:
         - table_name (str): The name of the table for which to update the metadata, which also matches the resource name to keep.
 
         This function modifies the metadata in-memory to only include the resource matching the table_name before uploading.
+        Each OEM file is parsed only once per run (see 'load_oem'), and all updates share one client ('oep_client').
         """
-        oem_path = Path(self.datapackage.basepath) / Path(oem_path)
-        with open(oem_path) as json_file:
-            metadata = json.load(json_file)
+        metadata = dict(self.load_oem(oem_path))
 
         filtered_resources = [
             resource
@@ -344,10 +1312,12 @@ class OepUploadHandler:
 
         metadata["resources"] = filtered_resources
         try:
-            cli = OepClient(
-                token=os.environ["OEP_TOKEN"], default_schema=self.oep_schema
+            self.retry_policy.call(
+                partial(self.oep_client.set_metadata, table_name, metadata),
+                idempotent=True,
+                description=f"Updating metadata of '{table_name}'",
+                retry_on=(OepServerSideException,),
             )
-            cli.set_metadata(table_name, metadata)
             logging.info(f"Updated metadata for table '{table_name}' on OEP.")
         except Exception as e:
             logging.error(
@@ -355,11 +1325,62 @@ class OepUploadHandler:
             )
             raise
 
+    def load_oem(self, oem_path: str) -> Dict[str, Any]:
+        """
+        Returns the parsed content of an OEM file of the data package, reading it only on first use.
+        The returned dictionary is shared, so callers must copy it before modifying it.
+
+        Parameters:
+            oem_path (str): The path to the OEM file, relative to the data package.
+        """
+        with self._oem_cache_lock:
+            metadata = self._oem_cache.get(oem_path)
+        if metadata is None:
+            metadata = load_json(str(Path(self.datapackage_basepath) / Path(oem_path)))
+            with self._oem_cache_lock:
+                metadata = self._oem_cache.setdefault(oem_path, metadata)
+        return metadata
+
     def run_all(self):
-        self.setup_db_connection()
-        self.extract_dataset_resources(self.datapackage, self.dataset_selection)
-        self.prepare_oep_tables(self.datapackage_json)
-        self.upload_datasets()
+        with self.instrumentation.span("upload.connect"):
+            self.setup_db_connection()
+        self.extract_dataset_resources(None, self.dataset_selection)
+        with self.instrumentation.span("upload.prepare_tables"):
+            self.prepare_oep_tables(self.datapackage_json)
+        with self.instrumentation.span("upload.datasets"):
+            self.upload_datasets()
+
+
+def is_oversized_request_error(error: req.exceptions.RequestException) -> bool:
+    """
+    Checks whether a failed request was rejected for being too large before it was processed,
+    i.e. whether it is safe and worth retrying it with fewer rows.
+
+    Parameters:
+        error (requests.exceptions.RequestException): The error raised by the request.
+    """
+    response = getattr(error, "response", None)
+    return (
+        response is not None
+        and response.status_code in OVERSIZED_REQUEST_STATUS_CODES
+    )
+
+
+def is_slow_request_error(error: req.exceptions.RequestException) -> bool:
+    """
+    Checks whether a failed request took too long (a timeout or HTTP 504). Such a request may have been
+    processed anyway, so it must not be resent, but the following requests should carry fewer rows.
+
+    Parameters:
+        error (requests.exceptions.RequestException): The error raised by the request.
+    """
+    if isinstance(error, req.exceptions.Timeout):
+        return True
+    response = getattr(error, "response", None)
+    return (
+        response is not None
+        and response.status_code in SLOW_REQUEST_STATUS_CODES
+    )
 
 
 # ------------------------------------------------------------------------------
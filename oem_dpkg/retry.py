@@ -0,0 +1,246 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional, Tuple, Type
+
+import requests as req
+from urllib3.exceptions import NewConnectionError
+
+from oem_dpkg.instrumentation import Instrumentation
+
+# HTTP status codes with which the server signals that it did not process the request (retried for all requests)
+UNPROCESSED_STATUS_CODES = (429, 503)
+# HTTP status codes that may be answered after the request was (partly) processed (only retried for idempotent requests);
+# a proxy answers 502 also if the OEP failed after processing the request
+AMBIGUOUS_STATUS_CODES = (500, 502, 504)
+# HTTP status codes that indicate an overloaded server (counted by the circuit breaker)
+OVERLOAD_STATUS_CODES = (429, 502, 503)
+
+
+class CircuitBreaker:
+    """
+    Pauses all requests to a server that appears to be overloaded.
+
+    After 'failure_threshold' consecutive overload failures (HTTP 429/502/503 or connection errors), the breaker opens:
+    every caller of 'wait' blocks until 'reset_timeout' seconds (or a longer 'Retry-After' of the server) have passed.
+    Afterwards requests are let through again; the breaker closes on the first success and opens again on the
+    next overload failure. All methods are thread-safe, so one breaker can be shared by all upload workers.
+
+    Parameters:
+        failure_threshold (int): Number of consecutive overload failures that open the breaker. Default is 5.
+        reset_timeout (float): Seconds the breaker stays open. Default is 30.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.consecutive_failures: int = 0
+        self.times_opened: int = 0
+        self._open_until: float = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return time.monotonic() < self._open_until
+
+    def wait(self) -> float:
+        """
+        Blocks while the breaker is open.
+
+        Returns:
+        - float: The number of seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return waited
+            time.sleep(remaining)
+            waited += remaining
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def record_failure(self, retry_after: Optional[float] = None) -> bool:
+        """
+        Records an overload failure and opens the breaker if the threshold is reached.
+
+        Parameters:
+        - retry_after (Optional[float]): Seconds the server asked to wait ('Retry-After').
+
+        Returns:
+        - bool: True if the breaker was opened by this failure.
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            now = time.monotonic()
+            if self.consecutive_failures < self.failure_threshold or now < self._open_until:
+                return False
+            self._open_until = now + max(self.reset_timeout, retry_after or 0.0)
+            self.times_opened += 1
+        logging.warning(
+            f"OEP seems to be overloaded ({self.consecutive_failures} failed requests in a row), "
+            f"pausing all requests for {self._open_until - now:.1f} s."
+        )
+        return True
+
+
+class RetryPolicy:
+    """
+    Retries failed requests to the OEP with exponential backoff and jitter.
+
+    Requests are only retried if that cannot duplicate data: failures to establish the connection and HTTP 429/503
+    are retried for all requests; other connection errors (e.g. a connection reset after the request was sent),
+    HTTP 500/502/504 and timeouts only for idempotent requests (e.g. deletes and metadata updates),
+    since a row insert may already have been processed when they occur. The delay before attempt n is drawn from
+    [0, min(backoff_max, backoff_base * 2^(n-1))] ("full jitter"); a 'Retry-After' header of the server is respected.
+    A circuit breaker shared by all requests pauses them while the server is overloaded.
+
+    Parameters:
+        max_attempts (int): Maximum number of attempts per request (1 disables retries). Default is 5.
+        backoff_base (float): Base delay in seconds. Default is 1.
+        backoff_max (float): Maximum delay in seconds (not applied to 'Retry-After'). Default is 60.
+        jitter (bool): If False, the maximum delay of each attempt is used. Default is True.
+        breaker (Optional[CircuitBreaker]): Circuit breaker shared by all requests. Default is None (a new breaker).
+        instrumentation (Optional[Instrumentation]): Counts retries ('requests.retries') and time spent waiting ('requests.backoff').
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        jitter: bool = True,
+        breaker: Optional[CircuitBreaker] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ) -> None:
+        self.max_attempts: int = max(1, max_attempts)
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self.jitter: bool = jitter
+        self.breaker: CircuitBreaker = breaker or CircuitBreaker()
+        self.instrumentation: Instrumentation = instrumentation or Instrumentation()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns the delay before the next attempt, after the given (failed) attempt.
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def call(
+        self,
+        send: Callable[[], Any],
+        idempotent: bool = False,
+        description: str = "Request",
+        retry_on: Tuple[Type[Exception], ...] = (),
+    ) -> Any:
+        """
+        Calls 'send' until it succeeds, fails permanently or the attempts are used up.
+
+        Parameters:
+        - send (Callable[[], Any]): Sends the request and returns the response (or any result).
+        - idempotent (bool, optional): Whether the request can safely be repeated. Defaults to False.
+        - description (str, optional): Describes the request in log messages.
+        - retry_on (Tuple[Type[Exception], ...], optional): Further exceptions that are retried (idempotent requests only).
+
+        Returns:
+        - Any: The result of the last attempt. For HTTP responses, this may be an error response
+          that was not retried or the last one after all attempts.
+
+        Raises:
+        - Exception: The exception of the last attempt, if it raised one that was not retried or all attempts failed.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            waited = self.breaker.wait()
+            if waited:
+                self.instrumentation.record("requests.backoff", waited)
+            retry_after = None
+            try:
+                result = send()
+            except req.exceptions.ConnectionError as e:
+                if not (idempotent or is_connect_error(e)) or attempt >= self.max_attempts:
+                    raise
+                self.breaker.record_failure()
+                reason = f"connection error: {e}"
+            except req.exceptions.Timeout as e:
+                if not idempotent or attempt >= self.max_attempts:
+                    raise
+                reason = f"timeout: {e}"
+            except retry_on as e:
+                if not idempotent or attempt >= self.max_attempts:
+                    raise
+                reason = str(e)
+            else:
+                status = getattr(result, "status_code", None)
+                retryable = status in UNPROCESSED_STATUS_CODES or (
+                    idempotent and status in AMBIGUOUS_STATUS_CODES
+                )
+                if status in OVERLOAD_STATUS_CODES:
+                    retry_after = parse_retry_after(result)
+                    self.breaker.record_failure(retry_after)
+                elif status is None or status < 500:
+                    self.breaker.record_success()
+                if not retryable or attempt >= self.max_attempts:
+                    return result
+                reason = f"HTTP {status}"
+            delay = max(self.backoff(attempt), retry_after or 0.0)
+            logging.warning(
+                f"{description} failed ({reason}), retrying in {delay:.1f} s (attempt {attempt + 1}/{self.max_attempts})."
+            )
+            self.instrumentation.count("requests.retries")
+            self.instrumentation.record("requests.backoff", delay)
+            time.sleep(delay)
+
+
+def is_connect_error(error: req.exceptions.ConnectionError) -> bool:
+    """
+    Checks whether a connection error occurred while establishing the connection, i.e. before any part
+    of the request was sent, so that the server cannot have processed it.
+
+    Parameters:
+        error (requests.exceptions.ConnectionError): The error raised by the request.
+
+    Returns:
+        bool: True for connect timeouts and failures to open a connection (e.g. refused connections or unknown hosts).
+    """
+    if isinstance(error, req.exceptions.ConnectTimeout):
+        return True
+    # requests wraps the urllib3 error that caused the failure, usually in a 'MaxRetryError'
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
+def parse_retry_after(response: req.Response) -> Optional[float]:
+    """
+    Returns the number of seconds a response asks to wait before retrying ('Retry-After' header),
+    given either as seconds or as an HTTP date.
+
+    Parameters:
+        response (requests.Response): The response.
+
+    Returns:
+        Optional[float]: The number of seconds, or None if the header is missing or invalid.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
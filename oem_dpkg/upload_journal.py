@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+
+class UploadJournal:
+    """
+    Persistent journal of the batches that were acknowledged by the OEP during an upload.
+
+    The journal is a small SQLite database (by default next to the data package directory) that records, for each resource,
+    the row offset, the number of rows and a content hash of every successfully uploaded batch.
+    It allows an interrupted upload to be resumed exactly where it stopped, instead of re-uploading the whole table.
+    All methods are thread-safe, so the journal can be shared by concurrent upload workers.
+
+    Parameters:
+        path (Union[str, Path]): Path to the SQLite journal file; it is created if it does not exist.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path: Path = Path(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.path), check_same_thread=False
+        )
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS batches (
+                    resource TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    row_offset INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    acknowledged_at TEXT NOT NULL,
+                    PRIMARY KEY (resource, row_offset)
+                )
+                """
+            )
+
+    def acknowledged_batches(self, resource: str) -> Dict[int, Tuple[int, str]]:
+        """
+        Returns the acknowledged batches of a resource.
+
+        Parameters:
+        - resource (str): Journal key of the resource.
+
+        Returns:
+        - Dict[int, Tuple[int, str]]: Number of rows and content hash of each batch, by row offset.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT row_offset, rows, hash FROM batches WHERE resource = ?",
+                (resource,),
+            ).fetchall()
+        return {offset: (count, digest) for offset, count, digest in rows}
+
+    def has_table(self, table_name: str) -> bool:
+        """
+        Checks whether any batch was acknowledged for the given table.
+
+        Parameters:
+        - table_name (str): Schema-qualified name of the table.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM batches WHERE table_name = ? LIMIT 1",
+                (table_name,),
+            ).fetchone()
+        return row is not None
+
+    def is_empty(self) -> bool:
+        """Checks whether the journal holds no acknowledged batches."""
+        with self._lock:
+            row = self._connection.execute("SELECT 1 FROM batches LIMIT 1").fetchone()
+        return row is None
+
+    def record_batch(
+        self,
+        resource: str,
+        table_name: str,
+        offset: int,
+        rows: int,
+        digest: str,
+    ) -> None:
+        """
+        Records a batch as acknowledged by the OEP.
+
+        Parameters:
+        - resource (str): Journal key of the resource.
+        - table_name (str): Schema-qualified name of the table the batch was uploaded to.
+        - offset (int): Row offset of the batch within the resource.
+        - rows (int): Number of rows in the batch.
+        - digest (str): Content hash of the batch.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO batches VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    resource,
+                    table_name,
+                    offset,
+                    rows,
+                    digest,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def reset(self, resource: str) -> None:
+        """
+        Removes all recorded batches of a resource, e.g. before it is uploaded from scratch.
+
+        Parameters:
+        - resource (str): Journal key of the resource.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM batches WHERE resource = ?", (resource,)
+            )
+
+    def close(self) -> None:
+        """Closes the connection to the journal file."""
+        with self._lock:
+            self._connection.close()
@@ -1,10 +1,79 @@
+import errno
+import gzip
+import hashlib
+import logging
 import os
+import random
+import re
+import shutil
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
 import fiona
 import json
 import pandas as pd
 import geopandas as gpd
+import numpy as np
+import shapely
+
+try:
+    import orjson
+except ImportError:  # optional, speeds up encoding of upload batches
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional, enables zstd compression of upload batches
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, reflinks are not supported there
+    fcntl = None
+
+# ioctl request to clone a file on copy-on-write filesystems (Linux, e.g. Btrfs, XFS)
+FICLONE = 0x40049409
+STAGING_STRATEGIES = ("auto", "copy", "reflink", "hardlink", "symlink")
+COMPRESSIONS = ("none", "auto", "gzip", "zstd")
+# Text encodings of geometries in upload batches (see 'encode_geometries')
+GEOMETRY_FORMATS = ("wkt", "ewkt", "wkb", "ewkb")
+# Multi-part geometry types, with their single-part type and the function that wraps single parts into them
+MULTIPART_GEOMETRY_TYPES = {
+    shapely.GeometryType.MULTIPOINT: (shapely.GeometryType.POINT, shapely.multipoints),
+    shapely.GeometryType.MULTILINESTRING: (shapely.GeometryType.LINESTRING, shapely.multilinestrings),
+    shapely.GeometryType.MULTIPOLYGON: (shapely.GeometryType.POLYGON, shapely.multipolygons),
+}
+# Transient files SQLite (and thus GDAL for GeoPackages) keeps next to a database.
+SQLITE_SIDECAR_SUFFIXES = ("-shm", "-wal", "-journal")
+# Geometry types of the GeoPackage catalog, named as by Fiona
+GPKG_GEOMETRY_TYPES = {
+    "GEOMETRY": "Unknown",
+    "POINT": "Point",
+    "LINESTRING": "LineString",
+    "POLYGON": "Polygon",
+    "MULTIPOINT": "MultiPoint",
+    "MULTILINESTRING": "MultiLineString",
+    "MULTIPOLYGON": "MultiPolygon",
+    "GEOMETRYCOLLECTION": "GeometryCollection",
+}
+# Column types of GeoPackage tables (without size, e.g. 'TEXT(255)'), named as by Fiona
+GPKG_COLUMN_TYPES = {
+    "BOOLEAN": "bool",
+    "TINYINT": "int",
+    "SMALLINT": "int",
+    "MEDIUMINT": "int",
+    "INT": "int",
+    "INTEGER": "int",
+    "FLOAT": "float",
+    "DOUBLE": "float",
+    "REAL": "float",
+    "TEXT": "str",
+    "DATE": "date",
+    "DATETIME": "datetime",
+}
 
 
 def get_folder_name(file_path: Path) -> str:
@@ -64,30 +133,203 @@ def find_metadata_json_files(start_path: str) -> List[str]:
     Returns:
     - List[str]: A list of paths to 'metadata.json' files found within the directory.
     """
-    metadata_file_paths = []  # List to store paths to metadata.json files
+    return [
+        directory["metadata"]
+        for directory in scan_directory_tree(start_path).values()
+        if directory["metadata"]
+    ]
 
-    # Recursively walk through all directories starting from start_path
-    for dirpath, dirnames, filenames in os.walk(start_path):
-        # Check if 'metadata.json' is among the files in the current directory
-        if "metadata.json" in filenames:
-            # Add the path to the metadata.json file to the list
-            metadata_file_paths.append(os.path.join(dirpath, "metadata.json"))
 
-    return metadata_file_paths
+def scan_directory_tree(start_path: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    """
+    Scans a directory tree in a single pass using 'os.scandir' and returns an in-memory index of it,
+    so that dataset files, metadata files and their stat info can be looked up without walking the tree again.
+    Directories are indexed in the same (top-down) order as 'os.walk' would yield them, and as with 'os.walk',
+    symbolic links to directories are not followed.
+    '.gitkeep', 'datapackage.json' and SQLite sidecar files are not indexed.
+
+    Parameters:
+    - start_path (Union[str, Path]): The directory to scan.
+
+    Returns:
+    - Dict[str, Dict[str, Any]]: The index by directory path. Each entry holds the directory 'name',
+      the path to its 'metadata.json' ('metadata', None if missing) and its dataset files with
+      their stat results ('files', by file path; 'metadata.json' included).
+    """
+    index = {}
+    pending = [str(Path(start_path))]
+    while pending:
+        dirpath = pending.pop()
+        directory = {"name": os.path.basename(dirpath), "metadata": None, "files": {}}
+        subdirs = []
+        try:
+            entries = list(os.scandir(dirpath))
+        except OSError as e:
+            logging.warning(f"Could not scan directory '{dirpath}': {e}")
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file() and not (
+                entry.name.endswith(".gitkeep")
+                or entry.name.endswith(SQLITE_SIDECAR_SUFFIXES)
+                or entry.name == "datapackage.json"
+            ):
+                directory["files"][entry.path] = entry.stat()
+                if entry.name == "metadata.json":
+                    directory["metadata"] = entry.path
+        index[dirpath] = directory
+        # reversed, so the subdirectories are popped in scan order
+        pending.extend(reversed(subdirs))
+    return index
+
+
+def get_gpkg_layers_metadata(gpkg_path: str) -> List[Dict[str, Any]]:
+    """
+    Extracts the Coordinate Reference System (CRS), geometry type, bounding box and field schema
+    of every feature layer of a GeoPackage file from its SQLite catalog, without reading any features.
+
+    The catalog tables 'gpkg_contents', 'gpkg_geometry_columns' and 'gpkg_spatial_ref_sys' are queried directly.
+    The bounding box is taken from 'gpkg_contents', or from the R-tree spatial index if no extent is stored there.
+    Layers the catalog does not fully describe (e.g. a CRS without EPSG code, curved geometries or no extent at all)
+    are read with Fiona instead (see 'get_metadata_from_gpkg'), as is the whole file if it cannot be read as a GeoPackage.
+
+    Parameters:
+    - gpkg_path (str): The path to the GeoPackage file.
+
+    Returns:
+    - List[Dict[str, Any]]: For each layer in catalog order, its name ('layer') and its metadata as returned by 'get_metadata_from_gpkg'.
+    """
+    try:
+        # 'immutable' keeps SQLite from creating '-shm'/'-wal' files next to GeoPackages in WAL mode, but it also
+        # ignores an existing '-wal' file, which may hold changes not yet written to the database, so it is only used
+        # without one. The path is not resolved, so files staged as symlinks are read through the link.
+        immutable = not os.path.exists(f"{gpkg_path}-wal")
+        connection = sqlite3.connect(
+            f"{Path(gpkg_path).absolute().as_uri()}?mode=ro{'&immutable=1' if immutable else ''}",
+            uri=True,
+        )
+    except sqlite3.Error:
+        connection = None
+    if connection is None:
+        return [
+            {"layer": layer, **get_metadata_from_gpkg(gpkg_path, layer)}
+            for layer in fiona.listlayers(gpkg_path)
+        ]
+    try:
+        rows = connection.execute(
+            """
+            SELECT c.table_name, c.min_x, c.min_y, c.max_x, c.max_y,
+                   g.column_name, g.geometry_type_name, g.z, g.m,
+                   s.organization, s.organization_coordsys_id
+            FROM gpkg_contents c
+            JOIN gpkg_geometry_columns g ON g.table_name = c.table_name
+            LEFT JOIN gpkg_spatial_ref_sys s ON s.srs_id = g.srs_id
+            WHERE c.data_type = 'features'
+            ORDER BY c.rowid
+            """
+        ).fetchall()
+        layers = []
+        for (
+            layer,
+            min_x,
+            min_y,
+            max_x,
+            max_y,
+            geometry_column,
+            geometry_type,
+            z,
+            m,
+            organization,
+            coordsys_id,
+        ) in rows:
+            geometry_type = GPKG_GEOMETRY_TYPES.get(str(geometry_type).upper())
+            bbox = (min_x, min_y, max_x, max_y)
+            if None in bbox:
+                bbox = read_gpkg_rtree_extent(connection, layer, geometry_column)
+            if (
+                geometry_type is None
+                or m
+                or bbox is None
+                or str(organization).upper() != "EPSG"
+            ):
+                layers.append({"layer": layer, **get_metadata_from_gpkg(gpkg_path, layer)})
+                continue
+            columns = connection.execute(
+                f'PRAGMA table_info("{layer.replace(chr(34), chr(34) * 2)}")'
+            ).fetchall()
+            fields = [
+                {
+                    "name": name,
+                    "type": convert_dtype_to_frictionless_type(
+                        GPKG_COLUMN_TYPES.get(
+                            re.sub(r"\(.*\)", "", column_type).strip().upper(), "str"
+                        )
+                    ),
+                }
+                for _, name, column_type, _, _, primary_key in columns
+                if name != geometry_column
+                and not (primary_key and column_type.upper() == "INTEGER")
+            ]
+            layers.append(
+                {
+                    "layer": layer,
+                    "crs": f"EPSG:{coordsys_id}",
+                    "geometry_type": f"3D {geometry_type}" if z else geometry_type,
+                    # rounded like the extent reported by GDAL
+                    "bounding_box": tuple(float(f"{value:.15g}") for value in bbox),
+                    "schema": {"fields": fields},
+                }
+            )
+        return layers
+    except sqlite3.Error as e:
+        logging.debug(f"Could not read the GeoPackage catalog of '{gpkg_path}': {e}")
+        return [
+            {"layer": layer, **get_metadata_from_gpkg(gpkg_path, layer)}
+            for layer in fiona.listlayers(gpkg_path)
+        ]
+    finally:
+        connection.close()
+
+
+def read_gpkg_rtree_extent(
+    connection: sqlite3.Connection, layer: str, geometry_column: str
+) -> Optional[tuple]:
+    """
+    Returns the extent of a GeoPackage layer from its R-tree spatial index, if it has one.
+    The R-tree stores single precision bounds rounded outwards, so the extent may be slightly larger than the exact one.
+
+    Parameters:
+    - connection (sqlite3.Connection): The connection to the GeoPackage.
+    - layer (str): The name of the layer.
+    - geometry_column (str): The name of the geometry column.
+
+    Returns:
+    - Optional[tuple]: The extent as (min_x, min_y, max_x, max_y), or None if there is no (non-empty) index.
+    """
+    rtree = f"rtree_{layer}_{geometry_column}".replace('"', '""')
+    try:
+        extent = connection.execute(
+            f'SELECT min(minx), min(miny), max(maxx), max(maxy) FROM "{rtree}"'
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    return extent if extent is not None and None not in extent else None
 
 
-def get_metadata_from_gpkg(gpkg_path: str) -> Dict[str, Any]:
+def get_metadata_from_gpkg(gpkg_path: str, layer: Optional[str] = None) -> Dict[str, Any]:
     """
     Extracts and returns the Coordinate Reference System (CRS), geometry type,
     and bounding box from a GeoPackage file.
 
     Parameters:
     - gpkg_path (str): The path to the GeoPackage file.
+    - layer (Optional[str]): The layer to describe. Defaults to the first layer.
 
     Returns:
     - Dict[str, Any]: A dictionary containing the CRS, geometry type, and bounding box of the GeoPackage.
     """
-    with fiona.open(gpkg_path) as src:
+    with fiona.open(gpkg_path, layer=layer) as src:
         # Extract CRS
         crs = src.crs
         # Extract geometry type
@@ -140,6 +382,99 @@ def convert_dtype_to_frictionless_type(dtype: str) -> str:
     return type_mapping.get(dtype.lower(), "string")
 
 
+def convert_oem_type_to_frictionless_type(oem_type: str) -> str:
+    """
+    Converts a field type of the OEM (PostgreSQL types such as 'bigint', 'varchar(50)', 'timestamp'
+    or 'geometry(Point, 3035)') to a Field type supported in Frictionless framework.
+
+    Parameters:
+    - oem_type (str): The field type declared in the OEM.
+
+    Returns:
+    - str: The corresponding Frictionless Field type ('any' for unknown types, e.g. geometries).
+    """
+    oem_type = oem_type.strip().lower()
+    if oem_type.endswith("[]"):
+        return "array"
+    base_type = re.sub(r"\(.*\)", "", oem_type).strip()
+    type_mapping = {
+        "smallint": "integer",
+        "bigint": "integer",
+        "serial": "integer",
+        "bigserial": "integer",
+        "decimal": "number",
+        "numeric": "number",
+        "double precision": "number",
+        "float8": "number",
+        "varchar": "string",
+        "character varying": "string",
+        "char": "string",
+        "character": "string",
+        "timestamp": "datetime",
+        "timestamptz": "datetime",
+        "timestamp with time zone": "datetime",
+        "timestamp without time zone": "datetime",
+        "json": "object",
+        "jsonb": "object",
+        "string": "string",
+        "number": "number",
+        "datetime": "datetime",
+        "object": "object",
+        "array": "array",
+        "year": "year",
+    }
+    if base_type in type_mapping:
+        return type_mapping[base_type]
+    converted = convert_dtype_to_frictionless_type(base_type)
+    if converted == "string" and base_type not in ("str", "string", "text"):
+        return "any"
+    return converted
+
+
+def oem_resource_schema(
+    oem: Dict[str, Any], file_path: Union[str, Path]
+) -> Optional[Dict[str, Any]]:
+    """
+    Returns the schema an OEM declares for a data file as a Frictionless schema descriptor.
+    The OEM resource is matched by its name (the file name without extension) or by the file name of its path.
+
+    Parameters:
+    - oem (Dict[str, Any]): The OEM metadata of the dataset.
+    - file_path (Union[str, Path]): The path to the data file.
+
+    Returns:
+    - Optional[Dict[str, Any]]: The fields (with converted types) and primary key, or None if the OEM
+      declares no fields for the file.
+    """
+    file_path = Path(file_path)
+    for resource in oem.get("resources", []):
+        if not isinstance(resource, dict) or (
+            resource.get("name") != file_path.stem
+            and Path(str(resource.get("path") or "")).name != file_path.name
+        ):
+            continue
+        fields = (resource.get("schema") or {}).get("fields") or []
+        if not fields or not all(field.get("name") for field in fields):
+            return None
+        schema = {
+            "fields": [
+                {
+                    "name": field["name"],
+                    "type": convert_oem_type_to_frictionless_type(
+                        str(field.get("type") or "any")
+                    ),
+                }
+                for field in fields
+            ]
+        }
+        primary_key = resource["schema"].get("primaryKey")
+        field_names = {field["name"] for field in fields}
+        if primary_key and set(primary_key) <= field_names:
+            schema["primaryKey"] = list(primary_key)
+        return schema
+    return None
+
+
 def load_json(path: str) -> Any:
     """
     Loads and returns the content of a JSON file.
@@ -166,9 +501,233 @@ def save_json(data: Any, path: str) -> None:
         json.dump(data, file, indent=4)
 
 
+def index_datapackage_resources(
+    resources: Iterable[Any],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Groups the resources of a data package by dataset, i.e. by the name of the folder containing them.
+
+    The OEM resource of a dataset (named '<dataset>.oem') is indexed separately from its data resources.
+
+    Parameters:
+    - resources (Iterable[Any]): Resource descriptors (dictionaries) or 'Resource' objects, each with a 'path'.
+
+    Returns:
+    - Dict[str, Dict[str, Any]]: For each dataset name, its data resources ('resources') in package order
+      and the path of its OEM file ('oem_path', None if missing).
+    """
+    index = {}
+    for resource in resources:
+        if isinstance(resource, dict):
+            name, path = resource.get("name", ""), resource.get("path")
+        else:
+            name, path = resource.name, resource.path
+        if not isinstance(path, str):
+            continue
+        dataset_name = get_folder_name(path)
+        dataset = index.setdefault(
+            dataset_name, {"resources": [], "oem_path": None}
+        )
+        if name == f"{dataset_name}.oem":
+            dataset["oem_path"] = path
+        else:
+            dataset["resources"].append(resource)
+    return index
+
+
+def file_sha256(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Computes the SHA-256 hash of a file, reading it in chunks.
+
+    Parameters:
+    - path (Union[str, Path]): The path to the file.
+    - chunk_size (int, optional): Number of bytes read at once.
+
+    Returns:
+    - str: The hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stream_file_stats(
+    source: Union[str, Path],
+    target: Optional[Union[str, Path]] = None,
+    chunk_size: int = 1 << 20,
+) -> Dict[str, Any]:
+    """
+    Reads a file once and computes its SHA-256 hash, its size and its number of lines,
+    optionally writing it to a target path at the same time (a copy that needs no second read for the stats).
+
+    The number of lines only equals the number of CSV records if no record spans several lines and there are no
+    blank lines. So it is None if the file contains quotes, blank lines or a carriage return without line feed.
+
+    Parameters:
+    - source (Union[str, Path]): The file to read.
+    - target (Optional[Union[str, Path]], optional): The path to copy the file to, including its modification time.
+    - chunk_size (int, optional): Number of bytes read at once.
+
+    Returns:
+    - Dict[str, Any]: The hex digest ('sha256'), the number of bytes ('bytes') and the number of lines ('lines').
+    """
+    digest = hashlib.sha256()
+    size = 0
+    newlines = 0
+    line_safe = True
+    tail = b"\n"  # a blank first line counts as a blank line
+    with open(source, "rb") as src, (
+        open(target, "wb") if target is not None else nullcontext()
+    ) as dst:
+        for chunk in iter(lambda: src.read(chunk_size), b""):
+            if dst is not None:
+                dst.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+            newlines += chunk.count(b"\n")
+            if line_safe:
+                # the end of the previous chunk is prepended to catch patterns across chunk boundaries
+                window = (tail + chunk).replace(b"\r\n", b"\n")
+                line_safe = not (
+                    b'"' in chunk
+                    or b"\n\n" in window
+                    or b"\r" in window.rstrip(b"\r")
+                )
+            tail = (tail + chunk)[-2:]
+    if tail.endswith(b"\r"):
+        line_safe = False
+    if target is not None:
+        shutil.copystat(source, target)
+    lines = newlines + (1 if size and not tail.endswith(b"\n") else 0)
+    return {
+        "sha256": digest.hexdigest(),
+        "bytes": size,
+        "lines": lines if line_safe and size else None,
+    }
+
+
+def sample_file_lines(
+    path: Union[str, Path], sample_size: int, seed: int = 0
+) -> bytes:
+    """
+    Returns the first line of a file followed by up to 'sample_size' of its other lines, picked at random
+    positions spread across the whole file. Only the picked lines are read (by seeking), not the whole file.
+    Longer lines are slightly more likely to be picked. Only valid for files in which every line is a record
+    (see 'stream_file_stats').
+
+    Parameters:
+    - path (Union[str, Path]): The path to the file.
+    - sample_size (int): The number of positions to pick lines at; lines picked twice are included once.
+    - seed (int, optional): Seed of the random positions, so the sample is reproducible.
+
+    Returns:
+    - bytes: The header line and the sampled lines in file order, each terminated by a line feed.
+    """
+    size = os.path.getsize(path)
+    rng = random.Random(seed)
+    sampled = {}
+    with open(path, "rb") as file:
+        header = file.readline()
+        start = file.tell()
+        if size > start:
+            for offset in sorted(rng.randrange(start, size) for _ in range(sample_size)):
+                # the line containing 'offset' starts after the line feed before it
+                file.seek(offset - 1)
+                file.readline()
+                line_start = file.tell()
+                if line_start < size and line_start not in sampled:
+                    sampled[line_start] = file.readline()
+    lines = [header] + [sampled[line_start] for line_start in sorted(sampled)]
+    return b"".join(
+        line if line.endswith(b"\n") else line + b"\n" for line in lines
+    )
+
+
+def reflink_file(source: Union[str, Path], target: Union[str, Path]) -> None:
+    """
+    Creates a copy-on-write clone (reflink) of a file and copies its metadata (e.g. modification time).
+
+    Parameters:
+    - source (Union[str, Path]): The file to clone.
+    - target (Union[str, Path]): The path of the clone.
+
+    Raises:
+    - OSError: If the platform or filesystem does not support reflinks, e.g. across filesystems.
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform.")
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        Path(target).unlink(missing_ok=True)
+        raise
+    shutil.copystat(source, target)
+
+
+def stage_file(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    strategy: str = "auto",
+    copy_function: Callable[[Union[str, Path], Union[str, Path]], Any] = shutil.copy2,
+) -> str:
+    """
+    Places a file at the target path, replacing an existing file there.
+
+    Strategies:
+    - 'copy': Copies the file including its modification time.
+    - 'reflink': Clones the file on copy-on-write filesystems; takes no time and no extra space,
+      and changes to either file do not affect the other.
+    - 'hardlink': Links the target to the same data as the source; takes no time and no extra space,
+      but both paths refer to the same file.
+    - 'symlink': Creates a symbolic link to the (absolute) source path, so the data stays in place.
+    - 'auto': Uses the cheapest of 'reflink', 'hardlink' and 'copy' that works, e.g. copies across filesystems.
+
+    Parameters:
+    - source (Union[str, Path]): The file to stage.
+    - target (Union[str, Path]): The path to stage the file to.
+    - strategy (str, optional): The staging strategy. Defaults to 'auto'.
+    - copy_function (Callable, optional): Copies a file including its modification time, used for 'copy'.
+      Defaults to 'shutil.copy2'.
+
+    Returns:
+    - str: The strategy that was actually used.
+
+    Raises:
+    - ValueError: If the strategy is unknown.
+    - OSError: If the requested strategy is not supported for the given paths.
+    """
+    target = Path(target)
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    if strategy == "copy":
+        copy_function(source, target)
+    elif strategy == "reflink":
+        reflink_file(source, target)
+    elif strategy == "hardlink":
+        os.link(source, target)
+    elif strategy == "symlink":
+        os.symlink(os.path.abspath(source), target)
+    elif strategy == "auto":
+        for method, stage in (("reflink", reflink_file), ("hardlink", os.link)):
+            try:
+                stage(source, target)
+                return method
+            except OSError:
+                continue
+        copy_function(source, target)
+        return "copy"
+    else:
+        raise ValueError(f"Unknown staging strategy: '{strategy}'.")
+    return strategy
+
+
 def find_dataset_paths(start_path: str) -> List[str]:
     """
-    Finds and returns a list of dataset file paths, excluding '.gitkeep' and 'datapackage.json', within the given directory.
+    Finds and returns a list of dataset file paths, excluding '.gitkeep', 'datapackage.json'
+    and SQLite sidecar files, within the given directory.
 
     Parameters:
     - start_path (str): The directory to start searching from.
@@ -176,26 +735,20 @@ def find_dataset_paths(start_path: str) -> List[str]:
     Returns:
     - List[str]: A list of paths to dataset files found within the directory.
     """
-    file_paths = []
-    # Prüfe, ob start_path ein Verzeichnis ist
     if os.path.isdir(start_path):
-        # Durchlaufe rekursiv alle Verzeichnisse ab start_path
-        for dirpath, _, filenames in os.walk(start_path):
-            for filename in filenames:
-                if (
-                    not filename.endswith(".gitkeep")
-                    and filename != "datapackage.json"
-                ):
-                    file_paths.append(os.path.join(dirpath, filename))
-    else:
-        # Wenn start_path kein Verzeichnis ist, füge den Pfad direkt hinzu, falls er gültig ist
-        if (
-            os.path.exists(start_path)
-            and not start_path.endswith(".gitkeep")
-            and start_path != "datapackage.json"
-        ):
-            file_paths.append(start_path)
-    return file_paths
+        return [
+            file_path
+            for directory in scan_directory_tree(start_path).values()
+            for file_path in directory["files"]
+        ]
+    # Wenn start_path kein Verzeichnis ist, füge den Pfad direkt hinzu, falls er gültig ist
+    if (
+        os.path.exists(start_path)
+        and not start_path.endswith(".gitkeep")
+        and start_path != "datapackage.json"
+    ):
+        return [start_path]
+    return []
 
 
 # Utils for OEP Data Handler
@@ -214,8 +767,7 @@ def prepare_csv_data(resource_abs_path: Path) -> List[Dict[str, Any]]:
     df = pd.read_csv(
         resource_abs_path, encoding="utf8", sep=",", dtype={"RS": "str"}
     )
-    df.columns = map(str.lower, df.columns)
-    return json.loads(df.to_json(orient="records"))
+    return csv_frame_to_records(df)
 
 
 def prepare_json_data(resource_abs_path: Path) -> Dict[str, Any]:
@@ -232,21 +784,525 @@ def prepare_json_data(resource_abs_path: Path) -> Dict[str, Any]:
         return json.load(json_data)
 
 
-def prepare_gpkg_data(resource_abs_path: Path) -> List[Dict[str, Any]]:
+def prepare_gpkg_data(
+    resource_abs_path: Path,
+    geometry_format: str = "wkt",
+    layer: Optional[str] = None,
+    precision: Optional[int] = None,
+    simplify_tolerance: Optional[float] = None,
+) -> List[Dict[str, Any]]:
     """
-    Reads a GeoPackage file and returns its content as a list of dictionaries, including geometries converted to WKT format.
+    Reads a GeoPackage file and returns its content as a list of dictionaries, including geometries encoded as text (WKT by default).
 
     Parameters:
     - resource_abs_path (Path): The path to the GeoPackage file.
+    - geometry_format (str, optional): Text encoding of the geometries, see 'encode_geometries'.
+    - layer (Optional[str], optional): The layer to read. Defaults to None (the first layer).
+    - precision (Optional[int], optional): Decimal places of the coordinates, see 'encode_geometries'.
+    - simplify_tolerance (Optional[float], optional): Tolerance for simplifying the geometries, see 'encode_geometries'.
 
     Returns:
     - List[Dict[str, Any]]: The content of the GeoPackage file as a list of dictionaries.
     """
-    gdf = gpd.read_file(resource_abs_path)
-    feature_list = []
-    for _, row in gdf.iterrows():
-        feature = row.to_dict()
-        if "geometry" in feature and feature["geometry"] is not None:
-            feature["geometry"] = feature["geometry"].wkt
-        feature_list.append(feature)
-    return feature_list
+    gdf = gpd.read_file(resource_abs_path, layer=layer)
+    return gpkg_frame_to_records(gdf, geometry_format, precision, simplify_tolerance)
+
+
+def csv_frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Converts a DataFrame read from a CSV file into upload-ready records, with column names converted to lowercase.
+    The values are converted column by column (see 'series_to_json_values'), without a detour through a JSON string;
+    columns read as strings (such as 'RS') keep their exact text, e.g. leading zeros.
+
+    Parameters:
+    - df (pd.DataFrame): The (partial) content of a CSV file.
+
+    Returns:
+    - List[Dict[str, Any]]: The rows of the DataFrame as a list of dictionaries.
+    """
+    columns = {
+        str(name).lower(): series_to_json_values(df[name]) for name in df.columns
+    }
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def gpkg_frame_to_records(
+    gdf: gpd.GeoDataFrame,
+    geometry_format: str = "wkt",
+    precision: Optional[int] = None,
+    simplify_tolerance: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Converts a GeoDataFrame into upload-ready records, including geometries encoded as text (WKT by default).
+    The conversion works column by column on whole arrays instead of row by row,
+    so that the values are converted to JSON-compatible Python objects in one step per column.
+
+    Parameters:
+    - gdf (gpd.GeoDataFrame): The (partial) content of a GeoPackage file.
+    - geometry_format (str, optional): Text encoding of the geometries, see 'encode_geometries'.
+    - precision (Optional[int], optional): Decimal places of the coordinates, see 'encode_geometries'.
+    - simplify_tolerance (Optional[float], optional): Tolerance for simplifying the geometries, see 'encode_geometries'.
+
+    Returns:
+    - List[Dict[str, Any]]: The rows of the GeoDataFrame as a list of dictionaries.
+    """
+    geometry_name = gdf.geometry.name
+    columns = {
+        name: (
+            encode_geometries(gdf[name], geometry_format, precision, simplify_tolerance)
+            if name == geometry_name
+            else series_to_json_values(gdf[name])
+        )
+        for name in gdf.columns
+    }
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def encode_geometries(
+    geometries: gpd.GeoSeries,
+    geometry_format: str = "wkt",
+    precision: Optional[int] = None,
+    simplify_tolerance: Optional[float] = None,
+) -> List[Optional[str]]:
+    """
+    Encodes all geometries of a GeoSeries at once.
+    Simplification and rounding work on the whole array of geometries (GEOS), not geometry by geometry in Python.
+
+    Parameters:
+    - geometries (gpd.GeoSeries): The geometries to encode.
+    - geometry_format (str, optional): One of 'wkt' (full precision WKT), 'ewkt' (WKT prefixed with the EPSG code
+      of the CRS as SRID), 'wkb' (hex-encoded WKB) or 'ewkb' (hex-encoded WKB including the SRID, as PostGIS writes it).
+    - precision (Optional[int], optional): Number of decimal places the coordinates are rounded to (in units of the CRS).
+      Geometries that rounding would make invalid are snapped to the corresponding grid instead, so valid geometries
+      stay valid; parts that collapse are dropped. Defaults to None (full precision).
+    - simplify_tolerance (Optional[float], optional): Tolerance (in units of the CRS) for simplifying the geometries
+      with the Douglas-Peucker algorithm, preserving their topology. Defaults to None (no simplification).
+
+    Multi-part geometries that simplification or rounding reduces to a single part keep their multi-part type,
+    so they still match a column typed e.g. 'geometry(MultiPolygon)'.
+
+    Returns:
+    - List[Optional[str]]: The encoded geometries, with None for missing geometries.
+
+    Raises:
+    - ValueError: If the geometry format is unknown or the SRID of the CRS cannot be determined for EWKT or EWKB.
+    """
+    if geometry_format not in GEOMETRY_FORMATS:
+        raise ValueError(f"Unknown geometry format: '{geometry_format}'.")
+    srid = None
+    if geometry_format in ("ewkt", "ewkb") and geometries.crs:
+        srid = geometries.crs.to_epsg()
+        if srid is None:
+            raise ValueError(
+                f"Cannot determine the SRID of CRS '{geometries.crs}' for {geometry_format.upper()}."
+            )
+    missing = geometries.isna().to_numpy()
+    values = np.asarray(geometries.values)
+    if simplify_tolerance:
+        values = shapely.simplify(values, simplify_tolerance, preserve_topology=True)
+    if precision is not None:
+        rounded = shapely.transform(values, lambda coords: np.round(coords, precision))
+        # rounding can make a few geometries invalid (e.g. self-intersections), these are snapped to the grid by GEOS
+        invalid = ~shapely.is_valid(rounded) & shapely.is_valid(values)
+        if invalid.any():
+            rounded[invalid] = shapely.set_precision(values[invalid], 10.0**-precision)
+        values = rounded
+    if simplify_tolerance or precision is not None:
+        values = restore_multipart_types(np.asarray(geometries.values), values)
+    if geometry_format in ("wkt", "ewkt"):
+        encoded = shapely.to_wkt(values, rounding_precision=-1)
+        if srid is not None:
+            encoded = np.char.add(f"SRID={srid};", encoded.astype(str)).astype(object)
+    else:
+        if srid is not None:
+            values = shapely.set_srid(values, srid)
+        encoded = shapely.to_wkb(values, hex=True, include_srid=srid is not None)
+    encoded[missing] = None
+    return encoded.tolist()
+
+
+def restore_multipart_types(source: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Wraps geometries that became single-part (e.g. by simplification) into the multi-part type of their source.
+
+    Parameters:
+    - source (np.ndarray): The original geometries.
+    - values (np.ndarray): The processed geometries, in the same order.
+
+    Returns:
+    - np.ndarray: The processed geometries, with the multi-part types of the original ones.
+    """
+    source_types = shapely.get_type_id(source)
+    value_types = shapely.get_type_id(values)
+    restored = None
+    for multi_type, (single_type, wrap) in MULTIPART_GEOMETRY_TYPES.items():
+        collapsed = (source_types == multi_type) & (value_types == single_type)
+        if collapsed.any():
+            restored = values.copy() if restored is None else restored
+            restored[collapsed] = wrap(values[collapsed], indices=np.arange(collapsed.sum()))
+    return values if restored is None else restored
+
+
+def series_to_json_values(series: pd.Series) -> List[Any]:
+    """
+    Converts a column into a list of JSON-compatible Python objects:
+    numpy scalars become Python scalars, datetimes become ISO 8601 strings and NaN/NaT become None.
+
+    Parameters:
+    - series (pd.Series): The column to convert.
+
+    Returns:
+    - List[Any]: The values of the column.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return [None if pd.isna(value) else value.isoformat() for value in series]
+    missing = series.isna().to_numpy()
+    if not missing.any():
+        return series.tolist()
+    values = series.to_numpy(dtype=object)
+    values[missing] = None
+    return values.tolist()
+
+
+# Streaming batch readers for OEP Data Handler
+
+
+def iter_csv_batches(
+    resource_abs_path: Path, batch_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Reads a CSV file in chunks and yields its content as upload-ready batches,
+    so that only one batch of rows is held in memory at a time.
+
+    Parameters:
+    - resource_abs_path (Path): The path to the CSV file.
+    - batch_size (int): The (maximum) number of rows per batch.
+
+    Yields:
+    - List[Dict[str, Any]]: The next batch of rows as a list of dictionaries.
+    """
+    with pd.read_csv(
+        resource_abs_path,
+        encoding="utf8",
+        sep=",",
+        dtype={"RS": "str"},
+        chunksize=batch_size,
+    ) as reader:
+        for chunk in reader:
+            yield csv_frame_to_records(chunk)
+
+
+def iter_gpkg_batches(
+    resource_abs_path: Path,
+    batch_size: int,
+    geometry_format: str = "wkt",
+    layer: Optional[str] = None,
+    precision: Optional[int] = None,
+    simplify_tolerance: Optional[float] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Reads a GeoPackage file page by page and yields its content as upload-ready batches,
+    including geometries encoded as text (WKT by default).
+
+    Parameters:
+    - resource_abs_path (Path): The path to the GeoPackage file.
+    - batch_size (int): The (maximum) number of features per batch.
+    - geometry_format (str, optional): Text encoding of the geometries, see 'encode_geometries'.
+    - layer (Optional[str], optional): The layer to read. Defaults to None (the first layer).
+    - precision (Optional[int], optional): Decimal places of the coordinates, see 'encode_geometries'.
+    - simplify_tolerance (Optional[float], optional): Tolerance for simplifying the geometries, see 'encode_geometries'.
+
+    Yields:
+    - List[Dict[str, Any]]: The next batch of features as a list of dictionaries.
+    """
+    with fiona.open(resource_abs_path, layer=layer) as src:
+        features = iter(src)
+        while True:
+            page = list(islice(features, batch_size))
+            if not page:
+                break
+            gdf = gpd.GeoDataFrame.from_features(page, crs=src.crs)
+            yield gpkg_frame_to_records(
+                gdf, geometry_format, precision, simplify_tolerance
+            )
+
+
+def iter_json_batches(
+    resource_abs_path: Path, batch_size: int, read_size: int = 1 << 16
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Incrementally parses a JSON file containing an array of records and yields the records as upload-ready batches,
+    without loading the whole document into memory. A JSON file with a single top-level object is yielded as one record.
+
+    Parameters:
+    - resource_abs_path (Path): The path to the JSON file.
+    - batch_size (int): The (maximum) number of records per batch.
+    - read_size (int, optional): Number of characters read from the file at once.
+
+    Yields:
+    - List[Dict[str, Any]]: The next batch of records.
+
+    Raises:
+    - json.JSONDecodeError: If the file does not contain valid JSON.
+    """
+    decoder = json.JSONDecoder()
+    with open(resource_abs_path, encoding="utf-8") as json_file:
+        buffer = json_file.read(read_size).lstrip()
+        if not buffer.startswith("["):
+            buffer += json_file.read()
+            yield [json.loads(buffer)]
+            return
+
+        pos = 1
+        eof = False
+        batch = []
+        while True:
+            # skip whitespace and separators between array elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                break
+            try:
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Incomplete", buffer, pos)
+                record, end = decoder.raw_decode(buffer, pos)
+                # a value ending exactly at the buffer end may be truncated (e.g. numbers)
+                if end == len(buffer) and not eof:
+                    raise json.JSONDecodeError("Incomplete", buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = json_file.read(read_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            batch.append(record)
+            pos = end
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def encode_batch(batch: List[Dict[str, Any]]) -> bytes:
+    """
+    Encodes a batch of rows into the JSON request body expected by the OEP API ('{"query": [...]}').
+    Uses orjson if it is installed and falls back to the standard library otherwise.
+
+    Parameters:
+    - batch (List[Dict[str, Any]]): The batch of rows.
+
+    Returns:
+    - bytes: The UTF-8 encoded request body.
+    """
+    if orjson is not None:
+        return orjson.dumps({"query": batch})
+    return json.dumps(
+        {"query": batch}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_row(row: Dict[str, Any]) -> bytes:
+    """
+    Encodes a single row into the JSON request body expected by the row endpoint of the OEP API ('{"query": {...}}').
+
+    Parameters:
+    - row (Dict[str, Any]): The row.
+
+    Returns:
+    - bytes: The UTF-8 encoded request body.
+    """
+    if orjson is not None:
+        return orjson.dumps({"query": row})
+    return json.dumps({"query": row}, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def encode_columnar_batch(
+    schema: str, table: str, batch: List[Dict[str, Any]]
+) -> bytes:
+    """
+    Encodes a batch of rows into the JSON request body of the OEP's advanced insert API
+    ('{"query": {"schema": ..., "table": ..., "fields": [...], "values": [[...], ...]}}').
+    The column names are sent once per batch instead of once per row; missing values are sent as null.
+    Uses orjson if it is installed and falls back to the standard library otherwise.
+
+    Parameters:
+    - schema (str): The schema of the table on the OEP.
+    - table (str): The name of the table on the OEP.
+    - batch (List[Dict[str, Any]]): The batch of rows.
+
+    Returns:
+    - bytes: The UTF-8 encoded request body.
+    """
+    fields = list(dict.fromkeys(key for row in batch for key in row))
+    query = {
+        "schema": schema,
+        "table": table,
+        "fields": fields,
+        "values": [[row.get(field) for field in fields] for row in batch],
+    }
+    if orjson is not None:
+        return orjson.dumps({"query": query})
+    return json.dumps(
+        {"query": query}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def resolve_content_encoding(compression: str) -> Optional[str]:
+    """
+    Resolves a compression option (see 'COMPRESSIONS') to the HTTP content encoding used for request bodies.
+    'auto' uses zstd if the optional package 'zstandard' is installed, and gzip otherwise.
+
+    Parameters:
+    - compression (str): The compression option.
+
+    Returns:
+    - Optional[str]: The content encoding ('gzip' or 'zstd'), or None for uncompressed request bodies.
+
+    Raises:
+    - ValueError: If the option is unknown, or if zstd is requested but 'zstandard' is not installed.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Unknown compression '{compression}', use one of: {', '.join(COMPRESSIONS)}."
+        )
+    if compression == "none":
+        return None
+    if compression == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if compression == "zstd" and zstandard is None:
+        raise ValueError(
+            "zstd compression requires the package 'zstandard' (pip install zstandard)."
+        )
+    return compression
+
+
+def compress_body(body: bytes, content_encoding: str) -> bytes:
+    """
+    Compresses a request body with the given HTTP content encoding.
+
+    Parameters:
+    - body (bytes): The request body.
+    - content_encoding (str): 'gzip' or 'zstd'.
+
+    Returns:
+    - bytes: The compressed request body.
+    """
+    if content_encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return gzip.compress(body, compresslevel=5)
+
+
+def batch_hash(batch: List[Dict[str, Any]]) -> str:
+    """
+    Computes a content hash of a batch of rows, independent of the order of the columns.
+
+    Parameters:
+    - batch (List[Dict[str, Any]]): The batch of rows.
+
+    Returns:
+    - str: The SHA-256 hex digest of the batch.
+    """
+    encoded = json.dumps(batch, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def normalize_row_value(value: Any) -> Any:
+    """
+    Normalizes a value of a row for comparing local and remote rows, so that values that only differ
+    in their JSON representation compare equal (e.g. 3 and 3.0 from a numeric column).
+
+    Parameters:
+    - value (Any): The value, as read from a file or returned by the OEP API.
+
+    Returns:
+    - Any: The normalized value.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def row_digest(row: Dict[str, Any], columns: List[str]) -> bytes:
+    """
+    Computes a content hash of a row over the given columns (missing columns count as null).
+    Local rows and rows read from the OEP have the same digest if their values are equal after normalization
+    (see 'normalize_row_value', inlined here as digests are computed for every row of a table).
+
+    Parameters:
+    - row (Dict[str, Any]): The row, with JSON-compatible values.
+    - columns (List[str]): The columns to hash, in a fixed order.
+
+    Returns:
+    - bytes: The 128-bit BLAKE2b digest of the row.
+    """
+    values = [row.get(column) for column in columns]
+    values = [
+        int(value) if type(value) is float and value.is_integer() else value
+        for value in values
+    ]
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).digest()
+
+
+BATCH_READERS = {
+    "csv": iter_csv_batches,
+    "json": iter_json_batches,
+    "gpkg": iter_gpkg_batches,
+}
+
+
+def run_in_dependency_order(
+    tasks: Dict[str, Callable[[], Any]],
+    dependencies: Dict[str, Set[str]],
+    max_workers: int = 1,
+) -> None:
+    """
+    Runs named tasks concurrently while honoring the dependencies between them:
+    a task is started only after all tasks it depends on have finished successfully.
+    Independent tasks are started in the order given, using up to 'max_workers' threads.
+    Dependencies on names that are not part of 'tasks' are ignored.
+
+    Parameters:
+    - tasks (Dict[str, Callable[[], Any]]): Callables to run, by name.
+    - dependencies (Dict[str, Set[str]]): Names of the tasks each task depends on.
+    - max_workers (int, optional): Maximum number of tasks running at the same time.
+
+    Raises:
+    - ValueError: If the dependencies between the remaining tasks are circular.
+    - Exception: The first exception raised by a task, once all running tasks have finished.
+        No further tasks are started after a task has failed.
+    """
+    remaining = dict(tasks)
+    finished = set()
+    error = None
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+        while running or (remaining and error is None):
+            if error is None:
+                for name in list(remaining):
+                    if len(running) >= max_workers:
+                        break
+                    parents = (dependencies.get(name, set()) & tasks.keys()) - {
+                        name
+                    }
+                    if parents <= finished:
+                        running[executor.submit(remaining.pop(name))] = name
+            if not running:
+                raise ValueError(
+                    f"Circular dependencies between: {', '.join(remaining)}"
+                )
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    future.result()
+                    finished.add(name)
+                except Exception as e:
+                    logging.error(f"'{name}' failed: {e}")
+                    error = error or e
+    if error is not None:
+        raise error
@@ -0,0 +1,24 @@
+import pytest
+
+from oem_dpkg import OepUploadHandler
+from oem_dpkg.fake_oep_server import start_fake_server
+
+
+@pytest.fixture
+def make_handler(tmp_path, monkeypatch):
+    """Creates upload handlers for a data package in 'tmp_path', each with its own fake OEP server."""
+    monkeypatch.setenv("OEP_TOKEN", "test")
+    monkeypatch.setenv("OEP_USER", "test")
+    servers = []
+
+    def make(handler_options=None, **server_options):
+        server = start_fake_server(**server_options)
+        servers.append(server)
+        handler = OepUploadHandler(
+            datapackage_path=str(tmp_path / "datapackage"), api_url=server.url, **(handler_options or {})
+        )
+        return handler, server
+
+    yield make
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,68 @@
+import json
+
+import geopandas as gpd
+import pytest
+from shapely.geometry import Point
+
+from oem_dpkg.utils import (
+    iter_csv_batches,
+    iter_gpkg_batches,
+    iter_json_batches,
+    prepare_csv_data,
+    prepare_gpkg_data,
+    prepare_json_data,
+)
+
+
+def test_csv_batches_match_the_whole_file(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text("ID,RS,value\n" + "".join(f"{row},0{row},{row / 4}\n" for row in range(25)))
+
+    batches = list(iter_csv_batches(path, 10))
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert [row for batch in batches for row in batch] == prepare_csv_data(path)
+    assert batches[0][1] == {"id": 1, "rs": "01", "value": 0.25}
+
+
+@pytest.mark.parametrize("read_size", [3, 7, 1 << 16])
+def test_json_batches_are_parsed_incrementally(tmp_path, read_size):
+    records = [{"id": row, "value": row * 1234.5, "name": f"row, [{row}]"} for row in range(23)]
+    path = tmp_path / "table.json"
+    path.write_text(json.dumps(records, indent=1))
+
+    batches = list(iter_json_batches(path, 10, read_size=read_size))
+
+    assert [len(batch) for batch in batches] == [10, 10, 3]
+    assert [row for batch in batches for row in batch] == prepare_json_data(path)
+
+
+def test_json_object_is_one_record(tmp_path):
+    path = tmp_path / "record.json"
+    path.write_text('{"id": 1}')
+
+    assert list(iter_json_batches(path, 10)) == [[{"id": 1}]]
+
+
+def test_invalid_json_raises(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('[{"id": 1}, {"id": ')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_batches(path, 10, read_size=4))
+
+
+def test_gpkg_batches_match_the_whole_file(tmp_path):
+    path = tmp_path / "points.gpkg"
+    gdf = gpd.GeoDataFrame(
+        {"name": [f"point {index}" for index in range(7)]},
+        geometry=[Point(index, index / 2) for index in range(7)],
+        crs="EPSG:4326",
+    )
+    gdf.to_file(path, layer="points", driver="GPKG")
+
+    batches = list(iter_gpkg_batches(path, 3))
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [row for batch in batches for row in batch] == prepare_gpkg_data(path)
+    assert batches[0][1] == {"geometry": "POINT (1 0.5)", "name": "point 1"}
@@ -0,0 +1,93 @@
+from oem_dpkg.batching import BatchSizer, rebatch
+
+
+def chunks(rows, chunk_size):
+    return [list(range(start, min(start + chunk_size, rows))) for start in range(0, rows, chunk_size)]
+
+
+def test_rebatch_resume_after_failed_middle_batch_with_other_size():
+    # first run: batches of 100 rows, the batch at offset 200 failed
+    acknowledged = {offset: (100, f"hash-{offset}") for offset in (0, 100, 300, 400)}
+    sizer = BatchSizer(initial_rows=150, adaptive=False)
+
+    batches = list(rebatch(chunks(500, 64), sizer, acknowledged))
+
+    offsets = [batch[0] for batch in batches]
+    assert offsets == [0, 100, 200, 300, 400]
+    assert [len(batch) for batch in batches] == [100] * 5
+    assert [row for batch in batches for row in batch] == list(range(500))
+
+
+def test_rebatch_fills_gap_before_next_acknowledged_batch():
+    acknowledged = {0: (100, "a"), 400: (100, "b")}
+    sizer = BatchSizer(initial_rows=250, adaptive=False)
+
+    batches = list(rebatch(chunks(600, 64), sizer, acknowledged))
+
+    assert [(batch[0], len(batch)) for batch in batches] == [
+        (0, 100),
+        (100, 250),
+        (350, 50),
+        (400, 100),
+        (500, 100),
+    ]
+
+
+def test_sizer_grows_while_requests_are_fast():
+    sizer = BatchSizer(initial_rows=100, max_rows=1000, min_latency=1.0)
+
+    for _ in range(5):
+        sizer.record_success(sizer.size, sizer.size * 100, latency=0.1)
+
+    assert sizer.size == 1000
+
+
+def test_sizer_shrinks_slow_requests_to_the_latency_budget():
+    sizer = BatchSizer(initial_rows=1000, max_latency=10.0)
+
+    sizer.record_success(1000, 100_000, latency=40.0)
+
+    assert sizer.size == 250
+    assert sizer.summary()["shrinks"] == 1
+
+
+def test_sizer_respects_the_byte_budget():
+    sizer = BatchSizer(initial_rows=1000, target_bytes=50_000)
+
+    sizer.record_success(1000, 1_000_000, latency=0.1)
+
+    assert sizer.size == 50
+
+
+def test_failures_halve_the_size_down_to_the_minimum():
+    sizer = BatchSizer(initial_rows=400, min_rows=150)
+
+    assert [sizer.record_failure() for _ in range(3)] == [200, 150, 150]
+
+
+def test_fixed_sizer_keeps_its_size():
+    sizer = BatchSizer(initial_rows=100, adaptive=False)
+
+    sizer.record_success(100, 10_000_000, latency=60.0)
+    sizer.record_failure()
+
+    assert sizer.size == 100
+    assert sizer.summary() == {
+        "batches": 1,
+        "min_rows": 100,
+        "max_rows": 100,
+        "mean_rows": 100,
+        "final_rows": 100,
+        "shrinks": 0,
+    }
+
+
+def test_rebatch_follows_the_sizer():
+    sizer = BatchSizer(initial_rows=30, adaptive=False)
+    batches = rebatch(chunks(100, 7), sizer)
+
+    sizes = [len(next(batches))]
+    sizer.size = 20
+    sizes += [len(batch) for batch in batches]
+
+    assert sizes == [30, 20, 20, 20, 10]
@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent.parent / "benchmarks"
+
+
+def test_packaging_benchmark_runs_on_a_small_input(tmp_path):
+    output = tmp_path / "packaging.json"
+
+    subprocess.run(
+        [
+            sys.executable,
+            "bench_packaging.py",
+            "--datasets", "2",
+            "--files-per-dataset", "2",
+            "--rows", "20",
+            "--gpkg-share", "0.5",
+            "--repeat", "2",
+            "--incremental",
+            "--json-output", str(output),
+        ],
+        cwd=BENCHMARKS,
+        check=True,
+        capture_output=True,
+    )
+
+    result = json.loads(output.read_text())
+    assert result["input"]["files"] == 4
+    assert len(result["runs"]) == 2
+    assert set(result["best"]) == {"copy", "inference", "validation", "package", "total"}
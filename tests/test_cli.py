@@ -0,0 +1,33 @@
+import json
+
+from click.testing import CliRunner
+
+from oem_dpkg import OemDataPackage
+from oem_dpkg.cli import cli
+
+
+def test_metrics_are_written_when_the_build_fails(tmp_path, monkeypatch):
+    def failing_create(package):
+        with package.instrumentation.span("package.scan"):
+            pass
+        raise RuntimeError("broken input")
+
+    monkeypatch.setattr(OemDataPackage, "create", failing_create)
+    metrics_file = tmp_path / "metrics.json"
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "create-package",
+            str(tmp_path),
+            str(tmp_path / "output"),
+            "name",
+            "description",
+            "1.0",
+            "--metrics-file",
+            str(metrics_file),
+        ],
+    )
+
+    assert isinstance(result.exception, RuntimeError)
+    assert json.loads(metrics_file.read_text())["spans"]["package.scan"]["calls"] == 1
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from oem_dpkg.utils import index_datapackage_resources
+
+RESOURCES = [
+    {"name": "first.oem", "path": "first/metadata.json"},
+    {"name": "first.plants", "path": "first/plants.csv", "format": "csv"},
+    {"name": "first.units", "path": "first/units.csv", "format": "csv"},
+    {"name": "second.regions", "path": "second/regions.csv", "format": "csv"},
+    {"name": "third.oem", "path": "third/metadata.json"},
+]
+
+
+@pytest.fixture
+def datapackage(tmp_path):
+    path = tmp_path / "datapackage"
+    path.mkdir()
+    (path / "datapackage.json").write_text(json.dumps({"name": "test", "resources": RESOURCES}))
+    return path
+
+
+def test_resources_are_indexed_by_dataset():
+    index = index_datapackage_resources(RESOURCES)
+
+    assert index["first"] == {"resources": RESOURCES[1:3], "oem_path": "first/metadata.json"}
+    assert index["second"] == {"resources": RESOURCES[3:4], "oem_path": None}
+    assert index["third"] == {"resources": [], "oem_path": "third/metadata.json"}
+
+
+def test_only_selected_datasets_are_materialized(make_handler, datapackage):
+    handler, _ = make_handler()
+
+    handler.extract_dataset_resources(None, ["first"])
+
+    assert [resource.name for resource in handler.resources] == ["first.plants", "first.units"]
+    assert handler.oem_paths == ["first/metadata.json"]
+    # the package itself is not loaded
+    assert handler._datapackage is None
+
+
+def test_all_datasets_are_selected_by_default(make_handler, datapackage):
+    handler, _ = make_handler()
+
+    handler.extract_dataset_resources(None, None)
+
+    assert [resource.name for resource in handler.resources] == ["first.plants", "first.units", "second.regions"]
+    assert handler.oem_paths == ["first/metadata.json", "third/metadata.json"]
+
+
+@pytest.mark.parametrize(
+    "datasets, message",
+    [(["missing"], "No datasets"), (["third"], "No datasets"), (["second"], "No OEM")],
+)
+def test_invalid_selection_raises(make_handler, datapackage, datasets, message):
+    handler, _ = make_handler()
+
+    with pytest.raises(ValueError, match=message):
+        handler.extract_dataset_resources(None, datasets)
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from oem_dpkg.utils import run_in_dependency_order
+
+
+def recorder(log, lock):
+    def task(name):
+        def run():
+            with lock:
+                log.append(f"start {name}")
+            with lock:
+                log.append(f"end {name}")
+
+        return run
+
+    return task
+
+
+def test_tasks_start_after_their_dependencies():
+    log, lock = [], threading.Lock()
+    task = recorder(log, lock)
+    dependencies = {"region": set(), "plant": {"region", "operator"}, "operator": set(), "feedin": {"plant"}}
+
+    run_in_dependency_order(
+        {name: task(name) for name in ("feedin", "plant", "region", "operator")},
+        dependencies,
+        max_workers=3,
+    )
+
+    assert log.index("start plant") > max(log.index("end region"), log.index("end operator"))
+    assert log.index("start feedin") > log.index("end plant")
+    assert len(log) == 8
+
+
+def test_self_references_and_unknown_dependencies_are_ignored():
+    log, lock = [], threading.Lock()
+    task = recorder(log, lock)
+
+    run_in_dependency_order({"a": task("a")}, {"a": {"a", "external"}})
+
+    assert log == ["start a", "end a"]
+
+
+def test_circular_dependencies_raise():
+    with pytest.raises(ValueError, match="Circular"):
+        run_in_dependency_order({"a": lambda: None, "b": lambda: None}, {"a": {"b"}, "b": {"a"}})
+
+
+def test_no_task_starts_after_a_failure():
+    started = []
+
+    def fail():
+        started.append("parent")
+        raise RuntimeError("upload failed")
+
+    with pytest.raises(RuntimeError):
+        run_in_dependency_order(
+            {"parent": fail, "child": lambda: started.append("child")},
+            {"child": {"parent"}},
+        )
+
+    assert started == ["parent"]
@@ -0,0 +1,55 @@
+import pytest
+import requests
+
+from oem_dpkg import OepUploadHandler
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("OEP_TOKEN", "test")
+    monkeypatch.setenv("OEP_USER", "test")
+
+
+def test_api_url_defaults_to_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("OEP_API_URL", "http://localhost:8000/api/v0")
+
+    handler = OepUploadHandler(datapackage_path=str(tmp_path / "datapackage"))
+
+    assert handler.api_host == "localhost:8000"
+    assert handler.table_api_url("table") == "http://localhost:8000/api/v0/schema/model_draft/tables/table/"
+
+
+@pytest.mark.parametrize("api_url", ["localhost:8000/api/v0", "ftp://localhost/api/v0", "http://localhost/api"])
+def test_invalid_api_url_raises(tmp_path, api_url):
+    with pytest.raises(ValueError):
+        OepUploadHandler(datapackage_path=str(tmp_path / "datapackage"), api_url=api_url)
+
+
+def test_rows_are_stored_with_both_transports(make_handler):
+    for transport in ("json", "columnar"):
+        handler, server = make_handler({"transport": transport}, store_rows=True)
+
+        handler.upload_data_to_table("table", [{"id": 1, "value": "a"}, {"id": 2, "value": "b"}], {})
+
+        assert server.rows == 2
+        assert sorted(int(key) for key in server.tables["model_draft.table"]["data"]) == [1, 2]
+
+
+def test_strict_server_rejects_unknown_tables(make_handler):
+    handler, server = make_handler(strict=True)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        handler.upload_data_to_table("missing", [{"id": 1}], {})
+    assert server.rows == 0
+
+
+def test_created_table_is_returned(make_handler):
+    handler, server = make_handler(strict=True)
+    url = handler.table_api_url("table")
+
+    assert requests.get(url).status_code == 404
+    assert requests.put(url, json={"query": {"columns": []}}).status_code == 201
+    assert requests.put(url, json={"query": {"columns": []}}).status_code == 400
+    assert requests.get(url).json()["name"] == "table"
+    assert requests.delete(url).status_code == 200
+    assert requests.get(url).status_code == 404
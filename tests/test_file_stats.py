@@ -0,0 +1,50 @@
+import hashlib
+import os
+
+import pytest
+
+from oem_dpkg.utils import stream_file_stats
+
+
+@pytest.mark.parametrize(
+    "content, lines",
+    [
+        (b"id,value\n1,2\n2,4\n", 3),
+        (b"id,value\r\n1,2\r\n2,4", 3),
+        (b"", None),
+        (b'id,name\n1,"two\nlines"\n', None),
+        (b"id,value\n\n1,2\n", None),
+        (b"\nid,value\n", None),
+        (b"id,value\r1,2\r", None),
+    ],
+)
+def test_stats_match_the_file(tmp_path, content, lines):
+    source = tmp_path / "source.csv"
+    source.write_bytes(content)
+
+    stats = stream_file_stats(source)
+
+    assert stats == {"sha256": hashlib.sha256(content).hexdigest(), "bytes": len(content), "lines": lines}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1 << 20])
+def test_chunk_boundaries_do_not_change_the_stats(tmp_path, chunk_size):
+    source = tmp_path / "source.csv"
+    source.write_bytes(b"id,value\r\n1,2\r\n\r\n2,4\r\n")
+
+    assert stream_file_stats(source, chunk_size=chunk_size)["lines"] is None
+    source.write_bytes(b"id,value\r\n1,2\r\n2,4\r\n")
+    assert stream_file_stats(source, chunk_size=chunk_size)["lines"] == 3
+
+
+def test_copy_has_the_source_content_and_time(tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_bytes(b"id,value\n1,2\n")
+    os.utime(source, (1_000_000, 1_000_000))
+    target = tmp_path / "target.csv"
+
+    stats = stream_file_stats(source, target, chunk_size=4)
+
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mtime == 1_000_000
+    assert stats["lines"] == 2
@@ -0,0 +1,69 @@
+import geopandas as gpd
+import pytest
+import shapely
+from shapely.geometry import LineString, MultiPolygon, Point, Polygon
+
+from oem_dpkg.utils import encode_geometries
+
+
+def series(*geometries, crs="EPSG:25833"):
+    return gpd.GeoSeries(list(geometries), crs=crs)
+
+
+def test_wkt_and_ewkt():
+    geometries = series(Point(1.5, 2.25), None)
+
+    assert encode_geometries(geometries, "wkt") == ["POINT (1.5 2.25)", None]
+    assert encode_geometries(geometries, "ewkt") == ["SRID=25833;POINT (1.5 2.25)", None]
+
+
+def test_wkb_and_ewkb():
+    geometries = series(Point(1.5, 2.25), None)
+
+    wkb, missing = encode_geometries(geometries, "wkb")
+    ewkb = encode_geometries(geometries, "ewkb")[0]
+
+    assert missing is None
+    assert shapely.from_wkb(wkb) == Point(1.5, 2.25)
+    assert shapely.get_srid(shapely.from_wkb(wkb)) == 0
+    assert shapely.get_srid(shapely.from_wkb(ewkb)) == 25833
+    assert shapely.from_wkb(ewkb) == Point(1.5, 2.25)
+
+
+def test_srid_is_required_for_extended_formats():
+    with pytest.raises(ValueError):
+        encode_geometries(series(Point(0, 0), crs="+proj=merc +lon_0=3"), "ewkt")
+    with pytest.raises(ValueError):
+        encode_geometries(series(Point(0, 0)), "geojson")
+
+
+def test_rounding_keeps_geometries_valid():
+    square = Polygon([(0, 0), (10.123, 0), (10.123, 10.456), (0, 10.456)])
+
+    encoded = encode_geometries(series(square), precision=1)[0]
+
+    rounded = shapely.from_wkt(encoded)
+    assert encoded == "POLYGON ((0 0, 10.1 0, 10.1 10.5, 0 10.5, 0 0))"
+    assert rounded.is_valid
+
+
+def test_simplification_removes_vertices():
+    line = LineString([(0, 0), (1, 0.01), (2, 0), (3, 0.01), (4, 0)])
+
+    encoded = encode_geometries(series(line), simplify_tolerance=0.1)[0]
+
+    assert encoded == "LINESTRING (0 0, 4 0)"
+
+
+@pytest.mark.parametrize("options", [{"simplify_tolerance": 1.0}, {"precision": 0}])
+def test_single_part_multipolygons_keep_their_type(options):
+    ring = [(0, 0), (10, 0.2), (20, 0), (20, 20), (0, 20)]
+    geometries = series(MultiPolygon([Polygon(ring)]), Polygon(ring), None)
+
+    encoded = encode_geometries(geometries, "wkb", **options)
+
+    assert [shapely.from_wkb(value).geom_type if value else None for value in encoded] == [
+        "MultiPolygon",
+        "Polygon",
+        None,
+    ]
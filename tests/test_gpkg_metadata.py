@@ -0,0 +1,60 @@
+import os
+import sqlite3
+
+import geopandas as gpd
+from shapely.geometry import Point
+
+from oem_dpkg.utils import get_gpkg_layers_metadata
+
+
+def write_wal_gpkg(path):
+    gdf = gpd.GeoDataFrame({"value": [1, 2]}, geometry=[Point(0, 0), Point(1, 1)], crs="EPSG:4326")
+    gdf.to_file(path, layer="points", driver="GPKG")
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode=WAL").fetchone() == ("wal",)
+    connection.close()
+
+
+def write_connection_layer(connection):
+    with connection:
+        connection.execute("CREATE TABLE copy AS SELECT * FROM points")
+        connection.execute(
+            "INSERT INTO gpkg_contents (table_name, data_type, identifier, min_x, min_y, max_x, max_y, srs_id) "
+            "SELECT 'copy', data_type, 'copy', min_x, min_y, max_x, max_y, srs_id FROM gpkg_contents "
+            "WHERE table_name = 'points'"
+        )
+        connection.execute(
+            "INSERT INTO gpkg_geometry_columns SELECT 'copy', column_name, geometry_type_name, srs_id, z, m "
+            "FROM gpkg_geometry_columns WHERE table_name = 'points'"
+        )
+
+
+def test_reading_wal_gpkg_leaves_directory_unchanged(tmp_path):
+    source = tmp_path / "input"
+    staged = tmp_path / "staged"
+    source.mkdir()
+    staged.mkdir()
+    write_wal_gpkg(source / "layers.gpkg")
+    (staged / "layers.gpkg").symlink_to(source / "layers.gpkg")
+    listings = {path: sorted(os.listdir(path)) for path in (source, staged)}
+
+    layers = get_gpkg_layers_metadata(str(staged / "layers.gpkg"))
+
+    assert [layer["layer"] for layer in layers] == ["points"]
+    assert {path: sorted(os.listdir(path)) for path in (source, staged)} == listings
+
+
+def test_reads_layers_not_yet_checkpointed_from_wal(tmp_path):
+    path = tmp_path / "layers.gpkg"
+    write_wal_gpkg(path)
+    # keep a connection open and disable checkpoints, so the new layer only exists in the '-wal' file
+    writer = sqlite3.connect(path)
+    writer.execute("PRAGMA wal_autocheckpoint=0")
+    write_connection_layer(writer)
+    assert (tmp_path / "layers.gpkg-wal").exists()
+
+    layers = get_gpkg_layers_metadata(str(path))
+
+    writer.close()
+    assert [layer["layer"] for layer in layers] == ["points", "copy"]
+
@@ -0,0 +1,34 @@
+import json
+
+from oem_dpkg import OemDataPackage
+
+
+def build(input_path, output_path, **options):
+    OemDataPackage(input_path, output_path, "test", "Test package", "1.0", oem=False, **options).create()
+    return (output_path / "datapackage" / "datapackage.json").read_bytes()
+
+
+def write_input(input_path, rows):
+    data = input_path / "dataset" / "data"
+    data.mkdir(parents=True, exist_ok=True)
+    (data / "table.csv").write_text("id,value\n" + "".join(f"{row},{row * 2}\n" for row in range(rows)))
+
+
+def test_unchanged_input_gives_byte_identical_package(tmp_path):
+    write_input(tmp_path / "input", 10)
+
+    first = build(tmp_path / "input", tmp_path / "output", incremental=True)
+    second = build(tmp_path / "input", tmp_path / "output", incremental=True)
+
+    assert second == first
+
+
+def test_changed_input_gets_a_new_creation_date(tmp_path):
+    write_input(tmp_path / "input", 10)
+    first = json.loads(build(tmp_path / "input", tmp_path / "output", incremental=True))
+
+    write_input(tmp_path / "input", 20)
+    second = json.loads(build(tmp_path / "input", tmp_path / "output", incremental=True))
+
+    assert second["created"] > first["created"]
+    assert second["resources"][0]["bytes"] > first["resources"][0]["bytes"]
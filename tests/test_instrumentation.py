@@ -0,0 +1,58 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from oem_dpkg.instrumentation import Instrumentation, JsonFileSink, LogSink, PrometheusTextfileSink
+
+
+def test_spans_and_counters_add_up_across_threads():
+    instrumentation = Instrumentation()
+
+    def work(_):
+        with instrumentation.span("upload.http"):
+            instrumentation.count("upload.rows", 10)
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(work, range(100)))
+
+    assert instrumentation.spans["upload.http"]["calls"] == 100
+    assert instrumentation.counters == {"upload.rows": 1000}
+
+
+def test_span_is_recorded_when_the_block_raises():
+    instrumentation = Instrumentation()
+    try:
+        with instrumentation.span("package.infer"):
+            raise RuntimeError
+    except RuntimeError:
+        pass
+
+    assert instrumentation.spans["package.infer"]["calls"] == 1
+
+
+def test_iterate_records_each_item():
+    instrumentation = Instrumentation()
+
+    assert list(instrumentation.iterate("upload.read", iter("abc"))) == ["a", "b", "c"]
+    assert instrumentation.spans["upload.read"]["calls"] == 3
+
+
+def test_sinks_receive_the_summary(tmp_path, caplog):
+    instrumentation = Instrumentation(
+        [LogSink(), JsonFileSink(tmp_path / "profile.json"), PrometheusTextfileSink(tmp_path / "metrics.prom")]
+    )
+    instrumentation.record("package.copy", 0.5)
+    instrumentation.count("package.bytes", 2048)
+
+    with caplog.at_level(logging.INFO):
+        instrumentation.emit()
+
+    assert "package.copy" in caplog.text
+    profile = json.loads((tmp_path / "profile.json").read_text())
+    assert profile["spans"]["package.copy"] == {"calls": 1, "seconds": 0.5, "max_seconds": 0.5}
+    assert profile["counters"] == {"package.bytes": 2048}
+    metrics = (tmp_path / "metrics.prom").read_text().splitlines()
+    assert 'oem_dpkg_span_seconds_total{span="package.copy"} 0.5' in metrics
+    assert 'oem_dpkg_span_calls_total{span="package.copy"} 1' in metrics
+    assert "oem_dpkg_package_bytes_total 2048" in metrics
+    assert not (tmp_path / ".metrics.prom.tmp").exists()
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from oep_client.exceptions import OepServerSideException
+
+from oem_dpkg import oep_uploadhandler
+
+
+class FakeOepClient:
+    instances = []
+
+    def __init__(self, **options):
+        self.options = options
+        self.metadata = {}
+        self.failures = 0
+        FakeOepClient.instances.append(self)
+
+    def set_metadata(self, table_name, metadata):
+        if self.failures:
+            self.failures -= 1
+            raise OepServerSideException("Internal server error")
+        self.metadata[table_name] = metadata
+
+
+@pytest.fixture
+def handler(make_handler, tmp_path, monkeypatch):
+    FakeOepClient.instances = []
+    monkeypatch.setattr(oep_uploadhandler, "OepClient", FakeOepClient)
+    dataset = tmp_path / "datapackage" / "dataset"
+    dataset.mkdir(parents=True)
+    oem = {"name": "dataset", "resources": [{"name": "plants"}, {"name": "units"}]}
+    (dataset / "metadata.json").write_text(json.dumps(oem))
+    handler, _ = make_handler()
+    handler.retry_policy.backoff_base = 0
+    return handler
+
+
+def test_metadata_is_filtered_per_table(handler):
+    handler.update_oep_metadata("dataset/metadata.json", "plants")
+    handler.update_oep_metadata("dataset/metadata.json", "units")
+
+    client = FakeOepClient.instances[0]
+    assert client.metadata["plants"]["resources"] == [{"name": "plants"}]
+    assert client.metadata["units"]["resources"] == [{"name": "units"}]
+    # the cached OEM is not modified
+    assert len(handler.load_oem("dataset/metadata.json")["resources"]) == 2
+
+
+def test_oem_is_parsed_once_and_the_client_is_reused(handler, monkeypatch):
+    loaded = []
+    load_json = oep_uploadhandler.load_json
+    monkeypatch.setattr(oep_uploadhandler, "load_json", lambda path: loaded.append(path) or load_json(path))
+
+    for table_name in ("plants", "units", "plants"):
+        handler.update_oep_metadata("dataset/metadata.json", table_name)
+
+    assert len(loaded) == 1
+    assert len(FakeOepClient.instances) == 1
+
+
+def test_server_errors_are_retried(handler):
+    handler.oep_client.failures = 1
+
+    handler.update_oep_metadata("dataset/metadata.json", "plants")
+
+    assert "plants" in handler.oep_client.metadata
+    assert handler.instrumentation.counters["requests.retries"] == 1
+
+
+def test_unknown_table_raises(handler):
+    with pytest.raises(ValueError):
+        handler.update_oep_metadata("dataset/metadata.json", "missing")
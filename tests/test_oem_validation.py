@@ -0,0 +1,74 @@
+import json
+
+from oem_dpkg.oem_validation import OemValidationCache
+
+SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "description": "Test metadata schema",
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def write_metadata(path, metadata):
+    path.write_text(json.dumps(metadata))
+    return path
+
+
+def count_validations(cache, monkeypatch):
+    calls = []
+    is_valid = cache.validator.is_valid
+
+    def counting(instance):
+        calls.append(instance)
+        return is_valid(instance)
+
+    monkeypatch.setattr(cache.validator, "is_valid", counting)
+    return calls
+
+
+def test_same_metadata_is_validated_once(tmp_path, monkeypatch):
+    metadata = write_metadata(tmp_path / "metadata.json", {"name": "test"})
+    copy = write_metadata(tmp_path / "copy.json", {"name": "test"})
+    cache = OemValidationCache(SCHEMA)
+    calls = count_validations(cache, monkeypatch)
+
+    assert cache.validate(metadata) == []
+    assert cache.validate(metadata) == []
+    assert cache.validate(copy) == []
+    assert len(calls) == 1
+
+
+def test_invalid_metadata_gets_a_report(tmp_path):
+    metadata = write_metadata(tmp_path / "metadata.json", {"title": "no name"})
+
+    assert OemValidationCache(SCHEMA).validate(metadata)
+
+
+def test_cache_persists_across_runs(tmp_path, monkeypatch):
+    metadata = write_metadata(tmp_path / "metadata.json", {"name": "test"})
+    path = tmp_path / "cache.json"
+    first = OemValidationCache(SCHEMA, path)
+    first.validate(metadata)
+    first.save()
+
+    second = OemValidationCache(SCHEMA, path)
+    calls = count_validations(second, monkeypatch)
+
+    assert second.validate(metadata) == []
+    assert calls == []
+
+
+def test_outdated_cache_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({"version": 0, "reports": {"key": []}}))
+
+    assert OemValidationCache(SCHEMA, path).reports == {}
+
+
+def test_other_schema_version_is_not_reused(tmp_path):
+    metadata = write_metadata(tmp_path / "metadata.json", {"name": "test"})
+    other = dict(SCHEMA, description="Other metadata schema")
+
+    assert OemValidationCache(SCHEMA).cache_key(metadata) != OemValidationCache(other).cache_key(metadata)
@@ -0,0 +1,34 @@
+import json
+
+import geopandas as gpd
+from shapely.geometry import Point
+
+from oem_dpkg import OemDataPackage
+
+
+def write_input(input_path):
+    for dataset, rows in (("first", 5), ("second", 12)):
+        data = input_path / dataset / "data"
+        data.mkdir(parents=True)
+        (data / f"{dataset}.csv").write_text("id,value\n" + "".join(f"{row},{row / 2}\n" for row in range(rows)))
+    gpd.GeoDataFrame(
+        {"name": ["a", "b"]}, geometry=[Point(0, 0), Point(1, 1)], crs="EPSG:4326"
+    ).to_file(input_path / "second" / "data" / "points.gpkg", layer="points", driver="GPKG")
+
+
+def build(input_path, output_path, **options):
+    OemDataPackage(input_path, output_path, "test", "Test package", "1.0", oem=False, **options).create()
+    descriptor = json.loads((output_path / "datapackage" / "datapackage.json").read_text())
+    descriptor.pop("created")
+    return descriptor
+
+
+def test_parallel_inference_gives_the_same_package(tmp_path):
+    write_input(tmp_path / "input")
+
+    serial = build(tmp_path / "input", tmp_path / "serial", jobs=1)
+    parallel = build(tmp_path / "input", tmp_path / "parallel", jobs=3)
+
+    assert parallel == serial
+    rows = {resource["name"]: resource.get("rows") for resource in serial["resources"]}
+    assert rows == {"first.first": 5, "second.points": None, "second.second": 12}
@@ -0,0 +1,44 @@
+import io
+import json
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point
+
+from oem_dpkg.utils import csv_frame_to_records, encode_batch, gpkg_frame_to_records
+
+
+def test_gpkg_records_are_json_ready():
+    gdf = gpd.GeoDataFrame(
+        {
+            "count": np.array([1, 2, 3], dtype="int64"),
+            "share": [0.5, np.nan, 1.25],
+            "name": ["a", None, "c"],
+            "date": pd.to_datetime(["2024-01-01", None, "2024-03-01"]),
+        },
+        geometry=[Point(1, 2), Point(3.5, 4), None],
+        crs="EPSG:4326",
+    )
+
+    records = gpkg_frame_to_records(gdf)
+
+    assert records == [
+        {"count": 1, "share": 0.5, "name": "a", "date": "2024-01-01T00:00:00", "geometry": "POINT (1 2)"},
+        {"count": 2, "share": None, "name": None, "date": None, "geometry": "POINT (3.5 4)"},
+        {"count": 3, "share": 1.25, "name": "c", "date": "2024-03-01T00:00:00", "geometry": None},
+    ]
+    assert all(type(record["count"]) is int for record in records)
+    json.dumps(records, allow_nan=False)
+
+
+def test_csv_records_match_the_json_round_trip():
+    text = "ID,RS,value,label,flag\n1,01001,0.1,a,true\n2,09162,,\"b, c\",false\n3,11000,1e20,,true\n"
+    df = pd.read_csv(io.StringIO(text), dtype={"RS": "str"})
+
+    records = csv_frame_to_records(df)
+
+    df.columns = map(str.lower, df.columns)
+    assert records == json.loads(df.to_json(orient="records"))
+    assert records[0]["rs"] == "01001"
+    assert json.loads(encode_batch(records)) == {"query": records}
@@ -0,0 +1,35 @@
+import pytest
+
+
+def batches():
+    return [[{"id": index, "value": index} for index in range(start, start + 10)] for start in range(0, 100, 10)]
+
+
+def test_resume_sends_only_batches_that_failed(make_handler):
+    first, _ = make_handler(error_rate=0.4, error_status=503, seed=3, store_rows=True)
+    first.retry_policy.max_attempts = 1
+    uploaded = first.upload_batches("table", batches(), {}, journal_key="model_draft/table")
+    failed_offsets = sorted(batch["offset"] for batch in first.failed_batches)
+    assert 0 < uploaded < 100
+
+    second, server = make_handler({"resume": True}, store_rows=True)
+    resumed = second.upload_batches("table", batches(), {}, journal_key="model_draft/table")
+
+    stored = server.tables["model_draft.table"]["data"]
+    assert resumed == 100 - uploaded
+    assert sorted(int(key) for key in stored) == [
+        index for offset in failed_offsets for index in range(offset, offset + 10)
+    ]
+    assert second.instrumentation.counters["upload.skipped_batches"] == 10 - len(failed_offsets)
+
+
+def test_resume_refuses_changed_rows(make_handler):
+    first, _ = make_handler()
+    first.upload_batches("table", batches(), {}, journal_key="model_draft/table")
+
+    second, _ = make_handler({"resume": True})
+    changed = batches()
+    changed[3][0]["value"] = -1
+
+    with pytest.raises(ValueError, match="changed since the previous run"):
+        second.upload_batches("table", changed, {}, journal_key="model_draft/table")
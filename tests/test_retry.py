@@ -0,0 +1,98 @@
+import time
+
+import pytest
+import requests as req
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from oem_dpkg.retry import CircuitBreaker, RetryPolicy
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+def failing(error, attempts):
+    def send():
+        attempts.append(1)
+        if len(attempts) == 1:
+            if isinstance(error, Exception):
+                raise error
+            return Response(error)
+        return Response(201)
+
+    return send
+
+
+def refused_connection():
+    cause = NewConnectionError(None, "Connection refused")
+    return req.exceptions.ConnectionError(MaxRetryError(None, "/", cause))
+
+
+@pytest.mark.parametrize(
+    "error, idempotent, retried",
+    [
+        (refused_connection(), False, True),
+        (req.exceptions.ConnectTimeout(), False, True),
+        (req.exceptions.ConnectionError(ProtocolError("Connection aborted.")), False, False),
+        (req.exceptions.ConnectionError(ProtocolError("Connection aborted.")), True, True),
+        (req.exceptions.ReadTimeout(), False, False),
+        (503, False, True),
+        (502, False, False),
+        (502, True, True),
+    ],
+)
+def test_retries_only_requests_that_cannot_have_been_processed(error, idempotent, retried):
+    attempts = []
+    policy = RetryPolicy(max_attempts=2, backoff_base=0)
+
+    try:
+        result = policy.call(failing(error, attempts), idempotent=idempotent)
+    except req.exceptions.RequestException:
+        result = None
+
+    assert len(attempts) == (2 if retried else 1)
+    assert (result is not None and result.status_code == 201) == retried
+
+
+def test_breaker_opens_after_consecutive_overload_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    assert not breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.is_open
+    # further failures while open do not extend the pause
+    assert not breaker.record_failure()
+    assert breaker.times_opened == 1
+
+
+def test_open_breaker_pauses_requests():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    policy = RetryPolicy(max_attempts=3, backoff_base=0, breaker=breaker)
+    attempts = []
+
+    started = time.monotonic()
+    result = policy.call(failing(503, attempts))
+
+    assert result.status_code == 201
+    assert len(attempts) == 2
+    assert breaker.times_opened == 1
+    assert time.monotonic() - started >= 0.05
+
+
+def test_retry_after_is_respected():
+    class Overloaded(Response):
+        def __init__(self):
+            super().__init__(429)
+            self.headers = {"Retry-After": "0.1"}
+
+    responses = iter([Overloaded(), Response(201)])
+    policy = RetryPolicy(max_attempts=2, backoff_base=0, breaker=CircuitBreaker(failure_threshold=10))
+
+    assert policy.call(lambda: next(responses)).status_code == 201
+    assert policy.instrumentation.counters["requests.retries"] == 1
+    assert policy.instrumentation.spans["requests.backoff"]["seconds"] >= 0.1
@@ -0,0 +1,24 @@
+import os
+
+from oem_dpkg.utils import scan_directory_tree
+
+
+def test_scan_matches_os_walk_and_does_not_follow_directory_links(tmp_path):
+    data = tmp_path / "input" / "dataset" / "data"
+    data.mkdir(parents=True)
+    (data / "table.csv").write_text("id\n1\n")
+    (tmp_path / "input" / "dataset" / "metadata.json").write_text("{}")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "other.csv").write_text("id\n2\n")
+    (data / "linked").symlink_to(outside, target_is_directory=True)
+    (data / "linked.csv").symlink_to(outside / "other.csv")
+
+    index = scan_directory_tree(tmp_path / "input")
+
+    walked = {
+        dirpath: sorted(os.path.join(dirpath, name) for name in filenames)
+        for dirpath, _, filenames in os.walk(tmp_path / "input")
+    }
+    assert list(index) == list(walked)
+    assert {path: sorted(directory["files"]) for path, directory in index.items()} == walked
@@ -0,0 +1,81 @@
+import pytest
+
+from oem_dpkg.oem_datapackage import infer_resource_entry
+from oem_dpkg.utils import oem_resource_schema, sample_file_lines
+
+
+@pytest.fixture
+def table(tmp_path):
+    # integers in the first half, text in the second half of the rows
+    path = tmp_path / "table.csv"
+    rows = [f"{row},{row if row < 500 else f'x{row}'}\n" for row in range(1000)]
+    path.write_text("id,value\n" + "".join(rows))
+    return path
+
+
+def inferred(path, **options):
+    entry = infer_resource_entry(str(path), str(path.parent), **options)
+    return entry["resources"][0]["descriptor"]
+
+
+def field_types(descriptor):
+    return {field["name"]: field["type"] for field in descriptor["schema"]["fields"]}
+
+
+@pytest.mark.parametrize(
+    "inference, value_type",
+    [("head", "integer"), ("reservoir", "string"), ("full", "string")],
+)
+def test_inference_policies_sample_different_rows(table, inference, value_type):
+    descriptor = inferred(table, inference=inference, sample_size=50)
+
+    assert field_types(descriptor) == {"id": "integer", "value": value_type}
+    assert descriptor["rows"] == 1000
+
+
+def test_reservoir_sample_has_the_header_and_distinct_lines(table):
+    lines = sample_file_lines(table, 50, seed=1).splitlines()
+
+    assert lines[0] == b"id,value"
+    assert 1 < len(lines) <= 51
+    assert len(set(lines)) == len(lines)
+    assert set(lines) <= set(table.read_bytes().splitlines())
+    assert sample_file_lines(table, 50, seed=1) == sample_file_lines(table, 50, seed=1)
+
+
+def test_declared_schema_is_used(table):
+    declared = {"fields": [{"name": "id", "type": "integer"}, {"name": "value", "type": "string"}]}
+
+    descriptor = inferred(table, declared_schema=declared)
+
+    assert field_types(descriptor) == {"id": "integer", "value": "string"}
+
+
+def test_declared_schema_with_other_fields_is_ignored(table):
+    declared = {"fields": [{"name": "id", "type": "string"}, {"name": "other", "type": "string"}]}
+
+    descriptor = inferred(table, declared_schema=declared, inference="head", sample_size=50)
+
+    assert field_types(descriptor) == {"id": "integer", "value": "integer"}
+
+
+def test_oem_declares_the_schema_of_its_resource():
+    oem = {
+        "resources": [
+            {"name": "other", "schema": {"fields": [{"name": "id", "type": "text"}]}},
+            {
+                "path": "data/table.csv",
+                "schema": {
+                    "fields": [{"name": "id", "type": "bigint"}, {"name": "value", "type": "text"}],
+                    "primaryKey": ["id"],
+                },
+            },
+        ]
+    }
+
+    schema = oem_resource_schema(oem, "dataset/table.csv")
+
+    assert [field["name"] for field in schema["fields"]] == ["id", "value"]
+    assert schema["fields"][0]["type"] == "integer"
+    assert schema["primaryKey"] == ["id"]
+    assert oem_resource_schema(oem, "dataset/missing.csv") is None
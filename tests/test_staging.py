@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from oem_dpkg import OemDataPackage
+from oem_dpkg.utils import stage_file
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.csv"
+    path.write_text("id,value\n1,2\n")
+    return path
+
+
+@pytest.mark.parametrize("strategy", ["copy", "hardlink", "symlink"])
+def test_staged_file_has_the_source_content(tmp_path, source, strategy):
+    target = tmp_path / "target.csv"
+    target.write_text("stale")
+
+    assert stage_file(source, target, strategy) == strategy
+    assert target.read_text() == source.read_text()
+
+
+def test_hardlink_shares_the_source_data(tmp_path, source):
+    target = tmp_path / "target.csv"
+    stage_file(source, target, "hardlink")
+
+    assert os.path.samefile(source, target)
+
+
+def test_symlink_points_to_the_absolute_source(tmp_path, source, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    target = tmp_path / "target.csv"
+    stage_file("source.csv", target, "symlink")
+
+    assert target.is_symlink()
+    assert os.readlink(target) == str(source)
+
+
+def test_auto_falls_back_to_copy(tmp_path, source, monkeypatch):
+    def unsupported(*args):
+        raise OSError("not supported")
+
+    monkeypatch.setattr("oem_dpkg.utils.reflink_file", unsupported)
+    monkeypatch.setattr("oem_dpkg.utils.os.link", unsupported)
+    target = tmp_path / "target.csv"
+
+    assert stage_file(source, target, "auto") == "copy"
+    assert target.read_text() == source.read_text()
+    assert not os.path.samefile(source, target)
+
+
+def test_unknown_strategy_raises(tmp_path, source):
+    with pytest.raises(ValueError):
+        stage_file(source, tmp_path / "target.csv", "teleport")
+
+
+def test_package_rejects_unknown_strategy(tmp_path):
+    with pytest.raises(ValueError):
+        OemDataPackage(tmp_path, tmp_path / "output", "test", "Test package", "1.0", staging="teleport")
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from oem_dpkg import OepUploadHandler
+from oem_dpkg.fake_oep_server import start_fake_server
+
+
+def test_sync_keeps_remote_rows_if_a_resource_cannot_be_read(tmp_path, monkeypatch):
+    monkeypatch.setenv("OEP_TOKEN", "test")
+    monkeypatch.setenv("OEP_USER", "test")
+    server = start_fake_server(store_rows=True)
+    try:
+        handler = OepUploadHandler(datapackage_path=str(tmp_path / "datapackage"), api_url=server.url, sync=True)
+        remote_rows = [{"id": index, "value": index} for index in range(1, 6)]
+        handler.upload_batches("table", [remote_rows], {})
+
+        local_batches = {"readable": [[{"id": 1, "value": 1}, {"id": 2, "value": 20}]], "unreadable": None}
+        monkeypatch.setattr(
+            handler,
+            "read_resource_batches",
+            lambda resource: None if local_batches[resource.name] is None else iter(local_batches[resource.name]),
+        )
+        handler.sync_tables["table"] = "id"
+        summary = handler.sync_table(
+            "table", [SimpleNamespace(name="readable"), SimpleNamespace(name="unreadable")], {}
+        )
+
+        assert summary == {"inserted": 0, "updated": 1, "deleted": 0, "unchanged": 1}
+        stored = server.tables["model_draft.table"]["data"]
+        assert sorted(int(key) for key in stored) == [1, 2, 3, 4, 5]
+    finally:
+        server.shutdown()
+
+
+def test_sync_sends_only_the_differences(make_handler, monkeypatch):
+    monkeypatch.setattr("oem_dpkg.oep_uploadhandler.REMOTE_PAGE_SIZE", 2)
+    handler, server = make_handler({"sync": True}, store_rows=True)
+    handler.upload_batches("table", [[{"id": index, "value": index} for index in range(1, 6)]], {})
+    local_rows = [{"id": 1, "value": 1}, {"id": 2, "value": 20}, {"id": 6, "value": 6}]
+    monkeypatch.setattr(handler, "read_resource_batches", lambda resource: iter([local_rows]))
+    handler.sync_tables["table"] = "id"
+    inserts = server.requests
+
+    summary = handler.sync_table("table", [SimpleNamespace(name="table")], {})
+
+    assert summary == {"inserted": 1, "updated": 1, "deleted": 3, "unchanged": 1}
+    stored = server.tables["model_draft.table"]["data"]
+    assert {int(key): row["value"] for key, row in stored.items()} == {1: 1, 2: 20, 6: 6}
+    assert server.requests == inserts + 1
+
+    # a second sync changes nothing
+    summary = handler.sync_table("table", [SimpleNamespace(name="table")], {})
+
+    assert summary == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 3}
+    assert server.requests == inserts + 1
+    assert not handler.failed_batches
@@ -0,0 +1,52 @@
+from oem_dpkg.utils import encode_batch
+
+
+def rows(count):
+    return [{"id": index, "name": f"row {index}"} for index in range(count)]
+
+
+def test_columnar_transport(make_handler):
+    handler, server = make_handler({"transport": "columnar"}, store_rows=True)
+
+    uploaded = handler.upload_batches("table", [rows(10)] * 3, {})
+
+    assert uploaded == 30
+    assert handler.transport == "columnar"
+    assert server.rows == 30
+    stored = {str(key): row for key, row in server.tables["model_draft.table"]["data"].items()}
+    assert stored["5"]["name"] == "row 5"
+
+
+def test_fallback_to_json_transport_is_not_counted_as_retry(make_handler):
+    handler, server = make_handler({"transport": "columnar", "workers": 4}, advanced_insert=False)
+
+    uploaded = handler.upload_batches("table", [rows(10)] * 20, {})
+
+    counters = handler.instrumentation.counters
+    assert uploaded == 200
+    assert server.rows == 200
+    assert handler.transport == "json"
+    assert counters["upload.transport_fallbacks"] == 1
+    assert "upload.retries" not in counters
+
+
+def test_compressed_requests(make_handler):
+    handler, server = make_handler({"compression": "gzip"})
+
+    handler.upload_batches("table", [rows(100)] * 2, {})
+
+    assert server.rows == 200
+    assert handler.content_encoding == "gzip"
+    assert server.bytes_received < len(encode_batch(rows(100)))
+
+
+def test_fallback_to_uncompressed_requests(make_handler):
+    handler, server = make_handler({"compression": "gzip", "workers": 4}, compression=False)
+
+    handler.upload_batches("table", [rows(100)] * 8, {})
+
+    counters = handler.instrumentation.counters
+    assert server.rows == 800
+    assert handler.content_encoding is None
+    assert 1 <= counters["upload.compression_fallbacks"] <= 4
+    assert "upload.retries" not in counters
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from oem_dpkg.batching import BatchSizer
+from oem_dpkg.utils import scan_directory_tree
+
+
+def rows(count, start=0):
+    return [{"id": index, "value": index * 0.5} for index in range(start, start + count)]
+
+
+def test_slow_batches_are_not_resent(make_handler):
+    handler, server = make_handler(error_rate=1.0, error_status=504)
+    sizer = BatchSizer(initial_rows=400, min_rows=50)
+
+    uploaded = handler.upload_batches("table", [rows(1000)], {}, sizer=sizer)
+
+    assert uploaded == 0
+    # every batch was sent once and recorded as failed, without overlaps
+    assert server.errors == len(handler.failed_batches)
+    offset = 0
+    for batch in sorted(handler.failed_batches, key=lambda batch: batch["offset"]):
+        assert batch["offset"] == offset
+        offset += batch["rows"]
+    assert offset == 1000
+    assert sizer.size < 400
+
+
+def test_oversized_batches_are_resent_in_halves(make_handler):
+    handler, server = make_handler(error_rate=1.0, error_status=413)
+    sizer = BatchSizer(initial_rows=4, min_rows=1)
+
+    handler.upload_batches("table", [rows(4)], {}, sizer=sizer)
+
+    # 4 rows, then the first half of 2 rows, then its first single row
+    assert server.errors == 3
+    assert [(batch["offset"], batch["rows"]) for batch in handler.failed_batches] == [
+        (0, 4)
+    ]
+
+
+def test_journal_records_batches_until_the_upload_is_complete(make_handler):
+    handler, _ = make_handler()
+
+    handler.upload_batches("table", [rows(10)] * 3, {}, journal_key="model_draft/table")
+
+    # every batch is recorded as soon as it is acknowledged
+    assert sorted(handler.journal.acknowledged_batches("model_draft/table")) == [0, 10, 20]
+    handler.journal.record_batch("model_draft/other", "model_draft.other", 0, 10, "hash")
+    handler.clear_journal(["model_draft/table"])
+    assert handler.journal_path.exists()
+    handler.clear_journal(["model_draft/other"])
+    assert list(handler.journal_path.parent.glob(handler.journal_path.name + "*")) == []
+
+
+def test_journal_and_report_are_kept_outside_the_data_package(make_handler, tmp_path):
+    handler, server = make_handler(error_rate=0.5, error_status=504, seed=1)
+    datapackage_dir = tmp_path / "datapackage"
+    (datapackage_dir / "dataset").mkdir(parents=True)
+    (datapackage_dir / "dataset" / "table.csv").write_text("id,value\n")
+
+    uploaded = handler.upload_batches(
+        "table", [rows(10)] * 10, {}, journal_key="model_draft/table"
+    )
+    handler.report_failed_batches()
+
+    assert 0 < uploaded < 100
+    acknowledged = handler.journal.acknowledged_batches("model_draft/table")
+    assert sum(count for count, _ in acknowledged.values()) == uploaded
+    assert handler.failed_batches_path.exists()
+    indexed_files = [
+        Path(file).name
+        for directory in scan_directory_tree(datapackage_dir).values()
+        for file in directory["files"]
+    ]
+    assert indexed_files == ["table.csv"]
+
+
+def test_concurrent_workers_upload_every_row_once(make_handler):
+    handler, server = make_handler({"workers": 4}, latency=0.01, store_rows=True)
+
+    uploaded = handler.upload_batches("table", [rows(25, start) for start in range(0, 200, 25)], {})
+
+    stored = server.tables["model_draft.table"]["data"]
+    assert uploaded == 200
+    assert server.requests == 8
+    assert sorted(int(key) for key in stored) == list(range(200))
+    assert handler.instrumentation.counters["upload.batches"] == 8
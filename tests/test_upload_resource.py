@@ -0,0 +1,17 @@
+from types import SimpleNamespace
+
+
+def test_metadata_is_updated_for_resources_in_unsupported_formats(make_handler, monkeypatch):
+    handler, server = make_handler()
+    updates = []
+    monkeypatch.setattr(
+        handler, "update_oep_metadata", lambda oem_path, table_name: updates.append((oem_path, table_name))
+    )
+    resource = SimpleNamespace(name="dataset.table", format="xlsx", custom={"oem_path": "dataset/metadata.json"})
+
+    handler.upload_resource(resource, {})
+    handler.resources = [resource]
+    handler.upload_datasets()
+
+    assert updates == [("dataset/metadata.json", "table")] * 2
+    assert server.requests == 0